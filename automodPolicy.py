@@ -0,0 +1,177 @@
+import os
+import json
+from collections import OrderedDict
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping
+from database import (
+    getAllConfig, getAllExemptRoles, getAllExemptChannels, getFilterItems,
+    addGuildChangeListener
+)
+from config import defaultConfig
+from wordMatcher import WordMatcher
+from regexEngine import PatternSet
+from domainTrie import DomainTrie
+
+# ─────────────────────────────────────────────
+# Policy Snapshot
+# ─────────────────────────────────────────────
+
+def _int(value, default):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return int(default)
+
+def _flag(value):
+    return value == "1"
+
+def _jsonList(value):
+    try:
+        parsed = json.loads(value or "[]")
+    except json.JSONDecodeError:
+        return []
+    return parsed if isinstance(parsed, list) else []
+
+# The only rules that have ever honoured channel exemptions; the rest are role-only
+CHANNEL_EXEMPT_RULES = frozenset({"spam", "link", "word"})
+
+@dataclass(frozen=True)
+class AutomodPolicy:
+    """Immutable, pre-parsed automod settings for one guild.
+
+    Built once from the config, exemptions, exempt_channels and filters tables and
+    replaced wholesale whenever any of them change, so filters never parse config per message.
+    """
+    guildId: str
+
+    spamEnabled: bool
+    spamMaxMessages: int
+    spamTimeWindow: int
+
+    attachmentEnabled: bool
+    maxAttachments: int
+    blockedFileTypes: frozenset
+
+    mentionEnabled: bool
+    maxMentions: int
+    blockEveryone: bool
+    blockHere: bool
+
+    messageLimitEnabled: bool
+    maxLines: int
+    maxWords: int
+    maxCharacters: int
+
+    linkFilterEnabled: bool
+    whitelistDomains: DomainTrie
+    linkPatterns: PatternSet
+
+    wordFilterEnabled: bool
+    wordFilterPartialMatch: bool
+    wordFilterRegex: bool
+    bannedWords: tuple
+    wordPatterns: PatternSet
+    wordMatcher: WordMatcher
+
+    exemptRoles: Mapping[str, frozenset]
+    exemptChannels: Mapping[str, frozenset]
+
+    def isExempt(self, rule, member, channelId):
+        """Whether a member or channel is exempt from the given rule."""
+        if rule in CHANNEL_EXEMPT_RULES and str(channelId) in self.exemptChannels.get(rule, ()):
+            return True
+        exemptRoles = self.exemptRoles.get(rule)
+        if not exemptRoles:
+            return False
+        return any(str(role.id) in exemptRoles for role in getattr(member, "roles", ()))
+
+def buildPolicy(guildId, config, exemptRoles, exemptChannels, filterItems):
+    """Compile raw table contents into an AutomodPolicy. Pure function, no I/O."""
+    def get(key):
+        value = config.get(key)
+        return value if value not in (None, "") else defaultConfig.get(key, "")
+
+    bannedWords = tuple(filterItems.get('banned_word', ()))
+    useRegex = _flag(get("wordFilterRegex"))
+    usePartial = _flag(get("wordFilterPartialMatch"))
+
+    return AutomodPolicy(
+        guildId=str(guildId),
+
+        spamEnabled=_flag(config.get("spamEnabled")),
+        spamMaxMessages=_int(get("spamMaxMessages"), 5),
+        spamTimeWindow=_int(get("spamTimeWindow"), 10),
+
+        attachmentEnabled=_flag(config.get("attachmentEnabled")),
+        maxAttachments=_int(get("maxAttachments"), 5),
+        blockedFileTypes=frozenset(str(ft).lower() for ft in _jsonList(config.get("blockedFileTypes"))),
+
+        mentionEnabled=_flag(config.get("mentionEnabled")),
+        maxMentions=_int(get("maxMentions"), 10),
+        blockEveryone=_flag(config.get("blockEveryone")),
+        blockHere=_flag(config.get("blockHere")),
+
+        messageLimitEnabled=_flag(config.get("messageLimitEnabled")),
+        maxLines=_int(get("maxLines"), 30),
+        maxWords=_int(get("maxWords"), 500),
+        maxCharacters=_int(get("maxCharacters"), 2000),
+
+        linkFilterEnabled=_flag(config.get("linkFilterEnabled")),
+        whitelistDomains=DomainTrie(filterItems.get('whitelist_domain', ())),
+        linkPatterns=PatternSet(_jsonList(config.get("linkRegexPatterns")), label="link"),
+
+        wordFilterEnabled=_flag(config.get("wordFilterEnabled")),
+        wordFilterPartialMatch=usePartial,
+        wordFilterRegex=useRegex,
+        bannedWords=bannedWords,
+        wordPatterns=PatternSet(bannedWords if useRegex else (), label="word"),
+        wordMatcher=WordMatcher(() if useRegex else bannedWords, partial=usePartial),
+
+        exemptRoles=MappingProxyType({rule: frozenset(ids) for rule, ids in exemptRoles.items()}),
+        exemptChannels=MappingProxyType({rule: frozenset(ids) for rule, ids in exemptChannels.items()}),
+    )
+
+# ─────────────────────────────────────────────
+# Policy Cache
+# ─────────────────────────────────────────────
+
+POLICY_CACHE_SIZE = int(os.getenv("CONFIG_CACHE_SIZE", "5000"))
+
+_policies = OrderedDict()
+# Bumped on every invalidation so a build racing with a config change is never cached
+_invalidationSeq = 0
+
+def invalidatePolicy(guildId):
+    global _invalidationSeq
+    _invalidationSeq += 1
+    _policies.pop(str(guildId), None)
+
+addGuildChangeListener(invalidatePolicy)
+
+def primePolicy(policy):
+    """Install an already-built policy, e.g. one built from a bulk load."""
+    _policies[policy.guildId] = policy
+    _policies.move_to_end(policy.guildId)
+    while len(_policies) > POLICY_CACHE_SIZE:
+        _policies.popitem(last=False)
+
+async def getPolicy(guildId):
+    """Get the current AutomodPolicy for a guild, building it on first use."""
+    guildId = str(guildId)
+    policy = _policies.get(guildId)
+    if policy is not None:
+        _policies.move_to_end(guildId)
+        return policy
+
+    seq = _invalidationSeq
+    policy = buildPolicy(
+        guildId,
+        await getAllConfig(guildId),
+        await getAllExemptRoles(guildId),
+        await getAllExemptChannels(guildId),
+        await getFilterItems(guildId),
+    )
+    if seq == _invalidationSeq:
+        primePolicy(policy)
+    return policy
@@ -0,0 +1,208 @@
+"""Per-rule CPU cost of the automod filters over synthetic message corpora.
+
+Each rule's check() is driven directly with an AutomodPolicy built from an
+in-memory config (no database, no gateway). Corpora vary message length, URL
+density, mention and attachment counts and banned-word list size (10 to 50,000).
+
+Usage:
+    python -m benchmarks.automodRules [--messages 2000] [--out automod-bench.json]
+    python -m benchmarks.automodRules --baseline automod-bench.json --tolerance 0.25
+
+With --baseline the run exits non-zero if any scenario got slower than the tolerance allows.
+"""
+import os
+import sys
+import json
+import time
+import random
+import string
+import inspect
+import asyncio
+import argparse
+import platform
+
+# Measure pattern cost itself rather than the round trip to worker processes
+os.environ.setdefault("REGEX_WORKERS", "0")
+
+from config import defaultConfig
+from automodPolicy import buildPolicy
+from messageFeatures import MessageFeatures
+from cogs.spamFilter import SpamFilter
+from cogs.attachmentFilter import AttachmentFilter
+from cogs.mentionFilter import MentionFilter
+from cogs.messageLimitFilter import MessageLimitFilter
+from cogs.linkFilter import LinkFilter
+from cogs.wordFilter import WordFilter
+from benchmarks.fakes import FakeGuild, FakeMember, FakeMessage, FakeAttachment
+
+GUILD_ID = 1
+EXTENSIONS = ["png", "jpg", "gif", "txt", "pdf", "exe", "zip", "mp4"]
+
+# ─────────────────────────────────────────────
+# Corpora
+# ─────────────────────────────────────────────
+
+def _word(rng, lo=2, hi=9):
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(lo, hi)))
+
+def makeDomains(rng, count):
+    return [f"{_word(rng, 4, 10)}.{rng.choice(['com', 'net', 'org', 'io'])}" for _ in range(count)]
+
+def makeCorpus(rng, size, words=20, urlDensity=0.0, mentions=0, attachments=0, users=200,
+               injected=(), injectRate=0.0, domains=()):
+    """`size` fake messages; `injected` terms are planted in roughly `injectRate` of them."""
+    vocabulary = [_word(rng) for _ in range(5000)]
+    guild = FakeGuild(GUILD_ID)
+    channel = guild.channel(10)
+    members = [FakeMember(1000 + i, f"user{i}", roles=[GUILD_ID, 50 + i % 5], guild=guild) for i in range(users)]
+    corpus = []
+    for i in range(size):
+        tokens = []
+        for _ in range(words):
+            if urlDensity and rng.random() < urlDensity:
+                host = rng.choice(domains) if domains and rng.random() < 0.5 else f"{_word(rng, 4, 10)}.com"
+                tokens.append(f"https://{host}/{_word(rng)}")
+            else:
+                tokens.append(rng.choice(vocabulary))
+        if injected and rng.random() < injectRate:
+            tokens[rng.randrange(len(tokens))] = rng.choice(injected)
+        lines = [" ".join(tokens[j:j + 12]) for j in range(0, len(tokens), 12)]
+        corpus.append(FakeMessage(
+            i, "\n".join(lines), rng.choice(members), guild, channel,
+            mentions=[FakeMember(rng.randrange(10**6)) for _ in range(mentions)],
+            attachments=[FakeAttachment(f"{_word(rng)}.{rng.choice(EXTENSIONS)}", rng.randrange(10**6)) for _ in range(attachments)],
+        ))
+    return corpus
+
+def makePolicy(overrides, bannedWords=(), whitelist=()):
+    config = {**defaultConfig, **{key: "0" for key in defaultConfig if key.endswith("Enabled")}, **overrides}
+    filterItems = {'banned_word': list(bannedWords), 'whitelist_domain': list(whitelist)}
+    return buildPolicy(GUILD_ID, config, {}, {}, filterItems)
+
+# ─────────────────────────────────────────────
+# Scenarios
+# ─────────────────────────────────────────────
+
+def scenarios(rng, size):
+    """Yield (ruleClass, scenario name, params, policy factory, corpus)."""
+    for words in (8, 60, 400):
+        corpus = makeCorpus(rng, size, words=words)
+        yield MessageLimitFilter, f"words={words}", {'words': words}, lambda: makePolicy({"messageLimitEnabled": "1"}), corpus
+        yield SpamFilter, f"words={words}", {'words': words, 'users': 200}, lambda: makePolicy({"spamEnabled": "1"}), corpus
+
+    corpus = makeCorpus(rng, size, words=20, users=20000)
+    yield SpamFilter, "users=20000", {'words': 20, 'users': 20000}, lambda: makePolicy({"spamEnabled": "1"}), corpus
+
+    for mentions in (0, 3, 15):
+        corpus = makeCorpus(rng, size, words=20, mentions=mentions)
+        yield MentionFilter, f"mentions={mentions}", {'mentions': mentions}, lambda: makePolicy({"mentionEnabled": "1"}), corpus
+
+    for attachments in (0, 2, 8):
+        corpus = makeCorpus(rng, size, words=8, attachments=attachments)
+        policy = lambda: makePolicy({"attachmentEnabled": "1", "maxAttachments": "10", "blockedFileTypes": json.dumps(["exe", "zip"])})
+        yield AttachmentFilter, f"attachments={attachments}", {'attachments': attachments}, policy, corpus
+
+    for whitelistSize in (10, 1000):
+        domains = makeDomains(rng, whitelistSize)
+        for density in (0.0, 0.05, 0.2):
+            corpus = makeCorpus(rng, size, words=30, urlDensity=density, domains=domains)
+            policy = lambda domains=domains: makePolicy({"linkFilterEnabled": "1"}, whitelist=domains)
+            yield LinkFilter, f"whitelist={whitelistSize} urlDensity={density}", {'whitelist': whitelistSize, 'urlDensity': density}, policy, corpus
+
+    for listSize in (10, 1000, 50000):
+        banned = list({_word(rng, 5, 12) for _ in range(listSize)})
+        corpus = makeCorpus(rng, size, words=60, injected=banned, injectRate=0.02)
+        for partial in ("0", "1"):
+            policy = lambda banned=banned, partial=partial: makePolicy(
+                {"wordFilterEnabled": "1", "wordFilterPartialMatch": partial}, bannedWords=banned)
+            mode = "partial" if partial == "1" else "exact"
+            yield WordFilter, f"words={listSize} {mode}", {'bannedWords': listSize, 'mode': mode}, policy, corpus
+        if listSize <= 1000:
+            policy = lambda banned=banned: makePolicy({"wordFilterEnabled": "1", "wordFilterRegex": "1"}, bannedWords=banned)
+            yield WordFilter, f"words={listSize} regex", {'bannedWords': listSize, 'mode': 'regex'}, policy, corpus
+
+# ─────────────────────────────────────────────
+# Runner
+# ─────────────────────────────────────────────
+
+async def measure(ruleClass, policy, corpus, repeat):
+    """Best-of-`repeat` nanoseconds per message, features included, plus the verdict rate."""
+    best = None
+    hits = 0
+    for _ in range(repeat):
+        # Fresh rule per pass so stateful rules (spam windows) start from the same point
+        rule = ruleClass(None)
+        hits = 0
+        start = time.perf_counter_ns()
+        for message in corpus:
+            verdict = rule.check(message, policy, MessageFeatures(message))
+            if inspect.isawaitable(verdict):
+                verdict = await verdict
+            if verdict:
+                hits += 1
+        elapsed = time.perf_counter_ns() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / len(corpus), hits / len(corpus)
+
+async def run(args):
+    rng = random.Random(args.seed)
+    results = []
+    for ruleClass, name, params, makeRulePolicy, corpus in scenarios(rng, args.messages):
+        start = time.perf_counter()
+        policy = makeRulePolicy()
+        buildMs = (time.perf_counter() - start) * 1000
+        nsPerMessage, verdictRate = await measure(ruleClass, policy, corpus, args.repeat)
+        results.append({
+            'rule': ruleClass.name, 'scenario': name, 'params': params,
+            'nsPerMessage': round(nsPerMessage), 'verdictRate': round(verdictRate, 4),
+            'policyBuildMs': round(buildMs, 2),
+        })
+        print(f"{ruleClass.name:<13}{name:<36}{nsPerMessage:>12,.0f} ns/msg  verdicts {verdictRate:6.1%}  build {buildMs:8.1f}ms")
+    return results
+
+def compare(results, baseline, tolerance):
+    baseline = {(r['rule'], r['scenario']): r for r in baseline['results']}
+    regressions = []
+    for result in results:
+        previous = baseline.get((result['rule'], result['scenario']))
+        if previous and result['nsPerMessage'] > previous['nsPerMessage'] * (1 + tolerance):
+            regressions.append((result, previous))
+    for result, previous in regressions:
+        print(f"REGRESSION {result['rule']} {result['scenario']}: "
+              f"{previous['nsPerMessage']:,} -> {result['nsPerMessage']:,} ns/msg")
+    return regressions
+
+def main(args):
+    # Read the baseline first: --out may point at the same file
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    results = asyncio.run(run(args))
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'recordedAt': int(time.time()),
+        'messages': args.messages,
+        'repeat': args.repeat,
+        'seed': args.seed,
+        'results': results,
+    }
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.out}")
+
+    if baseline and compare(results, baseline, args.tolerance):
+        return 2
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Automod per-rule micro-benchmarks")
+    parser.add_argument("--messages", type=int, default=2000, help="messages per corpus")
+    parser.add_argument("--repeat", type=int, default=5, help="passes per scenario; the fastest is kept")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--out", default="automod-bench.json")
+    parser.add_argument("--baseline", help="earlier --out file to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown over the baseline, as a fraction")
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,332 @@
+"""Latency and query-count benchmark for the database.py functions against a local Postgres.
+
+Provisions a throwaway schema through initDb (so every migration runs), seeds it
+with generate_series, then times each public function with randomized arguments.
+
+Usage:
+    BENCH_DATABASE_URL=postgresql://localhost/abyss_bench DATABASE_SSL=0 \
+        python -m benchmarks.databaseBench [--scale small|full] [--iterations 200] [--json db-bench.json]
+
+--scale full seeds 10k guilds, 1M tasks and 5M audit rows; small is a tenth of that.
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+
+SCHEMA = "bench_database"
+if os.getenv("BENCH_DATABASE_URL"):
+    os.environ["DATABASE_URL"] = os.environ["BENCH_DATABASE_URL"]
+os.environ["DATABASE_SCHEMA"] = SCHEMA
+os.environ["STORAGE_BACKEND"] = "postgres"
+# Only the pool wrapper below is wanted; per-function histograms would be timed twice
+os.environ.setdefault("METRICS_ENABLED", "0")
+
+import asyncpg
+import database
+from storage.postgres import createSslContext
+
+SCALES = {
+    'small': {'guilds': 1_000, 'tasks': 100_000, 'bugs': 30_000, 'audit': 500_000, 'warnings': 50_000, 'checklists': 20_000},
+    'full': {'guilds': 10_000, 'tasks': 1_000_000, 'bugs': 300_000, 'audit': 5_000_000, 'warnings': 500_000, 'checklists': 200_000},
+}
+PROJECTS_PER_GUILD = 3
+USERS_PER_GUILD = 50
+
+# ─────────────────────────────────────────────
+# Query Counting
+# ─────────────────────────────────────────────
+
+class _CountedAcquire:
+    def __init__(self, owner, context):
+        self.owner = owner
+        self.context = context
+
+    async def __aenter__(self):
+        conn = await self.context.__aenter__()
+        raw = conn._con if hasattr(conn, "_con") else conn
+        if id(raw) not in self.owner.logged:
+            self.owner.logged.add(id(raw))
+            conn.add_query_logger(self.owner.onQuery)
+        return conn
+
+    async def __aexit__(self, *exc):
+        return await self.context.__aexit__(*exc)
+
+class CountingPool:
+    """Wraps the storage backend's pool and counts every statement sent, via asyncpg query loggers."""
+
+    def __init__(self, pool):
+        self._pool = pool
+        self.logged = set()
+        self.queries = 0
+
+    def onQuery(self, record):
+        self.queries += 1
+
+    def acquire(self, *, timeout=None):
+        return _CountedAcquire(self, self._pool.acquire(timeout=timeout))
+
+    def __getattr__(self, name):
+        return getattr(self._pool, name)
+
+# ─────────────────────────────────────────────
+# Seeding
+# ─────────────────────────────────────────────
+
+async def seed(conn, scale):
+    g = scale['guilds']
+    await conn.execute("SELECT setseed(0.42)")
+    steps = [
+        ("projects", f"""
+            INSERT INTO projects (guild_id, guild_seq, name, created_at)
+            SELECT gid::text, p, 'project ' || p, 0
+            FROM generate_series(1, {g}) gid, generate_series(1, {PROJECTS_PER_GUILD}) p
+            ORDER BY gid, p
+        """),
+        ("tasks", f"""
+            INSERT INTO tasks (guild_id, guild_seq, project_id, title, status, priority, assignee_id, creator_id, created_at, updated_at)
+            SELECT (i % {g} + 1)::text, i / {g} + 1, p.id,
+                   'task ' || i,
+                   (ARRAY['backlog','todo','in_progress','review','done'])[1 + (random() * 4)::int],
+                   (ARRAY['low','medium','high','critical'])[1 + (random() * 3)::int],
+                   'u' || (random() * {USERS_PER_GUILD})::int, 'u0', i, i
+            FROM generate_series(0, {scale['tasks']} - 1) i
+            JOIN projects p ON p.guild_id = (i % {g} + 1)::text AND p.guild_seq = (i / {g}) % {PROJECTS_PER_GUILD} + 1
+            ORDER BY i
+        """),
+        ("bugs", f"""
+            INSERT INTO bugs (guild_id, guild_seq, project_id, title, severity, status, assignee_id, reporter_id, created_at, updated_at)
+            SELECT (i % {g} + 1)::text, i / {g} + 1, p.id,
+                   'bug ' || i,
+                   (ARRAY['low','medium','high','critical'])[1 + (random() * 3)::int],
+                   (ARRAY['new','open','in_progress','resolved','closed'])[1 + (random() * 4)::int],
+                   'u' || (random() * {USERS_PER_GUILD})::int, 'u0', i, i
+            FROM generate_series(0, {scale['bugs']} - 1) i
+            JOIN projects p ON p.guild_id = (i % {g} + 1)::text AND p.guild_seq = (i / {g}) % {PROJECTS_PER_GUILD} + 1
+            ORDER BY i
+        """),
+        ("audit_log", f"""
+            INSERT INTO audit_log (guild_id, action, entity_type, entity_id, user_id, details, created_at)
+            SELECT (i % {g} + 1)::text, 'update', (ARRAY['task','bug','project'])[1 + i % 3],
+                   1 + (random() * 1000)::int, 'u' || (random() * {USERS_PER_GUILD})::int, '', i
+            FROM generate_series(0, {scale['audit']} - 1) i
+        """),
+        ("warnings", f"""
+            INSERT INTO warnings (guild_id, user_id, moderator_id, reason, timestamp)
+            SELECT (i % {g} + 1)::text, 'u' || (random() * {USERS_PER_GUILD})::int, 'u0', 'spam', i
+            FROM generate_series(0, {scale['warnings']} - 1) i
+        """),
+        ("checklists", f"""
+            INSERT INTO checklists (guild_id, guild_seq, name, created_by, created_at)
+            SELECT (i % {g} + 1)::text, i / {g} + 1, 'checklist ' || i, 'u0', i
+            FROM generate_series(0, {scale['checklists']} - 1) i
+        """),
+        ("checklist_items", """
+            INSERT INTO checklist_items (checklist_id, item_seq, text)
+            SELECT c.id, n, 'item ' || n FROM checklists c, generate_series(1, 8) n
+        """),
+        ("task_bug_links", """
+            INSERT INTO task_bug_links (task_id, bug_id)
+            SELECT t.id, b.id FROM bugs b
+            JOIN tasks t ON t.guild_id = b.guild_id AND t.guild_seq = b.guild_seq
+            ON CONFLICT DO NOTHING
+        """),
+        ("team_roles", f"""
+            INSERT INTO team_roles (guild_id, user_id, role)
+            SELECT gid::text, 'u' || u, (ARRAY['admin','lead','developer','qa','viewer'])[1 + u % 5]
+            FROM generate_series(1, {g}) gid, generate_series(0, {USERS_PER_GUILD}) u
+        """),
+        ("guild_counters", """
+            INSERT INTO guild_counters (guild_id, entity_type, next_seq)
+            SELECT guild_id, 'task', MAX(guild_seq) FROM tasks GROUP BY guild_id
+            UNION ALL SELECT guild_id, 'bug', MAX(guild_seq) FROM bugs GROUP BY guild_id
+            UNION ALL SELECT guild_id, 'checklist', MAX(guild_seq) FROM checklists GROUP BY guild_id
+            UNION ALL SELECT guild_id, 'project', MAX(guild_seq) FROM projects GROUP BY guild_id
+            ON CONFLICT (guild_id, entity_type) DO UPDATE SET next_seq = EXCLUDED.next_seq
+        """),
+    ]
+    for table, sql in steps:
+        start = time.perf_counter()
+        await conn.execute(sql)
+        print(f"Seeded {table} in {time.perf_counter() - start:.1f}s")
+    await conn.execute("ANALYZE")
+
+async def loadIds(conn):
+    """The ids the seed actually produced; SERIAL columns needn't start at 1, e.g. under --reuse."""
+    projects = await conn.fetch("SELECT guild_id, array_agg(id ORDER BY id) AS ids FROM projects GROUP BY guild_id")
+    taskSeqs = await conn.fetch("SELECT guild_id, MAX(guild_seq) AS top FROM tasks GROUP BY guild_id")
+    return {
+        'projects': {row['guild_id']: row['ids'] for row in projects},
+        'taskSeqs': {row['guild_id']: row['top'] for row in taskSeqs},
+        'bugs': [row['id'] for row in await conn.fetch("SELECT id FROM bugs ORDER BY id")],
+    }
+
+# ─────────────────────────────────────────────
+# Cases
+# ─────────────────────────────────────────────
+
+def cases(scale, ids):
+    """(name, concurrency, call(rng)) for each benchmarked function, drawing ids from loadIds()."""
+    g = scale['guilds']
+
+    def guild(rng):
+        return str(rng.randint(1, g))
+
+    def project(rng, guildId):
+        return rng.choice(ids['projects'][guildId])
+
+    def user(rng):
+        return f"u{rng.randint(0, USERS_PER_GUILD)}"
+
+    async def getTasksFiltered(rng):
+        gid = guild(rng)
+        await database.getTasks(gid, project(rng, gid), {'status': rng.choice(['todo', 'review'])})
+
+    async def getTasksPlain(rng):
+        gid = guild(rng)
+        await database.getTasks(gid, project(rng, gid))
+
+    async def getBugsFiltered(rng):
+        gid = guild(rng)
+        await database.getBugs(gid, project(rng, gid), {'status': 'new'})
+
+    async def checklistsWithItems(rng):
+        gid = guild(rng)
+        for checklist in (await database.getChecklists(gid))[:5]:
+            await database.getChecklistItems(checklist['id'])
+
+    async def configCold(rng):
+        gid = guild(rng)
+        database.invalidateConfigCache(gid)
+        await database.getConfig(gid, "prefix")
+
+    async def createTask(rng):
+        gid = guild(rng)
+        await database.createTask(gid, project(rng, gid), "bench task", "", "medium", user(rng), "u0", int(time.time()))
+
+    async def taskCounts(rng):
+        gid = guild(rng)
+        await database.getTaskCounts(gid, project(rng, gid))
+
+    async def bugCounts(rng):
+        gid = guild(rng)
+        await database.getBugCounts(gid, project(rng, gid))
+
+    async def getTask(rng):
+        gid = guild(rng)
+        await database.getTask(gid, rng.randint(1, ids['taskSeqs'][gid]))
+
+    async def logAudit(rng):
+        await database.logAudit(guild(rng), "update", "task", rng.randint(1, 1000), user(rng), "", int(time.time()))
+
+    return [
+        ("getConfig (cached)", 1, lambda rng: database.getConfig(guild(rng), "prefix")),
+        ("getConfig (cold)", 1, configCold),
+        ("setConfig", 1, lambda rng: database.setConfig(guild(rng), "maxMentions", str(rng.randint(5, 20)))),
+        ("getTasks", 1, getTasksPlain),
+        ("getTasks (status)", 1, getTasksFiltered),
+        ("getBugs (status)", 1, getBugsFiltered),
+        ("getTaskCounts", 1, taskCounts),
+        ("getBugCounts", 1, bugCounts),
+        ("getUserWorkload", 1, lambda rng: database.getUserWorkload(guild(rng), user(rng))),
+        ("getAuditLog", 1, lambda rng: database.getAuditLog(guild(rng))),
+        ("getAuditLog (entity)", 1, lambda rng: database.getAuditLog(guild(rng), "task", rng.randint(1, 1000))),
+        ("getWarnings", 1, lambda rng: database.getWarnings(guild(rng), user(rng))),
+        ("getChecklists + items", 1, checklistsWithItems),
+        ("getTeamMembers", 1, lambda rng: database.getTeamMembers(guild(rng))),
+        ("hasTeamPermission", 1, lambda rng: database.hasTeamPermission(guild(rng), user(rng), "developer")),
+        ("getLinkedTasks", 1, lambda rng: database.getLinkedTasks(rng.choice(ids['bugs']))),
+        ("getTask", 1, getTask),
+        ("createTask x1", 1, createTask),
+        ("createTask x16", 16, createTask),
+        ("logAudit x16", 16, logAudit),
+    ]
+
+def _percentile(values, q):
+    return values[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+async def runCase(counter, name, concurrency, call, iterations, seed):
+    rng = random.Random(seed)
+    latencies = []
+    queriesBefore = counter.queries
+
+    async def worker(count):
+        for _ in range(count):
+            start = time.perf_counter()
+            await call(rng)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(iterations // concurrency) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    calls = len(latencies)
+    return {
+        'name': name,
+        'concurrency': concurrency,
+        'calls': calls,
+        'throughput': calls / elapsed if elapsed else 0.0,
+        'meanMs': sum(latencies) / calls * 1000 if calls else 0.0,
+        'p50Ms': _percentile(latencies, 0.50) * 1000,
+        'p95Ms': _percentile(latencies, 0.95) * 1000,
+        'p99Ms': _percentile(latencies, 0.99) * 1000,
+        'queriesPerCall': (counter.queries - queriesBefore) / calls if calls else 0.0,
+    }
+
+async def main(args):
+    url = os.getenv("DATABASE_URL")
+    if not url:
+        print("Set BENCH_DATABASE_URL to a scratch Postgres database.")
+        return 1
+    scale = SCALES[args.scale]
+
+    admin = await asyncpg.connect(url, ssl=createSslContext())
+    try:
+        exists = await admin.fetchval("SELECT EXISTS (SELECT 1 FROM pg_namespace WHERE nspname = $1)", SCHEMA)
+        if exists and not args.reuse:
+            await admin.execute(f"DROP SCHEMA {SCHEMA} CASCADE")
+            exists = False
+        await admin.execute(f"CREATE SCHEMA IF NOT EXISTS {SCHEMA}")
+
+        if not await database.initDb():
+            return 1
+        async with database.storage.pool.acquire() as conn:
+            if not exists:
+                await seed(conn, scale)
+            ids = await loadIds(conn)
+        print("Bootstrapping guild configs...")
+        await database.bootstrapGuilds(range(1, scale['guilds'] + 1))
+
+        counter = CountingPool(database.storage.pool)
+        database.storage.pool = counter
+        results = []
+        for name, concurrency, call in cases(scale, ids):
+            result = await runCase(counter, name, concurrency, call, args.iterations, args.seed)
+            results.append(result)
+            print(f"{name:<24} c={concurrency:<3} p50 {result['p50Ms']:8.3f}ms  p95 {result['p95Ms']:8.3f}ms  "
+                  f"p99 {result['p99Ms']:8.3f}ms  {result['throughput']:8.0f}/s  queries/call {result['queriesPerCall']:.2f}")
+        await counter.close()
+    finally:
+        if not args.keep:
+            await admin.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        await admin.close()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({'scale': args.scale, 'sizes': scale, 'iterations': args.iterations, 'results': results}, f, indent=2)
+        print(f"Wrote {args.json}")
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="database.py latency benchmark")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--iterations", type=int, default=200, help="calls per function")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--keep", action="store_true", help="keep the seeded schema afterwards")
+    parser.add_argument("--reuse", action="store_true", help="reuse a schema kept by an earlier --keep run")
+    sys.exit(asyncio.run(main(parser.parse_args())))
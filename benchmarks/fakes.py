@@ -0,0 +1,103 @@
+"""Minimal stand-ins for the discord.py objects the automod and audit cogs read.
+
+Only the attributes those cogs touch are provided; anything that would hit the
+network (delete, send) is a no-op that counts calls.
+"""
+import datetime
+from types import SimpleNamespace
+
+EPOCH = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+
+class FakeRole:
+    def __init__(self, id):
+        self.id = id
+        self.mention = f"<@&{id}>"
+
+class FakeMember:
+    def __init__(self, id, name="user", bot=False, roles=(), guild=None):
+        self.id = id
+        self.name = name
+        self.display_name = name
+        self.bot = bot
+        self.roles = [FakeRole(r) for r in roles]
+        self.guild = guild
+        self.mention = f"<@{id}>"
+        self.display_avatar = SimpleNamespace(url="https://cdn.discordapp.com/embed/avatars/0.png")
+        self.created_at = EPOCH
+        self.joined_at = EPOCH
+
+    def __str__(self):
+        return self.name
+
+class FakeChannel:
+    def __init__(self, id, guild):
+        self.id = id
+        self.guild = guild
+        self.mention = f"<#{id}>"
+        self.sent = 0
+
+    async def send(self, *args, **kwargs):
+        self.sent += 1
+
+class FakeGuild:
+    def __init__(self, id):
+        self.id = id
+        self.name = f"guild-{id}"
+        self.system_channel = None
+        self.channels = {}
+
+    def get_channel(self, id):
+        return self.channels.get(id)
+
+    def channel(self, id):
+        if id not in self.channels:
+            self.channels[id] = FakeChannel(id, self)
+        return self.channels[id]
+
+class FakeAttachment:
+    def __init__(self, filename, size):
+        self.filename = filename
+        self.size = size
+
+class FakeMessage:
+    deleted = 0
+
+    def __init__(self, id, content, author, guild, channel, mentions=(), roleMentions=(),
+                 mentionEveryone=False, attachments=()):
+        self.id = id
+        self.content = content
+        self.author = author
+        self.guild = guild
+        self.channel = channel
+        self.mentions = list(mentions)
+        self.role_mentions = list(roleMentions)
+        self.mention_everyone = mentionEveryone
+        self.attachments = list(attachments)
+
+    async def delete(self):
+        FakeMessage.deleted += 1
+
+class FakeWorld:
+    """Guilds, channels and members rebuilt from recorded ids as they are first seen."""
+
+    def __init__(self):
+        self.guilds = {}
+
+    def guild(self, id):
+        if id not in self.guilds:
+            self.guilds[id] = FakeGuild(id)
+        return self.guilds[id]
+
+    def member(self, data, guild):
+        return FakeMember(data['id'], data['name'], data['bot'], data['roles'], guild)
+
+    def message(self, data):
+        guild = self.guild(data['guild'])
+        return FakeMessage(
+            data['id'], data['content'],
+            self.member(data['author'], guild), guild, guild.channel(data['channel']),
+            mentions=[FakeMember(i) for i in data['mentions']],
+            roleMentions=[FakeRole(i) for i in data['roleMentions']],
+            mentionEveryone=data['mentionEveryone'],
+            attachments=[FakeAttachment(name, size) for name, size in data['attachments']],
+        )
@@ -0,0 +1,101 @@
+"""Statement-cache savings: the databaseBench read cases with prepared statements off and on.
+
+Each case runs once with DB_POOL_MODE=transaction (statement_cache_size=0, what a PgBouncer
+transaction pooler needs) and once with DB_POOL_MODE=session (cached prepared statements),
+against the same seeded schema as benchmarks/databaseBench.py.
+
+Usage:
+    BENCH_DATABASE_URL=postgresql://localhost/abyss_bench DATABASE_SSL=0 \
+        python -m benchmarks.preparedStatements [--scale small] [--iterations 500] [--json prepared.json]
+
+Point BENCH_DATABASE_URL at the server the bot really uses (or add latency) to see the network
+share; on localhost the difference is almost all parse and plan time.
+"""
+import os
+import sys
+import json
+import asyncio
+import argparse
+
+# Sets DATABASE_URL, DATABASE_SCHEMA and STORAGE_BACKEND before database is imported
+from benchmarks.databaseBench import SCHEMA, SCALES, CountingPool, seed, cases, runCase
+import asyncpg
+import database
+from storage.postgres import createSslContext
+
+MODES = ["transaction", "session"]
+
+# Cases that never reach the database would only measure the config cache
+SKIP = {"getConfig (cached)", "setConfig", "createTask x1", "createTask x16", "logAudit x16"}
+
+async def runMode(mode, scale, args):
+    os.environ["DB_POOL_MODE"] = mode
+    if not await database.initDb():
+        raise RuntimeError("initDb failed")
+    counter = CountingPool(database.storage.pool)
+    database.storage.pool = counter
+    results = {}
+    try:
+        for name, concurrency, call in cases(scale):
+            if name in SKIP:
+                continue
+            # Fill every pooled connection's cache first; steady state is what the bot runs in
+            await runCase(counter, name, concurrency, call, args.warmup, args.seed + 1)
+            results[name] = await runCase(counter, name, concurrency, call, args.iterations, args.seed)
+    finally:
+        await database.closeDb()
+    return results
+
+async def main(args):
+    url = os.getenv("DATABASE_URL")
+    if not url:
+        print("Set BENCH_DATABASE_URL to a scratch Postgres database.")
+        return 1
+    scale = SCALES[args.scale]
+
+    admin = await asyncpg.connect(url, ssl=createSslContext())
+    try:
+        exists = await admin.fetchval("SELECT EXISTS (SELECT 1 FROM pg_namespace WHERE nspname = $1)", SCHEMA)
+        if not exists:
+            await admin.execute(f"CREATE SCHEMA {SCHEMA}")
+            if not await database.initDb():
+                return 1
+            async with database.storage.pool.acquire() as conn:
+                await seed(conn, scale)
+            await database.closeDb()
+        else:
+            print(f"Reusing the existing {SCHEMA} schema.")
+
+        byMode = {}
+        for mode in MODES:
+            print(f"Running with DB_POOL_MODE={mode}...")
+            byMode[mode] = await runMode(mode, scale, args)
+    finally:
+        if not args.keep:
+            await admin.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        await admin.close()
+
+    rows = []
+    print(f"\n{'case':<24}{'unprepared p50':>16}{'prepared p50':>14}{'saved':>9}{'speedup':>9}")
+    for name, unprepared in byMode["transaction"].items():
+        prepared = byMode["session"][name]
+        saved = unprepared['p50Ms'] - prepared['p50Ms']
+        speedup = unprepared['meanMs'] / prepared['meanMs'] if prepared['meanMs'] else 0.0
+        rows.append({'name': name, 'unprepared': unprepared, 'prepared': prepared, 'p50SavedMs': saved, 'meanSpeedup': speedup})
+        print(f"{name:<24}{unprepared['p50Ms']:>14.3f}ms{prepared['p50Ms']:>12.3f}ms{saved:>7.3f}ms{speedup:>8.2f}x")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({'scale': args.scale, 'iterations': args.iterations, 'results': rows}, f, indent=2)
+        print(f"Wrote {args.json}")
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prepared statements vs statement_cache_size=0")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--iterations", type=int, default=500, help="measured calls per case and mode")
+    parser.add_argument("--warmup", type=int, default=50, help="unmeasured calls per case before measuring")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--keep", action="store_true", help="keep the seeded schema for a later run")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,169 @@
+"""Compare query plans for the hot SDLC/moderation queries before and after m0005's indexes.
+
+Builds the schema in a scratch Postgres schema, seeds synthetic rows, runs
+EXPLAIN (ANALYZE, BUFFERS) on each query, applies the index migration and runs them again.
+
+Usage:
+    BENCH_DATABASE_URL=postgresql://localhost/abyss_bench DATABASE_SSL=0 python -m benchmarks.queryPlans [--rows 200000] [--json plans.json]
+"""
+import os
+import sys
+import json
+import asyncio
+import argparse
+import asyncpg
+from migrations import m0001_initial_schema, m0005_query_indexes
+from storage.postgres import createSslContext
+
+SCHEMA = "bench_query_plans"
+
+# (name, sql, params, index it exists for) mirroring the queries in storage/postgres.py;
+# every m0005 index has at least one query here so an index the planner ignores shows up
+QUERIES = [
+    ("getTasks", "SELECT * FROM tasks WHERE guild_id = $1 AND project_id = $2 ORDER BY created_at DESC", ["7", 70], "idx_tasks_project_created"),
+    ("getTasks[status]", "SELECT * FROM tasks WHERE guild_id = $1 AND project_id = $2 AND status = $3 ORDER BY created_at DESC", ["7", 70, "review"], "idx_tasks_project_status_created"),
+    ("getBugs", "SELECT * FROM bugs WHERE guild_id = $1 AND project_id = $2 ORDER BY created_at DESC", ["7", 70], "idx_bugs_project_created"),
+    ("getBugs[status]", "SELECT * FROM bugs WHERE guild_id = $1 AND project_id = $2 AND status = $3 ORDER BY created_at DESC", ["7", 70, "new"], "idx_bugs_project_status_created"),
+    ("getBugCounts", "SELECT severity, COUNT(*) as count FROM bugs WHERE guild_id = $1 AND project_id = $2 AND status != 'closed' GROUP BY severity", ["7", 70], "idx_bugs_open_project_severity"),
+    ("getUserWorkload[tasks]", "SELECT COUNT(*) FROM tasks WHERE guild_id = $1 AND assignee_id = $2 AND status NOT IN ('done', 'backlog')", ["7", "u3"], "idx_tasks_open_assignee"),
+    ("getUserWorkload[bugs]", "SELECT COUNT(*) FROM bugs WHERE guild_id = $1 AND assignee_id = $2 AND status != 'closed'", ["7", "u3"], "idx_bugs_open_assignee"),
+    ("getWarnings", "SELECT moderator_id, reason, timestamp FROM warnings WHERE guild_id = $1 AND user_id = $2 ORDER BY timestamp DESC", ["7", "u3"], "idx_warnings_guild_user"),
+    ("getAuditLog", "SELECT * FROM audit_log WHERE guild_id = $1 ORDER BY created_at DESC LIMIT $2", ["7", 50], "idx_audit_log_guild_created"),
+    ("getAuditLog[entity]", "SELECT * FROM audit_log WHERE guild_id = $1 AND entity_type = $2 AND entity_id = $3 ORDER BY created_at DESC LIMIT $4", ["7", "task", 1206, 50], "idx_audit_log_entity_created"),
+    ("getLinkedTasks", "SELECT task_id FROM task_bug_links WHERE bug_id = $1", [1234], "idx_task_bug_links_bug"),
+    ("getChecklistItems", "SELECT * FROM checklist_items WHERE checklist_id = $1 ORDER BY item_seq ASC", [42], "idx_checklist_items_checklist"),
+    ("getComments", "SELECT * FROM task_comments WHERE task_id = $1 ORDER BY created_at ASC", [1234], "idx_task_comments_task"),
+]
+
+async def seed(conn, rows, guilds, projectsPerGuild, users):
+    await conn.execute("SELECT setseed(0.42)")
+    await conn.execute("""
+        INSERT INTO projects (guild_id, guild_seq, name, created_at)
+        SELECT g::text, p, 'project ' || p, 0
+        FROM generate_series(1, $1) g, generate_series(1, $2) p
+        ORDER BY g, p
+    """, guilds, projectsPerGuild)
+    for table, statuses, extra, extraValues in [
+        ("tasks", "{backlog,todo,in_progress,review,done}", "priority, creator_id", "'medium', 'u0'"),
+        ("bugs", "{new,open,in_progress,resolved,closed}", "severity, reporter_id", "(ARRAY['low','medium','high','critical'])[1 + (random() * 3)::int], 'u0'"),
+    ]:
+        await conn.execute(f"""
+            INSERT INTO {table} (guild_id, guild_seq, project_id, title, status, assignee_id, {extra}, created_at, updated_at)
+            SELECT (i % $2 + 1)::text, i,
+                   (i % $2) * $3 + (i / $2) % $3 + 1,
+                   'item ' || i,
+                   ('{statuses}'::text[])[1 + (random() * 4)::int],
+                   'u' || (random() * $4)::int,
+                   {extraValues}, i, i
+            FROM generate_series(1, $1) i
+        """, rows, guilds, projectsPerGuild, users)
+    await conn.execute("""
+        INSERT INTO warnings (guild_id, user_id, moderator_id, reason, timestamp)
+        SELECT (i % $2 + 1)::text, 'u' || (random() * $3)::int, 'u0', 'spam', i
+        FROM generate_series(1, $1) i
+    """, rows, guilds, users)
+    await conn.execute("""
+        INSERT INTO audit_log (guild_id, action, entity_type, entity_id, user_id, created_at)
+        SELECT (i % $2 + 1)::text, 'update', 'task', i, 'u0', i
+        FROM generate_series(1, $1) i
+    """, rows, guilds)
+    await conn.execute("""
+        INSERT INTO task_bug_links (task_id, bug_id)
+        SELECT i, 1 + (random() * ($1 - 1))::int FROM generate_series(1, $1) i
+        ON CONFLICT DO NOTHING
+    """, rows)
+    await conn.execute("""
+        INSERT INTO checklists (guild_id, guild_seq, name, created_by, created_at)
+        SELECT (i % $2 + 1)::text, i, 'list ' || i, 'u0', i FROM generate_series(1, $1) i
+    """, max(rows // 10, 1), guilds)
+    await conn.execute("""
+        INSERT INTO checklist_items (checklist_id, item_seq, text)
+        SELECT i % $2 + 1, i / $2 + 1, 'item ' || i FROM generate_series(1, $1) i
+    """, rows, max(rows // 10, 1))
+    await conn.execute("""
+        INSERT INTO task_comments (task_id, user_id, content, created_at)
+        SELECT 1 + (random() * ($1 - 1))::int, 'u0', 'comment ' || i, i FROM generate_series(1, $1) i
+    """, rows)
+    await conn.execute("ANALYZE")
+
+def summarize(plan):
+    """Flatten a JSON plan into the node descriptions that matter when reading it."""
+    nodes = []
+    def walk(node):
+        label = node["Node Type"]
+        if "Index Name" in node:
+            label += f" using {node['Index Name']}"
+        elif "Relation Name" in node:
+            label += f" on {node['Relation Name']}"
+        nodes.append(label)
+        for child in node.get("Plans", ()):
+            walk(child)
+    walk(plan["Plan"])
+    return {
+        "nodes": nodes,
+        "executionMs": plan["Execution Time"],
+        "sharedHit": plan["Plan"].get("Shared Hit Blocks", 0),
+        "sharedRead": plan["Plan"].get("Shared Read Blocks", 0),
+    }
+
+async def explainAll(conn):
+    results = {}
+    for name, sql, params, _ in QUERIES:
+        raw = await conn.fetchval(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}", *params)
+        results[name] = summarize(json.loads(raw)[0])
+    return results
+
+async def main(args):
+    url = os.getenv("BENCH_DATABASE_URL") or os.getenv("DATABASE_URL")
+    if not url:
+        print("Set BENCH_DATABASE_URL to a scratch Postgres database.")
+        return 1
+
+    conn = await asyncpg.connect(url, ssl=createSslContext())
+    try:
+        await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        await conn.execute(f"CREATE SCHEMA {SCHEMA}")
+        await conn.execute(f"SET search_path TO {SCHEMA}")
+        await m0001_initial_schema.up(conn)
+        print(f"Seeding {args.rows} rows per table across {args.guilds} guilds...")
+        await seed(conn, args.rows, args.guilds, args.projects, args.users)
+
+        before = await explainAll(conn)
+        await m0005_query_indexes.up(conn)
+        await conn.execute("ANALYZE")
+        after = await explainAll(conn)
+    finally:
+        if not args.keep:
+            await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        await conn.close()
+
+    print(f"\n{'query':<24}{'before ms':>12}{'after ms':>12}{'speedup':>10}")
+    unused = set(m0005_query_indexes.INDEXES)
+    for name, _, _, index in QUERIES:
+        b, a = before[name], after[name]
+        used = [node for node in a["nodes"] if " using idx_" in node]
+        unused -= {node.split(" using ")[1] for node in used}
+        a["usesTargetIndex"] = any(node.endswith(f" using {index}") for node in used)
+        speedup = b["executionMs"] / a["executionMs"] if a["executionMs"] else float("inf")
+        print(f"{name:<24}{b['executionMs']:>12.3f}{a['executionMs']:>12.3f}{speedup:>9.1f}x")
+        print(f"    before: {' > '.join(b['nodes'])}")
+        print(f"    after:  {' > '.join(a['nodes'])}{'' if a['usesTargetIndex'] else f'   ({index} not used)'}")
+    if unused:
+        print(f"\nIndexes no plan used: {', '.join(sorted(unused))}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"rows": args.rows, "guilds": args.guilds, "before": before, "after": after,
+                       "unusedIndexes": sorted(unused)}, f, indent=2)
+        print(f"\nWrote {args.json}")
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000, help="rows per seeded table")
+    parser.add_argument("--guilds", type=int, default=50)
+    parser.add_argument("--projects", type=int, default=10, help="projects per guild")
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--json", help="also write the plan summaries to this file")
+    parser.add_argument("--keep", action="store_true", help="keep the scratch schema for manual inspection")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,148 @@
+"""Replay a recorded event file through the real automod and audit cogs, offline.
+
+Record traffic by running the bot with EVENT_RECORD_PATH=events.jsonl.gz, then:
+
+    BENCH_DATABASE_URL=postgresql://localhost/abyss_bench DATABASE_SSL=0 \
+        python -m benchmarks.replay events.jsonl.gz [--enable-all] [--realtime] [--json out.json]
+
+or without any database, measuring the cogs alone:
+
+    STORAGE_BACKEND=memory python -m benchmarks.replay events.jsonl.gz --enable-all
+
+Reports messages per second, p50/p99 automod latency per message, database.py calls
+per message (config-cache hits included) and pool acquires per message, which are the
+queries that actually reached the database. Events are fed as fast as possible unless --realtime is given;
+note the spam filter keys on wall-clock time, so fast replays trip it more often.
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+
+# Instrumentation must be on before database.py is imported so its functions get wrapped
+os.environ.setdefault("METRICS_ENABLED", "1")
+if os.getenv("BENCH_DATABASE_URL"):
+    os.environ["DATABASE_URL"] = os.environ["BENCH_DATABASE_URL"]
+
+from discord.ext import commands
+from config import defaultPrefix, requiredIntents
+from database import initDb, bootstrapGuilds, setConfig
+from eventRecording import readEvents
+from benchmarks.fakes import FakeWorld, FakeMessage
+import metrics
+
+EXTENSIONS = [
+    "cogs.automod",
+    "cogs.spamFilter",
+    "cogs.attachmentFilter",
+    "cogs.mentionFilter",
+    "cogs.messageLimitFilter",
+    "cogs.linkFilter",
+    "cogs.wordFilter",
+    "cogs.audit",
+]
+
+FILTER_FLAGS = ["spamEnabled", "attachmentEnabled", "mentionEnabled", "messageLimitEnabled", "linkFilterEnabled", "wordFilterEnabled"]
+
+def _percentile(sortedValues, q):
+    if not sortedValues:
+        return 0.0
+    return sortedValues[min(len(sortedValues) - 1, int(q * len(sortedValues)))]
+
+def _histogramCount(name):
+    return sum(h.count for (metric, _), h in metrics.histograms.items() if metric == name)
+
+async def dispatch(bot, event, *args):
+    await asyncio.gather(*(listener(*args) for listener in bot.extra_events.get(f"on_{event}", ())))
+
+async def replay(bot, events, realtime=False):
+    world = FakeWorld()
+    latencies = []
+    counts = {}
+    facadeCallsBefore = _histogramCount("db_query_seconds")
+    acquiresBefore = _histogramCount("db_pool_acquire_seconds")
+    replayStart = time.perf_counter()
+
+    for event in events:
+        if realtime:
+            delay = event['t'] - (time.perf_counter() - replayStart)
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+        kind = event['type']
+        counts[kind] = counts.get(kind, 0) + 1
+        if kind == "message":
+            message = world.message(event['message'])
+            start = time.perf_counter()
+            await dispatch(bot, "message", message)
+            latencies.append(time.perf_counter() - start)
+        elif kind == "edit":
+            after = world.message(event['message'])
+            before = world.message({**event['message'], 'content': event['before']})
+            await dispatch(bot, "message_edit", before, after)
+        elif kind == "delete":
+            await dispatch(bot, "message_delete", world.message(event['message']))
+        elif kind in ("member_join", "member_remove"):
+            guild = world.guild(event['guild'])
+            await dispatch(bot, kind, world.member(event['member'], guild))
+
+    elapsed = time.perf_counter() - replayStart
+    latencies.sort()
+    messages = counts.get("message", 0)
+    return {
+        'events': counts,
+        'seconds': elapsed,
+        'messagesPerSecond': messages / elapsed if elapsed else 0.0,
+        'p50Ms': _percentile(latencies, 0.50) * 1000,
+        'p99Ms': _percentile(latencies, 0.99) * 1000,
+        'deleted': FakeMessage.deleted,
+        'dbFacadeCallsPerMessage': (_histogramCount("db_query_seconds") - facadeCallsBefore) / messages if messages else 0.0,
+        'poolAcquiresPerMessage': (_histogramCount("db_pool_acquire_seconds") - acquiresBefore) / messages if messages else 0.0,
+        'rules': metrics.summarize("automod_rule_seconds"),
+    }
+
+async def main(args):
+    events = list(readEvents(args.recording))
+    guildIds = sorted({e['message']['guild'] if 'message' in e else e['guild'] for e in events})
+    print(f"Loaded {len(events)} events across {len(guildIds)} guild(s).")
+
+    if not await initDb():
+        return 1
+    await bootstrapGuilds(guildIds)
+    if args.enable_all:
+        for guildId in guildIds:
+            for flag in FILTER_FLAGS:
+                await setConfig(guildId, flag, "1")
+
+    bot = commands.Bot(command_prefix=defaultPrefix, intents=requiredIntents)
+    for ext in EXTENSIONS:
+        await bot.load_extension(ext)
+    try:
+        result = await replay(bot, events, realtime=args.realtime)
+    finally:
+        for ext in reversed(EXTENSIONS):
+            await bot.unload_extension(ext)
+
+    print(f"{result['events'].get('message', 0)} messages in {result['seconds']:.2f}s "
+          f"({result['messagesPerSecond']:.0f} msg/s)")
+    print(f"automod latency p50 {result['p50Ms']:.3f}ms  p99 {result['p99Ms']:.3f}ms  deleted {result['deleted']}")
+    print(f"database.py calls/message {result['dbFacadeCallsPerMessage']:.3f}  "
+          f"pool acquires (real queries)/message {result['poolAcquiresPerMessage']:.3f}")
+    for row in result['rules']:
+        print(f"  {row['labels']['rule']:<14} n={row['count']:<8} mean {row['mean'] * 1e6:.1f}us")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"Wrote {args.json}")
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay recorded gateway events offline")
+    parser.add_argument("recording", help="file written by the recorder cog (EVENT_RECORD_PATH)")
+    parser.add_argument("--enable-all", action="store_true", help="turn every filter on for the replayed guilds")
+    parser.add_argument("--realtime", action="store_true", help="keep the recorded spacing between events")
+    parser.add_argument("--json", help="also write the results to this file")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -1,70 +1,30 @@
-import json
-import discord
-from discord.ext import commands
-from database import getConfig, isRoleExempt
-from modlog import sendModLog
+from cogs.automod import AutomodRule, Verdict, registerRule, unregisterRule
 
-class AttachmentFilter(commands.Cog):
-    def __init__(self, bot):
-        self.bot = bot
+class AttachmentFilter(AutomodRule):
+    name = "attachment"
+    cost = 40
 
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        if message.author.bot or not message.guild or not message.attachments:
-            return
+    def check(self, message, policy, features):
+        if not message.attachments or not policy.attachmentEnabled:
+            return None
+        if policy.isExempt("attachment", message.author, message.channel.id):
+            return None
 
-        guildId = message.guild.id
-
-        attachmentEnabled = await getConfig(guildId, "attachmentEnabled")
-        if attachmentEnabled != "1":
-            return
-
-        if await isRoleExempt(guildId, "attachment", message.author.roles):
-            return
-
-        maxAttachments = int(await getConfig(guildId, "maxAttachments") or 5)
-        blockedRaw = await getConfig(guildId, "blockedFileTypes") or "[]"
-        try:
-            blockedFileTypes = json.loads(blockedRaw)
-        except json.JSONDecodeError:
-            blockedFileTypes = []
-
-        if len(message.attachments) > maxAttachments:
+        if len(message.attachments) > policy.maxAttachments:
             attachmentInfo = "\n".join(
                 f"{a.filename} ({a.size} bytes)" for a in message.attachments
             )
-            try:
-                await message.delete()
-            except discord.errors.NotFound:
-                pass
-            await sendModLog(
-                self.bot, guildId,
-                user=message.author,
-                channel=message.channel,
-                rule="Attachment Filter (Count)",
-                messageContent=message.content,
-                attachmentInfo=attachmentInfo
-            )
-            return
+            return Verdict("Attachment Filter (Count)", {"attachmentInfo": attachmentInfo})
 
-        if blockedFileTypes:
-            for attachment in message.attachments:
-                ext = attachment.filename.rsplit(".", 1)[-1].lower() if "." in attachment.filename else ""
-                if ext in blockedFileTypes:
+        if policy.blockedFileTypes:
+            for attachment, ext in zip(message.attachments, features.attachmentExtensions):
+                if ext in policy.blockedFileTypes:
                     attachmentInfo = f"{attachment.filename} (blocked type: .{ext})"
-                    try:
-                        await message.delete()
-                    except discord.errors.NotFound:
-                        pass
-                    await sendModLog(
-                        self.bot, guildId,
-                        user=message.author,
-                        channel=message.channel,
-                        rule="Attachment Filter (File Type)",
-                        messageContent=message.content,
-                        attachmentInfo=attachmentInfo
-                    )
-                    return
+                    return Verdict("Attachment Filter (File Type)", {"attachmentInfo": attachmentInfo})
+        return None
 
 async def setup(bot):
-    await bot.add_cog(AttachmentFilter(bot))
+    registerRule(bot, AttachmentFilter(bot))
+
+async def teardown(bot):
+    unregisterRule(bot, AttachmentFilter.name)
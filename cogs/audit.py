@@ -1,6 +1,7 @@
 import discord
 from discord.ext import commands
 from database import getConfig
+from modlog import enqueueLog
 import datetime
 
 class Audit(commands.Cog):
@@ -25,7 +26,7 @@ class Audit(commands.Cog):
         embed.add_field(name="Channel", value=message.channel.mention, inline=True)
         embed.set_footer(text=f"User ID: {message.author.id}")
         embed.timestamp = datetime.datetime.now()
-        await channel.send(embed=embed)
+        enqueueLog(self.bot, channel.id, embed)
 
     @commands.Cog.listener()
     async def on_message_edit(self, before, after):
@@ -40,7 +41,7 @@ class Audit(commands.Cog):
         embed.add_field(name="Channel", value=before.channel.mention, inline=True)
         embed.set_footer(text=f"User ID: {before.author.id} • Message ID: {before.id}")
         embed.timestamp = datetime.datetime.now()
-        await channel.send(embed=embed)
+        enqueueLog(self.bot, channel.id, embed)
 
     @commands.Cog.listener()
     async def on_member_join(self, member):
@@ -52,7 +53,7 @@ class Audit(commands.Cog):
         embed.add_field(name="Account Age", value=member.created_at.strftime("%Y-%m-%d %H:%M:%S"), inline=False)
         embed.set_footer(text=f"User ID: {member.id}")
         embed.timestamp = datetime.datetime.now()
-        await channel.send(embed=embed)
+        enqueueLog(self.bot, channel.id, embed)
 
         sys_channel = member.guild.system_channel
         if sys_channel:
@@ -67,7 +68,7 @@ class Audit(commands.Cog):
         embed.set_author(name=member.name, icon_url=member.display_avatar.url)
         embed.set_footer(text=f"User ID: {member.id}")
         embed.timestamp = datetime.datetime.now()
-        await channel.send(embed=embed)
+        enqueueLog(self.bot, channel.id, embed)
 
 async def setup(bot):
     await bot.add_cog(Audit(bot))
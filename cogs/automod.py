@@ -0,0 +1,156 @@
+import abc
+import time
+import inspect
+from typing import NamedTuple, Optional
+import discord
+from discord.ext import commands
+from automodPolicy import getPolicy
+from messageFeatures import MessageFeatures
+from modlog import sendModLog, sendAutomodNotice
+import regexEngine
+import metrics
+import startup
+
+class Verdict(NamedTuple):
+    """Outcome of a rule that matched: the modlog rule name plus extra embed fields."""
+    rule: str
+    details: Optional[dict] = None
+
+class AutomodRule(abc.ABC):
+    """A single automod check run by the AutomodPipeline.
+
+    Subclasses set `name` (the exemption key) and `cost` (lower runs first) and
+    implement check(), which returns a Verdict or None. Checks should stay synchronous;
+    one that has to wait (regex evaluation in the worker pool) may return an awaitable instead.
+    """
+    name = ""
+    cost = 100
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    @abc.abstractmethod
+    def check(self, message, policy, features):
+        """Return a Verdict if the message breaks this rule, else None."""
+
+    async def searchPatterns(self, message, patterns):
+        """Run a guild's PatternSet, telling its log once if the set just got disabled for timing out."""
+        matched = await patterns.search(message.content)
+        if patterns.quarantined and not patterns.quarantineReported:
+            patterns.quarantineReported = True
+            await sendAutomodNotice(
+                self.bot, message.guild.id, "Regex Patterns Disabled",
+                f"The {self.name} filter's regex patterns exceeded the time limit "
+                f"{regexEngine.REGEX_MAX_TIMEOUTS} times and are skipped until they are edited."
+            )
+        return matched
+
+    def close(self):
+        pass
+
+class AutomodPipeline(commands.Cog):
+    """Runs every registered AutomodRule against a message in cost order.
+
+    The first rule to return a Verdict wins: the message is deleted and logged once,
+    and the remaining rules are skipped.
+    """
+    def __init__(self, bot):
+        self.bot = bot
+        self.rules = []
+
+    def addRule(self, rule):
+        self.removeRule(rule.name)
+        self.rules.append(rule)
+        self.rules.sort(key=lambda r: r.cost)
+
+    def removeRule(self, name):
+        for rule in [r for r in self.rules if r.name == name]:
+            rule.close()
+            self.rules.remove(rule)
+
+    async def cog_load(self):
+        await regexEngine.warmPool()
+
+    def cog_unload(self):
+        for rule in self.rules:
+            rule.close()
+        self.rules = []
+        regexEngine.shutdownPool()
+
+    async def evaluate(self, message):
+        """Return the first Verdict for a message, or None if it passes every rule."""
+        policy = await getPolicy(message.guild.id)
+        features = MessageFeatures(message)
+        if metrics.METRICS_ENABLED:
+            return await self.evaluateTimed(message, policy, features)
+        for rule in self.rules:
+            try:
+                verdict = rule.check(message, policy, features)
+                if inspect.isawaitable(verdict):
+                    verdict = await verdict
+            except Exception as e:
+                self.ruleFailed(rule, message, e)
+                continue
+            if verdict:
+                return verdict
+        return None
+
+    async def evaluateTimed(self, message, policy, features):
+        for rule in self.rules:
+            start = time.perf_counter()
+            try:
+                verdict = rule.check(message, policy, features)
+                if inspect.isawaitable(verdict):
+                    verdict = await verdict
+            except Exception as e:
+                self.ruleFailed(rule, message, e)
+                continue
+            metrics.observe("automod_rule_seconds", time.perf_counter() - start, rule=rule.name)
+            if verdict:
+                metrics.incr("automod_verdicts_total", rule=rule.name)
+                return verdict
+        return None
+
+    def ruleFailed(self, rule, message, error):
+        # One broken rule shouldn't stop the others from seeing the message
+        metrics.incr("automod_rule_errors_total", rule=rule.name)
+        print(f"Automod rule {rule.name} failed on message {message.id}: {error!r}")
+
+    async def enforce(self, message, verdict):
+        try:
+            await message.delete()
+        except discord.errors.NotFound:
+            pass
+        await sendModLog(
+            self.bot, message.guild.id,
+            user=message.author,
+            channel=message.channel,
+            rule=verdict.rule,
+            messageContent=message.content,
+            **(verdict.details or {})
+        )
+
+    @commands.Cog.listener()
+    async def on_message(self, message):
+        if message.author.bot or not message.guild:
+            return
+
+        verdict = await self.evaluate(message)
+        startup.markFirstFiltered()
+        if verdict:
+            await self.enforce(message, verdict)
+
+def registerRule(bot, rule):
+    """Attach a rule stage to the loaded AutomodPipeline. Used by the filter extensions' setup()."""
+    pipeline = bot.get_cog("AutomodPipeline")
+    if pipeline is None:
+        raise RuntimeError("cogs.automod must be loaded before automod rule extensions")
+    pipeline.addRule(rule)
+
+def unregisterRule(bot, name):
+    pipeline = bot.get_cog("AutomodPipeline")
+    if pipeline is not None:
+        pipeline.removeRule(name)
+
+async def setup(bot):
+    await bot.add_cog(AutomodPipeline(bot))
@@ -13,8 +13,8 @@ class MyHelp(commands.HelpCommand):
         
         automod_cmds = {"spam", "attachment", "mention", "msglimit", "linkfilter", "wordfilter", "exempt", "setthreshold"}
         mod_cmds = {"kick", "ban", "unban", "mute", "unmute", "purge", "warn", "warnings", "clearwarnings"}
-        config_cmds = {"config", "modlog", "automodlog", "prefix", "setroles", "setperm", "listperms"}
-        util_cmds = {"ping", "lock", "unlock", "slowmode", "whois", "exemptchannel", "unexemptchannel", "listexemptions", "help"}
+        config_cmds = {"config", "modlog", "automodlog", "logwebhook", "prefix", "setroles", "setperm", "listperms"}
+        util_cmds = {"ping", "lock", "unlock", "slowmode", "whois", "exemptchannel", "unexemptchannel", "listexemptions", "stats", "help"}
         
         grouped_commands = {
             "Automod": [],
@@ -128,8 +128,8 @@ class CustomHelp(commands.Cog):
             
             automod_cmds = {"spam", "attachment", "mention", "msglimit", "linkfilter", "wordfilter", "exempt", "setthreshold"}
             mod_cmds = {"kick", "ban", "unban", "mute", "unmute", "purge", "warn", "warnings", "clearwarnings"}
-            config_cmds = {"config", "modlog", "automodlog", "prefix", "setroles", "setperm", "listperms"}
-            util_cmds = {"ping", "lock", "unlock", "slowmode", "whois", "exemptchannel", "unexemptchannel", "listexemptions", "help"}
+            config_cmds = {"config", "modlog", "automodlog", "logwebhook", "prefix", "setroles", "setperm", "listperms"}
+            util_cmds = {"ping", "lock", "unlock", "slowmode", "whois", "exemptchannel", "unexemptchannel", "listexemptions", "stats", "help"}
             
             for cmd in self.bot.tree.walk_commands():
                 if isinstance(cmd, app_commands.Command):
@@ -1,100 +1,37 @@
-import re
-import json
-from urllib.parse import urlparse
-import discord
-from discord.ext import commands
-from database import getConfig, isRoleExempt, getWhitelistDomains, isChannelExempt
-from modlog import sendModLog
+from cogs.automod import AutomodRule, Verdict, registerRule, unregisterRule
 
-urlPattern = re.compile(r"https?://[^\s<>\"']+|www\.[^\s<>\"']+", re.IGNORECASE)
-invitePattern = re.compile(r"(discord\.gg|discord\.com/invite|discordapp\.com/invite)/[a-zA-Z0-9]+", re.IGNORECASE)
+class LinkFilter(AutomodRule):
+    name = "link"
+    cost = 70
 
-class LinkFilter(commands.Cog):
-    def __init__(self, bot):
-        self.bot = bot
+    def check(self, message, policy, features):
+        if not message.content or not policy.linkFilterEnabled:
+            return None
+        if policy.isExempt("link", message.author, message.channel.id):
+            return None
 
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        if message.author.bot or not message.guild or not message.content:
-            return
+        whitelist = policy.whitelistDomains
 
-        guildId = message.guild.id
+        for domain in features.hosts:
+            if not whitelist.match(domain):
+                return Verdict("Link Filter (URL)")
 
-        linkFilterEnabled = await getConfig(guildId, "linkFilterEnabled")
-        if linkFilterEnabled != "1":
-            return
-
-        if await isRoleExempt(guildId, "link", message.author.roles):
-            return
-
-        if await isChannelExempt(guildId, "link", message.channel.id):
-            return
-
-        whitelist = await getWhitelistDomains(guildId)
-        content = message.content
-
-        urls = urlPattern.findall(content)
-        if urls:
-            for url in urls:
-                try:
-                    parsed = urlparse(url if url.startswith("http") else f"http://{url}")
-                    domain = parsed.netloc.lower()
-                except Exception:
-                    domain = ""
-                if domain and domain not in whitelist:
-                    try:
-                        await message.delete()
-                    except discord.errors.NotFound:
-                        pass
-                    await sendModLog(
-                        self.bot, guildId,
-                        user=message.author,
-                        channel=message.channel,
-                        rule="Link Filter (URL)",
-                        messageContent=content
-                    )
-                    return
-
-        if invitePattern.search(content):
+        if features.hasInvite:
             inviteDomains = ["discord.gg", "discord.com", "discordapp.com"]
-            isWhitelisted = any(d in whitelist for d in inviteDomains)
-            if not isWhitelisted:
-                try:
-                    await message.delete()
-                except discord.errors.NotFound:
-                    pass
-                await sendModLog(
-                    self.bot, guildId,
-                    user=message.author,
-                    channel=message.channel,
-                    rule="Link Filter (Invite)",
-                    messageContent=content
-                )
-                return
+            if not any(whitelist.match(d) for d in inviteDomains):
+                return Verdict("Link Filter (Invite)")
 
-        linkRegexRaw = await getConfig(guildId, "linkRegexPatterns") or "[]"
-        try:
-            linkRegexPatterns = json.loads(linkRegexRaw)
-        except json.JSONDecodeError:
-            linkRegexPatterns = []
+        if policy.linkPatterns:
+            return self.checkPatterns(message, policy)
+        return None
 
-        for pattern in linkRegexPatterns:
-            try:
-                if re.search(pattern, content, re.IGNORECASE):
-                    try:
-                        await message.delete()
-                    except discord.errors.NotFound:
-                        pass
-                    await sendModLog(
-                        self.bot, guildId,
-                        user=message.author,
-                        channel=message.channel,
-                        rule="Link Filter (Custom Pattern)",
-                        messageContent=content
-                    )
-                    return
-            except re.error:
-                continue
+    async def checkPatterns(self, message, policy):
+        if await self.searchPatterns(message, policy.linkPatterns):
+            return Verdict("Link Filter (Custom Pattern)")
+        return None
 
 async def setup(bot):
-    await bot.add_cog(LinkFilter(bot))
+    registerRule(bot, LinkFilter(bot))
+
+async def teardown(bot):
+    unregisterRule(bot, LinkFilter.name)
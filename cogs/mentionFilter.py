@@ -1,75 +1,29 @@
-import discord
-from discord.ext import commands
-from database import getConfig, isRoleExempt
-from modlog import sendModLog
+from cogs.automod import AutomodRule, Verdict, registerRule, unregisterRule
 
-class MentionFilter(commands.Cog):
-    def __init__(self, bot):
-        self.bot = bot
+class MentionFilter(AutomodRule):
+    name = "mention"
+    cost = 30
 
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        if message.author.bot or not message.guild:
-            return
+    def check(self, message, policy, features):
+        if not policy.mentionEnabled:
+            return None
+        if policy.isExempt("mention", message.author, message.channel.id):
+            return None
 
-        guildId = message.guild.id
+        totalMentions = features.mentionCount
 
-        mentionEnabled = await getConfig(guildId, "mentionEnabled")
-        if mentionEnabled != "1":
-            return
+        if policy.blockEveryone and message.mention_everyone:
+            return Verdict("Mention Filter (@everyone)", {"mentionCount": totalMentions})
 
-        if await isRoleExempt(guildId, "mention", message.author.roles):
-            return
+        if policy.blockHere and features.mentionsHere:
+            return Verdict("Mention Filter (@here)", {"mentionCount": totalMentions})
 
-        blockEveryone = await getConfig(guildId, "blockEveryone") or "0"
-        blockHere = await getConfig(guildId, "blockHere") or "0"
-        maxMentions = int(await getConfig(guildId, "maxMentions") or 10)
-
-        totalMentions = len(message.mentions) + len(message.role_mentions)
-
-        if blockEveryone == "1" and message.mention_everyone:
-            try:
-                await message.delete()
-            except discord.errors.NotFound:
-                pass
-            await sendModLog(
-                self.bot, guildId,
-                user=message.author,
-                channel=message.channel,
-                rule="Mention Filter (@everyone)",
-                messageContent=message.content,
-                mentionCount=totalMentions
-            )
-            return
-
-        if blockHere == "1" and "@here" in message.content:
-            try:
-                await message.delete()
-            except discord.errors.NotFound:
-                pass
-            await sendModLog(
-                self.bot, guildId,
-                user=message.author,
-                channel=message.channel,
-                rule="Mention Filter (@here)",
-                messageContent=message.content,
-                mentionCount=totalMentions
-            )
-            return
-
-        if totalMentions > maxMentions:
-            try:
-                await message.delete()
-            except discord.errors.NotFound:
-                pass
-            await sendModLog(
-                self.bot, guildId,
-                user=message.author,
-                channel=message.channel,
-                rule="Mention Filter (Count)",
-                messageContent=message.content,
-                mentionCount=totalMentions
-            )
+        if totalMentions > policy.maxMentions:
+            return Verdict("Mention Filter (Count)", {"mentionCount": totalMentions})
+        return None
 
 async def setup(bot):
-    await bot.add_cog(MentionFilter(bot))
+    registerRule(bot, MentionFilter(bot))
+
+async def teardown(bot):
+    unregisterRule(bot, MentionFilter.name)
@@ -1,72 +1,27 @@
-import discord
-from discord.ext import commands
-from database import getConfig, isRoleExempt
-from modlog import sendModLog
+from cogs.automod import AutomodRule, Verdict, registerRule, unregisterRule
 
-class MessageLimitFilter(commands.Cog):
-    def __init__(self, bot):
-        self.bot = bot
+class MessageLimitFilter(AutomodRule):
+    name = "messageLimit"
+    cost = 20
 
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        if message.author.bot or not message.guild or not message.content:
-            return
+    def check(self, message, policy, features):
+        if not message.content or not policy.messageLimitEnabled:
+            return None
+        if policy.isExempt("messageLimit", message.author, message.channel.id):
+            return None
 
-        guildId = message.guild.id
+        if features.charCount > policy.maxCharacters:
+            return Verdict("Message Limit (Characters)")
 
-        messageLimitEnabled = await getConfig(guildId, "messageLimitEnabled")
-        if messageLimitEnabled != "1":
-            return
+        if features.wordCount > policy.maxWords:
+            return Verdict("Message Limit (Words)")
 
-        if await isRoleExempt(guildId, "messageLimit", message.author.roles):
-            return
-
-        maxCharacters = int(await getConfig(guildId, "maxCharacters") or 2000)
-        maxWords = int(await getConfig(guildId, "maxWords") or 500)
-        maxLines = int(await getConfig(guildId, "maxLines") or 30)
-
-        content = message.content
-
-        if len(content) > maxCharacters:
-            try:
-                await message.delete()
-            except discord.errors.NotFound:
-                pass
-            await sendModLog(
-                self.bot, guildId,
-                user=message.author,
-                channel=message.channel,
-                rule="Message Limit (Characters)",
-                messageContent=content
-            )
-            return
-
-        if len(content.split()) > maxWords:
-            try:
-                await message.delete()
-            except discord.errors.NotFound:
-                pass
-            await sendModLog(
-                self.bot, guildId,
-                user=message.author,
-                channel=message.channel,
-                rule="Message Limit (Words)",
-                messageContent=content
-            )
-            return
-
-        if content.count("\n") + 1 > maxLines:
-            try:
-                await message.delete()
-            except discord.errors.NotFound:
-                pass
-            await sendModLog(
-                self.bot, guildId,
-                user=message.author,
-                channel=message.channel,
-                rule="Message Limit (Lines)",
-                messageContent=content
-            )
+        if features.lineCount > policy.maxLines:
+            return Verdict("Message Limit (Lines)")
+        return None
 
 async def setup(bot):
-    await bot.add_cog(MessageLimitFilter(bot))
+    registerRule(bot, MessageLimitFilter(bot))
+
+async def teardown(bot):
+    unregisterRule(bot, MessageLimitFilter.name)
@@ -12,6 +12,8 @@ from database import (
 )
 from modlog import sendModLog
 from config import embedColor
+from regexEngine import validatePattern, findUnsafePattern
+from prefixes import setPrefix
 
 class PrefixCommands(commands.Cog):
     def __init__(self, bot):
@@ -381,7 +383,7 @@ class PrefixCommands(commands.Cog):
     @commands.group(invoke_without_command=True)
     @is_admin()
     async def modlog(self, ctx):
-        await ctx.send(f"Usage: {ctx.prefix}modlog set <#channel>")
+        await ctx.send(f"Usage: {ctx.prefix}modlog set <#channel> | {ctx.prefix}modlog webhook <on/off>")
 
     @modlog.command(name="set")
     @is_admin()
@@ -389,6 +391,13 @@ class PrefixCommands(commands.Cog):
         await setConfig(ctx.guild.id, "modLogChannel", str(channel.id))
         await ctx.send(embed=discord.Embed(description=f"Mod-log channel set to {channel.mention}", color=embedColor))
 
+    @modlog.command(name="webhook")
+    @is_admin()
+    async def modlog_webhook(self, ctx, enabled: str):
+        val = "1" if self.bool_converter(enabled) else "0"
+        await setConfig(ctx.guild.id, "logWebhooks", val)
+        await ctx.send(embed=discord.Embed(description=f"Webhook log delivery: {val=='1'}", color=embedColor))
+
     @commands.group(invoke_without_command=True)
     @is_admin()
     async def prefix(self, ctx):
@@ -398,6 +407,7 @@ class PrefixCommands(commands.Cog):
     @is_admin()
     async def prefix_set(self, ctx, new_prefix: str):
         await setConfig(ctx.guild.id, "prefix", new_prefix)
+        setPrefix(ctx.guild.id, new_prefix)
         await ctx.send(embed=discord.Embed(description=f"Prefix set to `{new_prefix}`", color=embedColor))
 
     @commands.group(invoke_without_command=True)
@@ -584,6 +594,10 @@ class PrefixCommands(commands.Cog):
     @linkfilter.command(name="regex_add")
     @is_admin()
     async def link_regex_add(self, ctx, *, pattern: str):
+        error = validatePattern(pattern)
+        if error:
+            await ctx.send(embed=discord.Embed(description=f"Pattern rejected: {error}", color=embedColor))
+            return
         current = json.loads(await getConfig(ctx.guild.id, "linkRegexPatterns") or "[]")
         if pattern not in current:
             current.append(pattern)
@@ -632,6 +646,12 @@ class PrefixCommands(commands.Cog):
     @wordfilter.command(name="add")
     @is_admin()
     async def word_add(self, ctx, word: str):
+        if await getConfig(ctx.guild.id, "wordFilterRegex") == "1":
+            # Banned words are stored lowercased, which turns \S into \s; check what will actually run
+            error = validatePattern(word.lower())
+            if error:
+                await ctx.send(embed=discord.Embed(description=f"Pattern rejected: {error}", color=embedColor))
+                return
         await addBannedWord(ctx.guild.id, word)
         await ctx.send(embed=discord.Embed(description=f"Added banned word: `{word}`", color=embedColor))
 
@@ -661,6 +681,12 @@ class PrefixCommands(commands.Cog):
     @is_admin()
     async def word_regex(self, ctx, enabled: str):
         val = "1" if self.bool_converter(enabled) else "0"
+        if val == "1":
+            # Words added while regex mode was off were never validated as patterns
+            unsafe = findUnsafePattern(await getBannedWords(ctx.guild.id))
+            if unsafe:
+                await ctx.send(embed=discord.Embed(description=f"Can't enable regex matching, `{unsafe[0]}` was rejected: {unsafe[1]}", color=embedColor))
+                return
         await setConfig(ctx.guild.id, "wordFilterRegex", val)
         await ctx.send(embed=discord.Embed(description=f"Regex matching: {val=='1'}", color=embedColor))
 
@@ -0,0 +1,45 @@
+import os
+from discord.ext import commands
+from eventRecording import EventWriter, serializeMessage, serializeMember
+
+# Recording is opt-in: set EVENT_RECORD_PATH (optionally ending in .gz) to capture traffic for replay.
+# main.py only loads this extension when it is set.
+EVENT_RECORD_PATH = os.getenv("EVENT_RECORD_PATH", "")
+
+class Recorder(commands.Cog):
+    """Writes gateway events to EVENT_RECORD_PATH for benchmarks/replay.py."""
+
+    def __init__(self, bot, path):
+        self.bot = bot
+        self.writer = EventWriter(path)
+
+    async def cog_unload(self):
+        await self.writer.close()
+
+    @commands.Cog.listener()
+    async def on_message(self, message):
+        if message.guild:
+            self.writer.write("message", message=serializeMessage(message))
+
+    @commands.Cog.listener()
+    async def on_message_edit(self, before, after):
+        if after.guild:
+            self.writer.write("edit", before=before.content, message=serializeMessage(after))
+
+    @commands.Cog.listener()
+    async def on_message_delete(self, message):
+        if message.guild:
+            self.writer.write("delete", message=serializeMessage(message))
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member):
+        self.writer.write("member_join", guild=member.guild.id, member=serializeMember(member))
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member):
+        self.writer.write("member_remove", guild=member.guild.id, member=serializeMember(member))
+
+async def setup(bot):
+    if EVENT_RECORD_PATH:
+        await bot.add_cog(Recorder(bot, EVENT_RECORD_PATH))
+        print(f"Recording gateway events to {EVENT_RECORD_PATH}")
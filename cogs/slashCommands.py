@@ -9,6 +9,8 @@ from database import (
     addWhitelistDomain, removeWhitelistDomain, getWhitelistDomains
 )
 from config import embedColor
+from regexEngine import validatePattern, findUnsafePattern
+from prefixes import setPrefix
 
 class SlashCommands(commands.Cog):
     def __init__(self, bot):
@@ -62,10 +64,17 @@ class SlashCommands(commands.Cog):
         await setConfig(interaction.guild_id, "automodLogChannel", str(channel.id))
         await interaction.response.send_message(f"🛡️ Automod log channel set to {channel.mention}\n*Spam, link, word, and other filter actions will be logged here instead of the mod-log.*", ephemeral=True)
 
+    @app_commands.command(name="logwebhook", description="Deliver mod/automod logs through a webhook")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def set_logwebhook(self, interaction: discord.Interaction, enabled: bool):
+        await setConfig(interaction.guild_id, "logWebhooks", "1" if enabled else "0")
+        await interaction.response.send_message(f"Webhook log delivery: {enabled}\n*Requires the Manage Webhooks permission in the log channels.*", ephemeral=True)
+
     @app_commands.command(name="prefix", description="Set command prefix")
     @app_commands.checks.has_permissions(administrator=True)
     async def set_prefix(self, interaction: discord.Interaction, prefix: str):
         await setConfig(interaction.guild_id, "prefix", prefix)
+        setPrefix(interaction.guild_id, prefix)
         await interaction.response.send_message(f"Prefix set to `{prefix}`", ephemeral=True)
 
     spam_group = app_commands.Group(name="spam", description="Configure spam filter")
@@ -211,6 +220,10 @@ class SlashCommands(commands.Cog):
 
     @link_group.command(name="regex_add", description="Add custom regex pattern")
     async def link_regex_add(self, interaction: discord.Interaction, pattern: str):
+        error = validatePattern(pattern)
+        if error:
+            await interaction.response.send_message(f"Pattern rejected: {error}", ephemeral=True)
+            return
         current = json.loads(await getConfig(interaction.guild_id, "linkRegexPatterns") or "[]")
         if pattern not in current:
             current.append(pattern)
@@ -251,6 +264,12 @@ class SlashCommands(commands.Cog):
 
     @word_group.command(name="add", description="Add banned word")
     async def word_add(self, interaction: discord.Interaction, word: str):
+        if await getConfig(interaction.guild_id, "wordFilterRegex") == "1":
+            # Banned words are stored lowercased, which turns \S into \s; check what will actually run
+            error = validatePattern(word.lower())
+            if error:
+                await interaction.response.send_message(f"Pattern rejected: {error}", ephemeral=True)
+                return
         await addBannedWord(interaction.guild_id, word)
         await interaction.response.send_message(f"Added banned word: `{word}`", ephemeral=True)
 
@@ -274,6 +293,12 @@ class SlashCommands(commands.Cog):
 
     @word_group.command(name="regex", description="Toggle regex matching")
     async def word_regex(self, interaction: discord.Interaction, enabled: bool):
+        if enabled:
+            # Words added while regex mode was off were never validated as patterns
+            unsafe = findUnsafePattern(await getBannedWords(interaction.guild_id))
+            if unsafe:
+                await interaction.response.send_message(f"Can't enable regex matching, `{unsafe[0]}` was rejected: {unsafe[1]}", ephemeral=True)
+                return
         await setConfig(interaction.guild_id, "wordFilterRegex", "1" if enabled else "0")
         await interaction.response.send_message(f"Regex matching: {enabled}", ephemeral=True)
 
@@ -1,55 +1,101 @@
+import os
 import time
-from collections import defaultdict
-import discord
-from discord.ext import commands
-from database import getConfig, isRoleExempt, isChannelExempt
+from collections import OrderedDict, deque
+from discord.ext import tasks
+from cogs.automod import AutomodRule, Verdict, registerRule, unregisterRule
+import metrics
 
-from modlog import sendModLog
+SPAM_MAX_TRACKED_USERS = int(os.getenv("SPAM_MAX_TRACKED_USERS", "50000"))
+
+class _SpamWindow:
+    """The last spamMaxMessages + 1 message timestamps of one user in one guild."""
+    __slots__ = ("timestamps", "window")
+
+    def __init__(self, maxMessages, window):
+        self.timestamps = deque(maxlen=maxMessages + 1)
+        self.window = window
+
+class SpamFilter(AutomodRule):
+    name = "spam"
+    # Runs first so every message is counted, even ones a later rule would have removed
+    cost = 10
 
-class SpamFilter(commands.Cog):
     def __init__(self, bot):
-        self.bot = bot
-        self.userMessages = defaultdict(lambda: defaultdict(list))
-
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        if message.author.bot or not message.guild:
-            return
-
-        guildId = message.guild.id
-        userId = message.author.id
-
-        spamEnabled = await getConfig(guildId, "spamEnabled")
-        if spamEnabled != "1":
-            return
-
-        if await isRoleExempt(guildId, "spam", message.author.roles):
-            return
-
-        if await isChannelExempt(guildId, "spam", message.channel.id):
-            return
-
-        spamMaxMessages = int(await getConfig(guildId, "spamMaxMessages") or 5)
-        spamTimeWindow = int(await getConfig(guildId, "spamTimeWindow") or 10)
-
-        now = time.time()
-        timestamps = self.userMessages[guildId][userId]
-        self.userMessages[guildId][userId] = [t for t in timestamps if now - t < spamTimeWindow]
-        self.userMessages[guildId][userId].append(now)
-
-        if len(self.userMessages[guildId][userId]) > spamMaxMessages:
-            try:
-                await message.delete()
-            except discord.errors.NotFound:
-                pass
-            await sendModLog(
-                self.bot, guildId,
-                user=message.author,
-                channel=message.channel,
-                rule="Spam Filter",
-                messageContent=message.content
-            )
-            self.userMessages[guildId][userId] = []
+        super().__init__(bot)
+        # (guild_id, user_id) -> _SpamWindow, least recently active first
+        self.userMessages = OrderedDict()
+        self.evictions = 0
+        self.swept = 0
+
+    def check(self, message, policy, features):
+        if not policy.spamEnabled:
+            return None
+        if policy.isExempt("spam", message.author, message.channel.id):
+            return None
+
+        key = (message.guild.id, message.author.id)
+        maxMessages = max(policy.spamMaxMessages, 0)
+        entry = self.userMessages.get(key)
+        if entry is None or entry.timestamps.maxlen != maxMessages + 1:
+            entry = _SpamWindow(maxMessages, policy.spamTimeWindow)
+            self.userMessages[key] = entry
+            self._enforceCap()
+        else:
+            entry.window = policy.spamTimeWindow
+            self.userMessages.move_to_end(key)
+
+        now = time.monotonic()
+        timestamps = entry.timestamps
+        timestamps.append(now)
+
+        # More than maxMessages inside the window <=> the oldest of the last maxMessages + 1 is inside it
+        if len(timestamps) == timestamps.maxlen and now - timestamps[0] < policy.spamTimeWindow:
+            timestamps.clear()
+            return Verdict("Spam Filter")
+        return None
+
+    def _enforceCap(self):
+        while len(self.userMessages) > SPAM_MAX_TRACKED_USERS:
+            self.userMessages.popitem(last=False)
+            self.evictions += 1
+
+    @tasks.loop(seconds=60)
+    async def sweeper(self):
+        """Drop users whose newest message has already left their guild's window."""
+        now = time.monotonic()
+        idle = [
+            key for key, entry in self.userMessages.items()
+            if not entry.timestamps or now - entry.timestamps[-1] >= entry.window
+        ]
+        for key in idle:
+            del self.userMessages[key]
+        self.swept += len(idle)
+
+    def stats(self):
+        return {
+            'trackedUsers': len(self.userMessages),
+            'trackedGuilds': len({guildId for guildId, _ in self.userMessages}),
+            'maxTrackedUsers': SPAM_MAX_TRACKED_USERS,
+            'evictions': self.evictions,
+            'swept': self.swept,
+        }
+
+    def collectStats(self):
+        stats = self.stats()
+        metrics.setGauge("spam_tracked_users", stats['trackedUsers'])
+        metrics.setGauge("spam_evictions", stats['evictions'])
+        metrics.setGauge("spam_swept", stats['swept'])
+
+    def close(self):
+        # Runs on teardown (via unregisterRule) and when the pipeline unloads
+        self.sweeper.cancel()
+        metrics.removeCollector(self.collectStats)
 
 async def setup(bot):
-    await bot.add_cog(SpamFilter(bot))
+    rule = SpamFilter(bot)
+    registerRule(bot, rule)
+    rule.sweeper.start()
+    metrics.addCollector(rule.collectStats)
+
+async def teardown(bot):
+    unregisterRule(bot, SpamFilter.name)
@@ -0,0 +1,68 @@
+import discord
+from discord import app_commands
+from discord.ext import commands
+from config import embedColor
+from database import getConfigCacheStats, getPoolStats
+from modlog import getModLogStats
+import metrics
+import startup
+
+TOP_N = 5
+
+def _ms(seconds):
+    return f"{seconds * 1000:.1f}ms"
+
+def _table(name, label):
+    """Top entries of one histogram as embed field text, slowest p95 first."""
+    rows = metrics.summarize(name)[:TOP_N]
+    if not rows:
+        return "No data yet."
+    lines = [
+        f"`{row['labels'].get(label, '-')}` p50 {_ms(row['p50'])} · p95 {_ms(row['p95'])} · n={row['count']}"
+        for row in rows
+    ]
+    return "\n".join(lines)[:1024]
+
+class Stats(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    @app_commands.command(name="stats", description="Show bot latency and performance statistics")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def stats(self, interaction: discord.Interaction):
+        info = startup.readiness()
+        embed = discord.Embed(title="📊 Bot Statistics", color=embedColor)
+
+        phases = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in info['phases'].items()) or "-"
+        embed.add_field(
+            name="Runtime",
+            value=f"State: `{info['state']}` · Uptime: {info['uptime'] / 3600:.1f}h · Gateway: {_ms(self.bot.latency)}\nStartup: {phases}",
+            inline=False
+        )
+
+        if not metrics.METRICS_ENABLED:
+            embed.description = "Instrumentation is disabled (`METRICS_ENABLED=0`)."
+        else:
+            embed.add_field(name="Listeners", value=_table("listener_seconds", "listener"), inline=False)
+            embed.add_field(name="Automod Rules", value=_table("automod_rule_seconds", "rule"), inline=False)
+            embed.add_field(name="Database Functions", value=_table("db_query_seconds", "function"), inline=False)
+            embed.add_field(name="Discord REST", value=_table("discord_rest_seconds", "route"), inline=False)
+
+        pool = getPoolStats()
+        acquire = metrics.histograms.get(("db_pool_acquire_seconds", ()))
+        acquireText = f" · acquire p95 {_ms(acquire.quantile(0.95))}" if acquire and acquire.count else ""
+        cache = getConfigCacheStats()
+        queues = getModLogStats()
+        embed.add_field(
+            name="Resources",
+            value=(
+                f"Pool: {pool['size'] - pool['idle']}/{pool['max']} busy{acquireText}\n"
+                f"Config cache: {cache['guilds']} guilds · {cache['hitRate']:.1%} hits\n"
+                f"Mod-log queue: {queues['queued']} pending in {queues['channels']} channel(s)"
+            ),
+            inline=False
+        )
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+async def setup(bot):
+    await bot.add_cog(Stats(bot))
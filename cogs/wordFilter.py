@@ -1,73 +1,29 @@
-import re
-import discord
-from discord.ext import commands
-from database import getConfig, isRoleExempt, getBannedWords, isChannelExempt
-from modlog import sendModLog
+from cogs.automod import AutomodRule, Verdict, registerRule, unregisterRule
 
-class WordFilter(commands.Cog):
-    def __init__(self, bot):
-        self.bot = bot
+class WordFilter(AutomodRule):
+    name = "word"
+    cost = 60
 
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        if message.author.bot or not message.guild or not message.content:
-            return
+    def check(self, message, policy, features):
+        if not message.content or not policy.wordFilterEnabled or not policy.bannedWords:
+            return None
+        if policy.isExempt("word", message.author, message.channel.id):
+            return None
 
-        guildId = message.guild.id
+        if policy.wordFilterRegex:
+            return self.checkRegex(message, policy)
 
-        wordFilterEnabled = await getConfig(guildId, "wordFilterEnabled")
-        if wordFilterEnabled != "1":
-            return
+        if policy.wordMatcher.search(features.lower) is None:
+            return None
+        return Verdict("Word Filter (Partial)" if policy.wordFilterPartialMatch else "Word Filter (Exact)")
 
-        if await isRoleExempt(guildId, "word", message.author.roles):
-            return
-
-        if await isChannelExempt(guildId, "word", message.channel.id):
-            return
-
-        bannedWords = await getBannedWords(guildId)
-        if not bannedWords:
-            return
-
-        usePartial = (await getConfig(guildId, "wordFilterPartialMatch") or "0") == "1"
-        useRegex = (await getConfig(guildId, "wordFilterRegex") or "0") == "1"
-
-        contentLower = message.content.lower()
-        contentWords = contentLower.split()
-
-        for bannedWord in bannedWords:
-            matched = False
-            matchRule = ""
-
-            if useRegex:
-                try:
-                    if re.search(bannedWord, message.content, re.IGNORECASE):
-                        matched = True
-                        matchRule = "Word Filter (Regex)"
-                except re.error:
-                    continue
-            elif usePartial:
-                if bannedWord in contentLower:
-                    matched = True
-                    matchRule = "Word Filter (Partial)"
-            else:
-                if bannedWord in contentWords:
-                    matched = True
-                    matchRule = "Word Filter (Exact)"
-
-            if matched:
-                try:
-                    await message.delete()
-                except discord.errors.NotFound:
-                    pass
-                await sendModLog(
-                    self.bot, guildId,
-                    user=message.author,
-                    channel=message.channel,
-                    rule=matchRule,
-                    messageContent=message.content
-                )
-                return
+    async def checkRegex(self, message, policy):
+        if await self.searchPatterns(message, policy.wordPatterns):
+            return Verdict("Word Filter (Regex)")
+        return None
 
 async def setup(bot):
-    await bot.add_cog(WordFilter(bot))
+    registerRule(bot, WordFilter(bot))
+
+async def teardown(bot):
+    unregisterRule(bot, WordFilter.name)
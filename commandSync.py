@@ -0,0 +1,50 @@
+import os
+import json
+import time
+import hashlib
+import inspect
+import metrics
+from database import getMeta, setMeta
+
+COMMAND_HASH_KEY = "commandTreeHash"
+# Set to 1 to sync on the next start even if the tree looks unchanged
+FORCE_COMMAND_SYNC = os.getenv("FORCE_COMMAND_SYNC", "0") == "1"
+
+def _commandPayload(command, tree):
+    # discord.py 2.4 made the tree a required argument of to_dict(); older releases take none
+    if "tree" in inspect.signature(command.to_dict).parameters:
+        return command.to_dict(tree)
+    return command.to_dict()
+
+def commandTreeHash(tree):
+    """Stable hash of the global command payload Discord would receive from tree.sync()."""
+    payload = sorted((_commandPayload(command, tree) for command in tree.get_commands()),
+                     key=lambda c: (c.get("type", 1), c["name"]))
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+def _hashKey(tree):
+    # Keyed per application so a dev bot sharing the database doesn't mask the real one's changes
+    return f"{COMMAND_HASH_KEY}:{tree.client.application_id}"
+
+async def recordSync(tree):
+    await setMeta(_hashKey(tree), commandTreeHash(tree))
+
+async def syncIfChanged(tree):
+    """Sync global commands only when the tree differs from the last synced one.
+
+    Returns the synced command list, or None when the sync was skipped.
+    """
+    start = time.perf_counter()
+    current = commandTreeHash(tree)
+    stored = await getMeta(_hashKey(tree))
+    if stored == current and not FORCE_COMMAND_SYNC:
+        metrics.incr("command_syncs_total", result="skipped")
+        metrics.observe("startup_command_sync_seconds", time.perf_counter() - start)
+        return None
+
+    synced = await tree.sync()
+    await setMeta(_hashKey(tree), current)
+    metrics.incr("command_syncs_total", result="synced")
+    metrics.observe("startup_command_sync_seconds", time.perf_counter() - start)
+    return synced
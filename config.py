@@ -31,6 +31,7 @@ defaultConfig = {
     "wordFilterPartialMatch": "0",
     "wordFilterRegex": "0",
     "modLogChannel": "",
+    "logWebhooks": "0",
     "prefix": ".",
     "activeProject": "",
     "sdlcNotifyChannel": "",
@@ -0,0 +1,63 @@
+_TERMINAL = "\0"
+_WILDCARD = "*"
+
+def normalizeHost(value):
+    """Reduce a URL, netloc or bare domain to a lowercase ASCII hostname without port or credentials."""
+    host = value.strip().lower()
+    if "://" in host:
+        host = host.split("://", 1)[1]
+    for sep in "/?#":
+        host = host.split(sep, 1)[0]
+    host = host.rsplit("@", 1)[-1]
+    if host.startswith("["):
+        # IPv6 literal, keep the brackets and drop only the port
+        return host.split("]", 1)[0] + "]"
+    host = host.split(":", 1)[0].strip(".")
+    if not host:
+        return None
+    try:
+        host = host.encode("idna").decode("ascii")
+    except UnicodeError:
+        pass
+    return host
+
+class DomainTrie:
+    """Whitelisted domains stored as a trie of reversed labels (com -> example -> www).
+
+    `example.com` allows the domain itself and every subdomain of it; `*.example.com`
+    allows subdomains only. Lookups cost one dict step per label of the host.
+    """
+
+    def __init__(self, domains=()):
+        self._root = {}
+        self.size = 0
+        for domain in domains:
+            self.add(domain)
+
+    def __len__(self):
+        return self.size
+
+    def add(self, domain):
+        wildcard = domain.strip().startswith("*.")
+        host = normalizeHost(domain.strip()[2:] if wildcard else domain)
+        if not host:
+            return
+        node = self._root
+        for label in reversed(host.split(".")):
+            node = node.setdefault(label, {})
+        node[_WILDCARD if wildcard else _TERMINAL] = True
+        self.size += 1
+
+    def match(self, host):
+        """Whether an already-normalized host is covered by any whitelist entry."""
+        labels = host.split(".")
+        node = self._root
+        for i in range(len(labels) - 1, -1, -1):
+            node = node.get(labels[i])
+            if node is None:
+                return False
+            if _TERMINAL in node:
+                return True
+            if i and _WILDCARD in node:
+                return True
+        return False
@@ -0,0 +1,127 @@
+import os
+import gzip
+import json
+import time
+import asyncio
+
+# Format of one recorded event per line; bump when fields change
+RECORDING_VERSION = 1
+
+# ─────────────────────────────────────────────
+# Serialization
+# ─────────────────────────────────────────────
+
+def serializeMember(member):
+    return {
+        'id': member.id,
+        'name': member.name,
+        'bot': member.bot,
+        'roles': [role.id for role in getattr(member, "roles", ())],
+    }
+
+def serializeMessage(message):
+    return {
+        'id': message.id,
+        'guild': message.guild.id if message.guild else None,
+        'channel': message.channel.id,
+        'author': serializeMember(message.author),
+        'content': message.content,
+        'mentions': [user.id for user in message.mentions],
+        'roleMentions': [role.id for role in message.role_mentions],
+        'mentionEveryone': message.mention_everyone,
+        'attachments': [[a.filename, a.size] for a in message.attachments],
+    }
+
+# ─────────────────────────────────────────────
+# Files
+# ─────────────────────────────────────────────
+
+def _open(path, mode):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+def _tailLines(path):
+    # Plain files only need their last lines; gzip has to be read through
+    if path.endswith(".gz"):
+        with _open(path, "r") as f:
+            try:
+                yield from f
+            except EOFError:
+                # A gzip member left unfinished by a crash; keep what was read before it
+                pass
+        return
+    with open(path, "rb") as f:
+        f.seek(max(0, os.path.getsize(path) - 65536))
+        yield from f
+
+def _lastOffset(path):
+    """The `t` of the last complete event in an existing recording, 0.0 if there is none."""
+    with _open(path, "r") as f:
+        header = json.loads(f.readline())
+    if header.get('version') != RECORDING_VERSION:
+        raise ValueError(f"Can't append to {path}: recording version {header.get('version')}, "
+                         f"this build writes {RECORDING_VERSION}")
+    last = 0.0
+    for line in _tailLines(path):
+        try:
+            event = json.loads(line)
+        except ValueError:
+            # A line cut short by a crash, or the partial first line of the tail
+            continue
+        if isinstance(event, dict) and 't' in event:
+            last = event['t']
+    return last
+
+class EventWriter:
+    """Appends events as compact JSON lines, each stamped with seconds since recording began.
+
+    Reopening an existing recording carries on from its last offset, so `t` never goes
+    backwards (downtime between runs is not recorded). Batches are written by a background
+    task in a worker thread, so gzip never runs on the event loop.
+    """
+
+    def __init__(self, path, flushEvery=100):
+        self.path = path
+        self.flushEvery = flushEvery
+        self.start = time.monotonic()
+        self.pending = []
+        self.count = 0
+        self.flushTask = None
+        if os.path.exists(path):
+            self.start -= _lastOffset(path)
+        else:
+            with _open(path, "w") as f:
+                f.write(json.dumps({'version': RECORDING_VERSION, 'recordedAt': int(time.time())}) + "\n")
+
+    def write(self, eventType, **data):
+        self.pending.append({'t': round(time.monotonic() - self.start, 4), 'type': eventType, **data})
+        self.count += 1
+        if len(self.pending) >= self.flushEvery and (self.flushTask is None or self.flushTask.done()):
+            self.flushTask = asyncio.create_task(self.flush())
+
+    def _append(self, events):
+        with _open(self.path, "a") as f:
+            f.write("".join(json.dumps(event, separators=(",", ":")) + "\n" for event in events))
+
+    async def flush(self):
+        # Only ever one flush running, so batches land in the file in order
+        while self.pending:
+            events, self.pending = self.pending, []
+            await asyncio.to_thread(self._append, events)
+
+    async def close(self):
+        """Wait for a running flush, then write whatever is left."""
+        if self.flushTask is not None:
+            await self.flushTask
+        await self.flush()
+
+def readEvents(path):
+    """Yield recorded events in order, skipping the header line."""
+    with _open(path, "r") as f:
+        header = json.loads(f.readline())
+        if header.get('version') != RECORDING_VERSION:
+            raise ValueError(f"Unsupported recording version {header.get('version')}")
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
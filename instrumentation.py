@@ -0,0 +1,93 @@
+import time
+import functools
+import inspect
+import contextvars
+import metrics
+
+# Installed once at startup when metrics.METRICS_ENABLED; nothing here runs otherwise
+
+def instrumentModule(module, metricName):
+    """Wrap every public coroutine function defined in `module` with a latency histogram.
+
+    Must run before other modules import those names, which is why database.py
+    calls it at the bottom of its own import. Only the outermost call is timed: a
+    function that calls another one in the module (hasCommandPerm -> getCommandPerms)
+    is one observation, not two.
+    """
+    active = contextvars.ContextVar(f"{module.__name__}_timed", default=False)
+    for name, func in list(vars(module).items()):
+        if name.startswith("_") or not inspect.iscoroutinefunction(func):
+            continue
+        if getattr(func, "__module__", None) != module.__name__:
+            continue
+        setattr(module, name, _timedCoroutine(func, metricName, active))
+
+def _timedCoroutine(func, metricName, active):
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        if active.get():
+            return await func(*args, **kwargs)
+        token = active.set(True)
+        start = time.perf_counter()
+        try:
+            return await func(*args, **kwargs)
+        except Exception:
+            metrics.incr(f"{metricName}_errors_total", function=func.__name__)
+            raise
+        finally:
+            metrics.observe(metricName, time.perf_counter() - start, function=func.__name__)
+            active.reset(token)
+    return wrapper
+
+# ─────────────────────────────────────────────
+# Connection Pool
+# ─────────────────────────────────────────────
+
+class _TimedAcquire:
+    __slots__ = ("context", "start")
+
+    def __init__(self, context):
+        self.context = context
+
+    async def __aenter__(self):
+        self.start = time.perf_counter()
+        conn = await self.context.__aenter__()
+        metrics.observe("db_pool_acquire_seconds", time.perf_counter() - self.start)
+        return conn
+
+    async def __aexit__(self, *exc):
+        return await self.context.__aexit__(*exc)
+
+class InstrumentedPool:
+    """Proxy for an asyncpg pool that records how long acquire() waits for a connection."""
+
+    def __init__(self, pool):
+        self._pool = pool
+
+    def acquire(self, *, timeout=None):
+        return _TimedAcquire(self._pool.acquire(timeout=timeout))
+
+    def __getattr__(self, name):
+        return getattr(self._pool, name)
+
+# ─────────────────────────────────────────────
+# Discord REST
+# ─────────────────────────────────────────────
+
+def instrumentHttp(http):
+    """Time every REST request the client makes, labelled by method and route template."""
+    request = http.request
+
+    @functools.wraps(request)
+    async def timedRequest(route, **kwargs):
+        label = f"{route.method} {route.path}"
+        start = time.perf_counter()
+        try:
+            return await request(route, **kwargs)
+        except Exception as e:
+            metrics.incr("discord_rest_errors_total", route=label, status=getattr(e, "status", "error"))
+            raise
+        finally:
+            metrics.observe("discord_rest_seconds", time.perf_counter() - start, route=label)
+
+    http.request = timedRequest
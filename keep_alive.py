@@ -1,17 +1,77 @@
-from flask import Flask
-from threading import Thread
 import os
+import hmac
+import math
+from aiohttp import web
+import metrics
+import startup
+from database import pingDb, getPoolStats, getConfigCacheStats
+from modlog import getModLogStats
 
-app = Flask('')
+# Runs on the bot's own event loop; no thread, no WSGI stack
 
-@app.route('/')
-def home():
-    return "Bot is alive!"
+# Bearer token for /metrics; without one it only answers requests from this machine
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+LOOPBACK = ("127.0.0.1", "::1")
 
-def run():
-    port = int(os.environ.get("PORT", 8080))
-    app.run(host='0.0.0.0', port=port)
+def _canReadMetrics(request):
+    if METRICS_TOKEN:
+        supplied = request.headers.get("Authorization", "").removeprefix("Bearer ")
+        return hmac.compare_digest(supplied.encode(), METRICS_TOKEN.encode())
+    return request.remote in LOOPBACK
+
+def _collectState(bot):
+    def collect():
+        for name, value in getPoolStats().items():
+            metrics.setGauge("db_pool_connections", value, state=name)
+        cache = getConfigCacheStats()
+        metrics.setGauge("config_cache_guilds", cache['guilds'])
+        metrics.setGauge("config_cache_hit_rate", cache['hitRate'])
+        queues = getModLogStats()
+        metrics.setGauge("modlog_queued_entries", queues['queued'])
+        metrics.setGauge("modlog_queue_channels", queues['channels'])
+        metrics.setGauge("guilds", len(bot.guilds))
+        if not math.isnan(bot.latency) and not math.isinf(bot.latency):
+            metrics.setGauge("gateway_latency_seconds", bot.latency)
+        metrics.setGauge("uptime_seconds", startup.readiness()['uptime'])
+        for name in startup.STATES:
+            metrics.setGauge("startup_state", 1 if startup.state == name else 0, state=name)
+    return collect
+
+def createApp(bot):
+    async def home(request):
+        return web.Response(text="Bot is alive!")
+
+    async def health(request):
+        gateway = bot.is_ready() and not bot.is_closed()
+        database = await pingDb()
+        # A failed optional extension shows up in the body, not as a failed probe
+        healthy = gateway and database and startup.state in (startup.AUTOMOD_READY, startup.READY, startup.DEGRADED)
+        body = {
+            **startup.readiness(),
+            'gateway': gateway,
+            'database': database,
+            'latency': bot.latency if gateway else None,
+        }
+        return web.json_response(body, status=200 if healthy else 503)
 
-def keep_alive():
-    t = Thread(target=run)
-    t.start()
+    async def metricsEndpoint(request):
+        if not _canReadMetrics(request):
+            return web.Response(status=401 if METRICS_TOKEN else 403)
+        return web.Response(text=metrics.renderPrometheus(), content_type="text/plain", charset="utf-8",
+                            headers={"X-Content-Type-Options": "nosniff"})
+
+    metrics.addCollector(_collectState(bot))
+    app = web.Application()
+    app.router.add_get("/", home)
+    app.router.add_get("/health", health)
+    app.router.add_get("/metrics", metricsEndpoint)
+    return app
+
+async def keep_alive(bot):
+    """Serve /, /health and /metrics on PORT. Returns the runner so close() can clean it up."""
+    runner = web.AppRunner(createApp(bot), access_log=None)
+    await runner.setup()
+    port = int(os.environ.get("PORT", 8080))
+    await web.TCPSite(runner, host="0.0.0.0", port=port).start()
+    print(f"Health server listening on port {port}")
+    return runner
@@ -1,39 +1,26 @@
 import os
+import time
 import asyncio
+import startup
+import metrics
+import instrumentation
 import discord
 from discord.ext import commands, tasks
 from dotenv import load_dotenv
-from config import defaultPrefix, requiredIntents
-from database import initDb, initDefaults, getConfig
+from config import requiredIntents
+from database import initDb, closeDb, initDefaults, bootstrapGuilds
+from prefixes import resolvePrefix, primePrefixes, refreshPrefix, isCommandCandidate
+from commandSync import syncIfChanged, recordSync
+from modlog import flushAll, closeTransport
 from keep_alive import keep_alive
 
 load_dotenv()
 
-async def getPrefix(bot, message):
-    try:
-        if message.guild:
-            prefix = await getConfig(message.guild.id, "prefix")
-            return prefix if prefix else defaultPrefix
-    except AttributeError:
-        pass
-    except Exception as e:
-        print(f"Error fetching prefix: {e}")
-    return defaultPrefix
-
-bot = commands.Bot(
-    command_prefix=getPrefix,
-    intents=requiredIntents
-)
-
-@tasks.loop(minutes=10)
-async def update_status():
-    await bot.change_presence(activity=discord.Activity(type=discord.ActivityType.watching, name=f"{len(bot.guilds)} Servers"))
-
-@update_status.before_loop
-async def before_status():
-    await bot.wait_until_ready()
+def getPrefix(bot, message):
+    return resolvePrefix(message.guild.id if message.guild else None)
 
 cogExtensions = [
+    "cogs.automod",
     "cogs.spamFilter",
     "cogs.attachmentFilter",
     "cogs.mentionFilter",
@@ -53,47 +40,104 @@ cogExtensions = [
     "cogs.bugs",
     "cogs.checklists",
     "cogs.devperms",
+    "cogs.stats",
 ]
+if os.getenv("EVENT_RECORD_PATH"):
+    cogExtensions.append("cogs.recorder")
 
-@bot.event
-async def on_ready():
-    if getattr(bot, '__startup_done', False):
-        return
-    bot.__startup_done = True
+# Loaded before the gateway connects so filtering starts with the first message
+automodExtensions = [ext for ext in cogExtensions if ext == "cogs.automod" or ext.endswith("Filter")]
+
+# extension -> extensions its setup() needs; everything else loads concurrently
+extensionDependencies = {ext: ["cogs.automod"] for ext in automodExtensions if ext != "cogs.automod"}
 
-    await asyncio.sleep(5)
-    success = await initDb()
-    if success:
+class AbyssBot(commands.Bot):
+    async def _run_event(self, coro, event_name, *args, **kwargs):
+        if not metrics.METRICS_ENABLED:
+            return await super()._run_event(coro, event_name, *args, **kwargs)
+        start = time.perf_counter()
+        try:
+            await super()._run_event(coro, event_name, *args, **kwargs)
+        finally:
+            listener = getattr(coro, "__qualname__", event_name)
+            metrics.observe("listener_seconds", time.perf_counter() - start, listener=listener)
+
+    async def setup_hook(self):
+        # Runs after login but before the gateway connects
+        if metrics.METRICS_ENABLED:
+            instrumentation.instrumentHttp(self.http)
+        self.webRunner = await keep_alive(self)
+
+        async with startup.phase("database"):
+            success = await initDb()
+        if not success:
+            print("CRITICAL: Database connection failed. Bot features may be broken.")
+            startup.setState(startup.FAILED)
+            return
         print("Database initialized successfully.")
-    else:
-        print("CRITICAL: Database connection failed. Bot features may be broken.")
-        return
+        startup.setState(startup.DATABASE_READY)
 
-    for guild in bot.guilds:
-        await initDefaults(guild.id)
-        
-    try:
-        bot.tree.clear_commands(guild=None)
-        await bot.tree.sync()
-        print("Wiped global commands from Discord.")
-    except Exception as e:
-        print(f"Failed to wipe global commands: {e}")
+        async with startup.phase("automod"):
+            await startup.loadExtensions(self, automodExtensions, extensionDependencies)
+        startup.setState(startup.AUTOMOD_READY)
 
-    print(f"Loading {len(cogExtensions)} extensions...")
-    for ext in cogExtensions:
+        self.startupTask = asyncio.create_task(self.finishStartup())
+
+    async def finishStartup(self):
+        remaining = [ext for ext in cogExtensions if ext not in automodExtensions]
+        print(f"Loading {len(remaining)} extensions...")
+        async with startup.phase("extensions"):
+            await startup.loadExtensions(self, remaining, extensionDependencies)
+
+        await self.wait_until_ready()
         try:
-            await bot.load_extension(ext)
-            print(f"Loaded extension: {ext}")
+            async with startup.phase("bootstrap"):
+                configs = await bootstrapGuilds([guild.id for guild in self.guilds])
+                primePrefixes(configs)
+            print(f"Bootstrapped config for {len(configs)} guild(s).")
         except Exception as e:
-            print(f"FAILED to load extension {ext}: {e}")
-    
-    try:
-        synced = await bot.tree.sync()
-        print(f"Synced {len(synced)} commands globally!")
-    except Exception as e:
-        print(f"Failed to sync globally: {e}")
+            print(f"CRITICAL: Guild bootstrap failed: {e}")
+            startup.setState(startup.FAILED)
+            return
+
+        # Prefixes are primed, so prefix commands can run; the global slash-command sync is a
+        # rate-limited REST call they don't depend on, and finishes in the background after this
+        startup.setState(startup.DEGRADED if startup.failedExtensions else startup.READY)
+        print(f"AbyssBot ready as {self.user} in {len(self.guilds)} guild(s)")
+
+        async with startup.phase("command_sync"):
+            try:
+                synced = await syncIfChanged(self.tree)
+                if synced is None:
+                    print("Command tree unchanged, skipped global sync.")
+                else:
+                    print(f"Synced {len(synced)} commands globally!")
+            except Exception as e:
+                print(f"Failed to sync globally: {e}")
+
+    async def close(self):
+        await flushAll()
+        await closeTransport()
+        if getattr(self, "webRunner", None):
+            await self.webRunner.cleanup()
+        await super().close()
+        await closeDb()
+
+bot = AbyssBot(
+    command_prefix=getPrefix,
+    intents=requiredIntents
+)
+
+@tasks.loop(minutes=10)
+async def update_status():
+    await bot.change_presence(activity=discord.Activity(type=discord.ActivityType.watching, name=f"{len(bot.guilds)} Servers"))
+
+@update_status.before_loop
+async def before_status():
+    await bot.wait_until_ready()
 
-    print(f"AbyssBot ready as {bot.user} in {len(bot.guilds)} guild(s)")
+@bot.event
+async def on_ready():
     if not update_status.is_running():
         update_status.start()
 
@@ -104,6 +148,7 @@ async def sync(ctx, spec: str = None):
     try:
         if spec == "global":
             synced = await bot.tree.sync()
+            await recordSync(bot.tree)
             await ctx.send(f"Synced {len(synced)} commands globally.")
         elif spec == "clear":
             bot.tree.clear_commands(guild=ctx.guild)
@@ -116,9 +161,17 @@ async def sync(ctx, spec: str = None):
     except Exception as e:
         await ctx.send(f"Failed to sync: {e}")
 
+@bot.event
+async def on_message(message):
+    # Guild prefixes aren't known until bootstrap finishes
+    if message.author.bot or not startup.isStarted() or not isCommandCandidate(message):
+        return
+    await bot.process_commands(message)
+
 @bot.event
 async def on_guild_join(guild):
     await initDefaults(guild.id)
+    await refreshPrefix(guild.id)
 
-keep_alive()
-bot.run(os.getenv("BOT_TOKEN"))
+if __name__ == "__main__":
+    bot.run(os.getenv("BOT_TOKEN"))
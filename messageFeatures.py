@@ -0,0 +1,66 @@
+import re
+from functools import cached_property
+from domainTrie import normalizeHost
+
+urlPattern = re.compile(r"https?://[^\s<>\"']+|www\.[^\s<>\"']+", re.IGNORECASE)
+invitePattern = re.compile(r"(discord\.gg|discord\.com/invite|discordapp\.com/invite)/[a-zA-Z0-9]+", re.IGNORECASE)
+
+class MessageFeatures:
+    """Lazily derived views of one message, shared by every automod rule.
+
+    Each property is computed on first access and memoized, so no matter how many
+    rules look at the content it is lowercased, split and scanned at most once.
+    """
+
+    def __init__(self, message):
+        self.message = message
+        self.content = message.content or ""
+
+    @cached_property
+    def lower(self):
+        return self.content.lower()
+
+    @cached_property
+    def tokens(self):
+        return self.lower.split()
+
+    @cached_property
+    def charCount(self):
+        return len(self.content)
+
+    @cached_property
+    def wordCount(self):
+        return len(self.tokens)
+
+    @cached_property
+    def lineCount(self):
+        return self.content.count("\n") + 1
+
+    @cached_property
+    def urls(self):
+        return urlPattern.findall(self.content) if self.content else []
+
+    @cached_property
+    def hosts(self):
+        """Normalized hostnames of every URL, in order, skipping ones that do not parse."""
+        return [host for host in map(normalizeHost, self.urls) if host]
+
+    @cached_property
+    def hasInvite(self):
+        return bool(self.content) and invitePattern.search(self.content) is not None
+
+    @cached_property
+    def mentionCount(self):
+        return len(self.message.mentions) + len(self.message.role_mentions)
+
+    @cached_property
+    def mentionsHere(self):
+        return "@here" in self.content
+
+    @cached_property
+    def attachmentExtensions(self):
+        """Lowercased extension of each attachment, "" when the filename has none."""
+        return [
+            a.filename.rsplit(".", 1)[-1].lower() if "." in a.filename else ""
+            for a in self.message.attachments
+        ]
@@ -0,0 +1,145 @@
+import os
+import time
+from contextlib import contextmanager
+
+# Hot-path instrumentation (listeners, rules, queries, REST) is only installed when enabled
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+
+# ─────────────────────────────────────────────
+# In-process metrics registry
+# ─────────────────────────────────────────────
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense."""
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def quantile(self, q):
+        """Upper bucket bound below which roughly `q` of observations fall."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= target:
+                return bound
+        return float("inf")
+
+# (name, ((label, value), ...)) -> value
+counters = {}
+gauges = {}
+histograms = {}
+
+def _key(name, labels):
+    return (name, tuple(sorted(labels.items())))
+
+def incr(name, value=1, **labels):
+    key = _key(name, labels)
+    counters[key] = counters.get(key, 0) + value
+
+def setGauge(name, value, **labels):
+    gauges[_key(name, labels)] = value
+
+def observe(name, value, buckets=DEFAULT_BUCKETS, **labels):
+    key = _key(name, labels)
+    histogram = histograms.get(key)
+    if histogram is None:
+        histogram = histograms[key] = Histogram(buckets)
+    histogram.observe(value)
+
+@contextmanager
+def timer(name, **labels):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start, **labels)
+
+def summarize(name):
+    """Per-label-set count, mean, p50 and p95 for one histogram, slowest p95 first."""
+    rows = []
+    for (metric, labels), histogram in list(histograms.items()):
+        if metric != name or not histogram.count:
+            continue
+        rows.append({
+            'labels': dict(labels),
+            'count': histogram.count,
+            'mean': histogram.sum / histogram.count,
+            'p50': histogram.quantile(0.5),
+            'p95': histogram.quantile(0.95),
+        })
+    rows.sort(key=lambda r: r['p95'], reverse=True)
+    return rows
+
+# ─────────────────────────────────────────────
+# Prometheus export
+# ─────────────────────────────────────────────
+
+# Callables run before each export to refresh gauges derived from other modules' state
+collectors = []
+
+def addCollector(collector):
+    if collector not in collectors:
+        collectors.append(collector)
+
+def removeCollector(collector):
+    if collector in collectors:
+        collectors.remove(collector)
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+def _grouped(series):
+    byName = {}
+    for (name, labels), value in sorted(series.items(), key=lambda item: (item[0][0], str(item[0][1]))):
+        byName.setdefault(name, []).append((labels, value))
+    return byName.items()
+
+def renderPrometheus():
+    """The whole registry in the Prometheus text exposition format."""
+    for collector in collectors:
+        try:
+            collector()
+        except Exception as e:
+            print(f"Metrics collector failed: {e}")
+
+    lines = []
+    for kind, series in (("counter", counters), ("gauge", gauges)):
+        for name, entries in _grouped(series):
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in entries:
+                lines.append(f"{name}{_labels(labels)} {value}")
+
+    for name, entries in _grouped(histograms):
+        lines.append(f"# TYPE {name} histogram")
+        for labels, histogram in entries:
+            cumulative = 0
+            for bound, n in zip(histogram.buckets, histogram.counts):
+                cumulative += n
+                lines.append(f"{name}_bucket{_labels(labels, [('le', bound)])} {cumulative}")
+            lines.append(f"{name}_bucket{_labels(labels, [('le', '+Inf')])} {histogram.count}")
+            lines.append(f"{name}_sum{_labels(labels)} {histogram.sum}")
+            lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,46 @@
+"""Run schema migrations ahead of a deploy.
+
+Usage:
+    python migrate.py status
+    python migrate.py up [--target VERSION]
+"""
+import os
+import sys
+import asyncio
+import argparse
+from dotenv import load_dotenv
+from storage.postgres import connectForMigrations
+from migrations import loadMigrations, appliedVersions, migrate, MigrationError
+
+async def status(conn):
+    applied = await appliedVersions(conn)
+    for migration in loadMigrations():
+        mark = "x" if migration.version in applied else " "
+        print(f"[{mark}] {migration.version:04d}_{migration.name}  {migration.description}")
+
+async def main(args):
+    if not os.getenv("MIGRATION_DATABASE_URL") and not os.getenv("DATABASE_URL"):
+        print("DATABASE_URL is not set.")
+        return 1
+
+    conn, sessionSafe = await connectForMigrations()
+    try:
+        if args.command == "status":
+            await status(conn)
+        else:
+            try:
+                applied = await migrate(conn, target=args.target, sessionSafe=sessionSafe)
+            except MigrationError as e:
+                print(e)
+                return 1
+            print(f"Applied: {applied}" if applied else "Schema is up to date.")
+    finally:
+        await conn.close()
+    return 0
+
+if __name__ == "__main__":
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="AbyssBot schema migrations")
+    parser.add_argument("command", choices=["status", "up"])
+    parser.add_argument("--target", type=int, default=None, help="stop after this version")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,210 @@
+import os
+import re
+import time
+import pkgutil
+import importlib
+from dataclasses import dataclass
+
+import asyncpg
+
+# Arbitrary constant shared by every process that migrates this database
+MIGRATION_LOCK_KEY = 724_311_902
+
+_MODULE_NAME = re.compile(r"^m(\d{4})_(\w+)$")
+
+class MigrationError(RuntimeError):
+    pass
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    module: object
+
+    @property
+    def description(self):
+        return (self.module.__doc__ or "").strip()
+
+    @property
+    def transactional(self):
+        # CREATE INDEX CONCURRENTLY and friends cannot run inside a transaction
+        return getattr(self.module, "transactional", True)
+
+def loadMigrations():
+    """Every mNNNN_name module in this package, ordered by version."""
+    migrations = []
+    for info in pkgutil.iter_modules(__path__):
+        match = _MODULE_NAME.match(info.name)
+        if not match:
+            continue
+        module = importlib.import_module(f"{__name__}.{info.name}")
+        migrations.append(Migration(int(match.group(1)), match.group(2), module))
+    migrations.sort(key=lambda m: m.version)
+    versions = [m.version for m in migrations]
+    if len(set(versions)) != len(versions):
+        raise RuntimeError(f"Duplicate migration versions: {versions}")
+    return migrations
+
+async def columnExists(conn, table, column):
+    return await conn.fetchval("""
+        SELECT EXISTS (
+            SELECT 1 FROM information_schema.columns
+            WHERE table_schema = current_schema() AND table_name = $1 AND column_name = $2
+        )
+    """, table, column)
+
+async def constraintExists(conn, name):
+    return await conn.fetchval("""
+        SELECT EXISTS (
+            SELECT 1 FROM pg_constraint
+            WHERE conname = $1 AND connamespace = current_schema()::regnamespace
+        )
+    """, name)
+
+# ─────────────────────────────────────────────
+# Backfills
+# ─────────────────────────────────────────────
+
+BACKFILL_BATCH_SIZE = int(os.getenv("MIGRATION_BATCH_SIZE", "5000"))
+
+async def backfillSequence(conn, table, seqColumn, partitionColumn, unset=None, batchSize=None):
+    """Number rows 1..n within each partition, ordered by id, wherever seqColumn is unset.
+
+    Runs one set-based UPDATE per id range, each in its own transaction, so an
+    interrupted backfill keeps its finished batches and resumes from the rest:
+    numbering continues from the highest sequence already assigned in the partition.
+    Call from a migration with `transactional = False`.
+    """
+    unset = unset or f"{seqColumn} IS NULL"
+    batchSize = batchSize or BACKFILL_BATCH_SIZE
+
+    bounds = await conn.fetchrow(f"SELECT MIN(id) AS lo, MAX(id) AS hi, COUNT(*) AS total FROM {table} WHERE {unset}")
+    if not bounds['total']:
+        return 0
+
+    done = 0
+    lo = bounds['lo'] - 1
+    while lo < bounds['hi']:
+        hi = lo + batchSize
+        async with conn.transaction():
+            result = await conn.execute(f"""
+                WITH batch AS (
+                    SELECT id, {partitionColumn} FROM {table}
+                    WHERE id > $1 AND id <= $2 AND {unset}
+                ),
+                assigned AS (
+                    SELECT {partitionColumn}, MAX({seqColumn}) AS top FROM {table}
+                    WHERE NOT ({unset}) AND {partitionColumn} IN (SELECT {partitionColumn} FROM batch)
+                    GROUP BY {partitionColumn}
+                ),
+                numbered AS (
+                    SELECT b.id, COALESCE(a.top, 0)
+                        + row_number() OVER (PARTITION BY b.{partitionColumn} ORDER BY b.id) AS seq
+                    FROM batch b LEFT JOIN assigned a ON a.{partitionColumn} = b.{partitionColumn}
+                )
+                UPDATE {table} t SET {seqColumn} = n.seq FROM numbered n WHERE t.id = n.id
+            """, lo, hi)
+        done += int(result.split()[-1])
+        lo = hi
+        print(f"[Migration] {table}.{seqColumn}: {done}/{bounds['total']} rows backfilled")
+    return done
+
+# ─────────────────────────────────────────────
+# Version Tracking
+# ─────────────────────────────────────────────
+
+async def _ensureTable(conn):
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at BIGINT NOT NULL,
+            duration_ms INTEGER NOT NULL
+        );
+    """)
+
+async def currentVersion(conn):
+    """Highest applied version, 0 for a database that has never been migrated."""
+    try:
+        return await conn.fetchval("SELECT COALESCE(MAX(version), 0) FROM schema_migrations")
+    except asyncpg.UndefinedTableError:
+        return 0
+
+async def appliedVersions(conn):
+    try:
+        rows = await conn.fetch("SELECT version FROM schema_migrations")
+    except asyncpg.UndefinedTableError:
+        return set()
+    return {row['version'] for row in rows}
+
+async def pendingMigrations(conn, target=None):
+    """Migrations not yet recorded, up to and including target."""
+    applied = await appliedVersions(conn)
+    return [m for m in loadMigrations()
+            if m.version not in applied and (target is None or m.version <= target)]
+
+# ─────────────────────────────────────────────
+# Runner
+# ─────────────────────────────────────────────
+
+async def _apply(conn, migration):
+    start = time.perf_counter()
+    print(f"[Migration] Applying {migration.version:04d}_{migration.name}...")
+
+    async def record():
+        await conn.execute("""
+            INSERT INTO schema_migrations (version, name, applied_at, duration_ms)
+            VALUES ($1, $2, $3, $4)
+        """, migration.version, migration.name, int(time.time()),
+            int((time.perf_counter() - start) * 1000))
+
+    if migration.transactional:
+        async with conn.transaction():
+            # Re-check under the lock: another instance may have applied it while we waited
+            await conn.execute("SELECT pg_advisory_xact_lock($1)", MIGRATION_LOCK_KEY)
+            if migration.version in await appliedVersions(conn):
+                return False
+            await migration.module.up(conn)
+            await record()
+    else:
+        # A session lock: migrate() only gets here on a connection that keeps one server session
+        await conn.execute("SELECT pg_advisory_lock($1)", MIGRATION_LOCK_KEY)
+        try:
+            if migration.version in await appliedVersions(conn):
+                return False
+            await migration.module.up(conn)
+            await record()
+        finally:
+            await conn.execute("SELECT pg_advisory_unlock($1)", MIGRATION_LOCK_KEY)
+
+    print(f"[Migration] {migration.version:04d}_{migration.name} done in {time.perf_counter() - start:.2f}s")
+    return True
+
+async def migrate(conn, target=None, sessionSafe=True):
+    """Apply pending migrations in order. Returns the versions applied by this call.
+
+    Non-transactional migrations hold a session-level advisory lock, which a transaction-mode
+    pooler can hand to one server session and release on another, leaking it. Pass
+    sessionSafe=False for such a connection and they are refused before anything is applied.
+    """
+    migrations = loadMigrations()
+    latest = migrations[-1].version if migrations else 0
+    # Fast path: a single query when the schema is already current
+    if await currentVersion(conn) >= (target if target is not None else latest):
+        return []
+
+    pending = await pendingMigrations(conn, target)
+    if not sessionSafe:
+        blocked = [f"{m.version:04d}_{m.name}" for m in pending if not m.transactional]
+        if blocked:
+            raise MigrationError(
+                f"{', '.join(blocked)} must run on a direct or session-mode connection, not a transaction "
+                "pooler. Set MIGRATION_DATABASE_URL to one and run `python migrate.py up`."
+            )
+
+    await _ensureTable(conn)
+    applied = []
+    for migration in pending:
+        if await _apply(conn, migration):
+            applied.append(migration.version)
+    return applied
@@ -0,0 +1,196 @@
+"""Base tables for automod, moderation and the SDLC tracker."""
+
+async def up(conn):
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS config (
+            guild_id TEXT,
+            key TEXT,
+            value TEXT,
+            PRIMARY KEY (guild_id, key)
+        );
+    """)
+
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS warnings (
+            id SERIAL PRIMARY KEY,
+            guild_id TEXT,
+            user_id TEXT,
+            moderator_id TEXT,
+            reason TEXT,
+            timestamp BIGINT
+        );
+    """)
+
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS permissions (
+            guild_id TEXT,
+            command TEXT,
+            role_id TEXT,
+            PRIMARY KEY (guild_id, command, role_id)
+        );
+    """)
+
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS exemptions (
+            guild_id TEXT,
+            rule TEXT,
+            role_id TEXT,
+            PRIMARY KEY (guild_id, rule, role_id)
+        );
+    """)
+
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS filters (
+            guild_id TEXT,
+            type TEXT,
+            item TEXT,
+            PRIMARY KEY (guild_id, type, item)
+        );
+    """)
+
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS exempt_channels (
+            guild_id TEXT,
+            rule TEXT,
+            channel_id TEXT,
+            PRIMARY KEY (guild_id, rule, channel_id)
+        );
+    """)
+
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS projects (
+            id SERIAL PRIMARY KEY,
+            guild_id TEXT NOT NULL,
+            guild_seq INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            description TEXT DEFAULT '',
+            created_at BIGINT NOT NULL,
+            UNIQUE(guild_id, name),
+            UNIQUE(guild_id, guild_seq)
+        );
+    """)
+
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS sprints (
+            id SERIAL PRIMARY KEY,
+            guild_id TEXT NOT NULL,
+            project_id INTEGER REFERENCES projects(id) ON DELETE CASCADE,
+            name TEXT NOT NULL,
+            start_date BIGINT,
+            end_date BIGINT,
+            status TEXT DEFAULT 'planning',
+            created_at BIGINT NOT NULL
+        );
+    """)
+
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS tasks (
+            id SERIAL PRIMARY KEY,
+            guild_id TEXT NOT NULL,
+            guild_seq INTEGER NOT NULL,
+            project_id INTEGER REFERENCES projects(id) ON DELETE CASCADE,
+            title TEXT NOT NULL,
+            description TEXT DEFAULT '',
+            status TEXT DEFAULT 'backlog',
+            priority TEXT DEFAULT 'medium',
+            assignee_id TEXT,
+            creator_id TEXT NOT NULL,
+            created_at BIGINT NOT NULL,
+            updated_at BIGINT NOT NULL,
+            UNIQUE(guild_id, guild_seq)
+        );
+    """)
+
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS bugs (
+            id SERIAL PRIMARY KEY,
+            guild_id TEXT NOT NULL,
+            guild_seq INTEGER NOT NULL,
+            project_id INTEGER REFERENCES projects(id) ON DELETE CASCADE,
+            title TEXT NOT NULL,
+            description TEXT DEFAULT '',
+            severity TEXT DEFAULT 'medium',
+            status TEXT DEFAULT 'new',
+            assignee_id TEXT,
+            reporter_id TEXT NOT NULL,
+            tags TEXT DEFAULT '[]',
+            created_at BIGINT NOT NULL,
+            updated_at BIGINT NOT NULL,
+            UNIQUE(guild_id, guild_seq)
+        );
+    """)
+
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS team_roles (
+            guild_id TEXT NOT NULL,
+            user_id TEXT NOT NULL,
+            role TEXT NOT NULL DEFAULT 'viewer',
+            PRIMARY KEY (guild_id, user_id)
+        );
+    """)
+
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS checklists (
+            id SERIAL PRIMARY KEY,
+            guild_id TEXT NOT NULL,
+            guild_seq INTEGER NOT NULL,
+            task_id INTEGER REFERENCES tasks(id) ON DELETE SET NULL,
+            name TEXT NOT NULL,
+            created_by TEXT NOT NULL,
+            archived BOOLEAN DEFAULT FALSE,
+            created_at BIGINT NOT NULL,
+            UNIQUE(guild_id, guild_seq)
+        );
+    """)
+
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS checklist_items (
+            id SERIAL PRIMARY KEY,
+            checklist_id INTEGER REFERENCES checklists(id) ON DELETE CASCADE,
+            item_seq INTEGER NOT NULL DEFAULT 0,
+            text TEXT NOT NULL,
+            completed BOOLEAN DEFAULT FALSE,
+            toggled_by TEXT,
+            toggled_at BIGINT
+        );
+    """)
+
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS task_comments (
+            id SERIAL PRIMARY KEY,
+            task_id INTEGER REFERENCES tasks(id) ON DELETE CASCADE,
+            user_id TEXT NOT NULL,
+            content TEXT NOT NULL,
+            created_at BIGINT NOT NULL
+        );
+    """)
+
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS task_bug_links (
+            task_id INTEGER REFERENCES tasks(id) ON DELETE CASCADE,
+            bug_id INTEGER REFERENCES bugs(id) ON DELETE CASCADE,
+            PRIMARY KEY (task_id, bug_id)
+        );
+    """)
+
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS audit_log (
+            id SERIAL PRIMARY KEY,
+            guild_id TEXT NOT NULL,
+            action TEXT NOT NULL,
+            entity_type TEXT NOT NULL,
+            entity_id INTEGER,
+            user_id TEXT NOT NULL,
+            details TEXT DEFAULT '',
+            created_at BIGINT NOT NULL
+        );
+    """)
+
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS guild_counters (
+            guild_id TEXT NOT NULL,
+            entity_type TEXT NOT NULL,
+            next_seq INTEGER NOT NULL DEFAULT 1,
+            PRIMARY KEY (guild_id, entity_type)
+        );
+    """)
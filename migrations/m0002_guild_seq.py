@@ -0,0 +1,26 @@
+"""Per-guild sequential IDs for databases created before guild_seq existed."""
+from migrations import backfillSequence, constraintExists
+
+# Backfills commit per batch so a restart resumes where it stopped
+transactional = False
+
+async def up(conn):
+    for table in ['projects', 'tasks', 'bugs', 'checklists']:
+        await conn.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS guild_seq INTEGER")
+        await backfillSequence(conn, table, 'guild_seq', 'guild_id')
+        await conn.execute(f"ALTER TABLE {table} ALTER COLUMN guild_seq SET NOT NULL")
+
+        if not await constraintExists(conn, f"{table}_guild_seq_unique") and not await constraintExists(conn, f"{table}_guild_id_guild_seq_key"):
+            await conn.execute(f"""
+                ALTER TABLE {table} ADD CONSTRAINT {table}_guild_seq_unique
+                UNIQUE (guild_id, guild_seq)
+            """)
+
+        # Seed counters
+        entity_type = table.rstrip('s')  # projects -> project, tasks -> task, etc.
+        await conn.execute(f"""
+            INSERT INTO guild_counters (guild_id, entity_type, next_seq)
+            SELECT guild_id, $1, MAX(guild_seq) FROM {table} GROUP BY guild_id
+            ON CONFLICT (guild_id, entity_type)
+            DO UPDATE SET next_seq = GREATEST(guild_counters.next_seq, EXCLUDED.next_seq)
+        """, entity_type)
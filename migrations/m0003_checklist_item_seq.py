@@ -0,0 +1,10 @@
+"""Per-checklist item numbers for databases created before item_seq existed."""
+from migrations import backfillSequence
+
+# Backfills commit per batch so a restart resumes where it stopped
+transactional = False
+
+async def up(conn):
+    await conn.execute("ALTER TABLE checklist_items ADD COLUMN IF NOT EXISTS item_seq INTEGER NOT NULL DEFAULT 0")
+    # addChecklistItem always assigns MAX + 1, so 0 only ever marks a row that predates the column
+    await backfillSequence(conn, 'checklist_items', 'item_seq', 'checklist_id', unset="item_seq = 0")
@@ -0,0 +1,8 @@
+"""Sprints were removed; drop the leftover tasks.sprint_id column."""
+from migrations import columnExists
+
+async def up(conn):
+    if await columnExists(conn, 'tasks', 'sprint_id'):
+        await conn.execute("ALTER TABLE tasks DROP CONSTRAINT IF EXISTS tasks_sprint_id_fkey")
+        await conn.execute("ALTER TABLE tasks DROP COLUMN sprint_id")
+        print("[Migration] Removed sprint_id column from tasks")
@@ -0,0 +1,37 @@
+"""Indexes for the task, bug, warning, audit and link lookups."""
+
+# CREATE INDEX CONCURRENTLY keeps the tables writable but cannot run in a transaction
+transactional = False
+
+INDEXES = {
+    # getTasks / getBugs: equality on guild + project (+ status filter), newest first
+    'idx_tasks_project_status_created': "tasks (guild_id, project_id, status, created_at DESC)",
+    'idx_tasks_project_created': "tasks (guild_id, project_id, created_at DESC)",
+    'idx_bugs_project_status_created': "bugs (guild_id, project_id, status, created_at DESC)",
+    'idx_bugs_project_created': "bugs (guild_id, project_id, created_at DESC)",
+    # getUserWorkload / getBugCounts only ever look at open work
+    'idx_tasks_open_assignee': "tasks (guild_id, assignee_id) WHERE status NOT IN ('done', 'backlog')",
+    'idx_bugs_open_assignee': "bugs (guild_id, assignee_id) WHERE status <> 'closed'",
+    'idx_bugs_open_project_severity': "bugs (guild_id, project_id, severity) WHERE status <> 'closed'",
+    # getWarnings
+    'idx_warnings_guild_user': "warnings (guild_id, user_id, timestamp DESC)",
+    # getAuditLog, with and without the entity filters
+    'idx_audit_log_guild_created': "audit_log (guild_id, created_at DESC)",
+    'idx_audit_log_entity_created': "audit_log (guild_id, entity_type, entity_id, created_at DESC)",
+    # getLinkedTasks; the primary key only serves lookups by task_id
+    'idx_task_bug_links_bug': "task_bug_links (bug_id)",
+    # getChecklistItems / getComments, and ON DELETE CASCADE from their parents
+    'idx_checklist_items_checklist': "checklist_items (checklist_id, item_seq)",
+    'idx_task_comments_task': "task_comments (task_id, created_at)",
+}
+
+async def up(conn):
+    for name, definition in INDEXES.items():
+        # An interrupted CONCURRENTLY build leaves an INVALID index that IF NOT EXISTS would keep
+        invalid = await conn.fetchval("""
+            SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass($1)
+        """, name)
+        if invalid:
+            await conn.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+        await conn.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {definition}")
+        print(f"[Migration] Index {name} ready")
@@ -0,0 +1,10 @@
+"""Bot-wide key/value state, e.g. the hash of the last synced command tree."""
+
+async def up(conn):
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS bot_meta (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL,
+            updated_at BIGINT NOT NULL
+        );
+    """)
@@ -1,23 +1,243 @@
+import os
+import time
+import asyncio
+from collections import deque
+import aiohttp
 import discord
 from database import getConfig
+import metrics
+
+# Discord accepts at most 10 embeds and 6000 embed characters per message
+MODLOG_BATCH_SIZE = 10
+MODLOG_BATCH_CHARS = 6000
+MODLOG_FLUSH_INTERVAL = float(os.getenv("MODLOG_FLUSH_INTERVAL", "2"))
+# Entries held per channel before the oldest are dropped and summarized
+MODLOG_QUEUE_LIMIT = int(os.getenv("MODLOG_QUEUE_LIMIT", "100"))
+# Sends of one batch before it is given up on, backing off MODLOG_FLUSH_INTERVAL more each time
+MODLOG_MAX_ATTEMPTS = 3
+
+WEBHOOK_NAME = "AbyssBot Logs"
+
+# ─────────────────────────────────────────────
+# Webhook transport
+# ─────────────────────────────────────────────
+
+# channel_id -> (webhook_id, token); webhook requests have their own rate-limit buckets
+_webhooks = {}
+# Channels where we lack Manage Webhooks or the channel is gone, so logs keep going through channel.send
+_webhookUnavailable = set()
+# channel_id -> monotonic time after which a webhook that failed transiently is tried again
+_webhookRetryAt = {}
+WEBHOOK_RETRY_COOLDOWN = float(os.getenv("WEBHOOK_RETRY_COOLDOWN", "300"))
+_session = None
+
+def _getSession():
+    """One pooled HTTP session shared by every log webhook."""
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession()
+    return _session
+
+async def _getWebhook(bot, channel):
+    cached = _webhooks.get(channel.id)
+    if cached is None:
+        existing = [w for w in await channel.webhooks() if w.name == WEBHOOK_NAME and w.token and w.user == bot.user]
+        webhook = existing[0] if existing else await channel.create_webhook(name=WEBHOOK_NAME, reason="Mod log delivery")
+        cached = _webhooks[channel.id] = (webhook.id, webhook.token)
+    return discord.Webhook.partial(cached[0], cached[1], session=_getSession())
+
+def _webhookUsable(channelId):
+    if channelId in _webhookUnavailable:
+        return False
+    retryAt = _webhookRetryAt.get(channelId)
+    if retryAt is not None and time.monotonic() < retryAt:
+        return False
+    _webhookRetryAt.pop(channelId, None)
+    return True
+
+async def deliver(bot, channel, embeds):
+    """Send log embeds through the channel's webhook when the guild opted in, else as the bot."""
+    if _webhookUsable(channel.id) and await getConfig(channel.guild.id, "logWebhooks") == "1":
+        webhook = None
+        try:
+            webhook = await _getWebhook(bot, channel)
+            with metrics.timer("discord_rest_seconds", route="POST /webhooks/{webhook_id}/{webhook_token}"):
+                await webhook.send(embeds=embeds, username=bot.user.name, avatar_url=bot.user.display_avatar.url)
+            metrics.incr("modlog_sends_total", transport="webhook")
+            return
+        except discord.Forbidden:
+            _webhookUnavailable.add(channel.id)
+            print(f"Missing Manage Webhooks in channel {channel.id}, logging as the bot instead.")
+        except discord.NotFound:
+            if webhook is None:
+                # The channel itself is gone
+                _webhookUnavailable.add(channel.id)
+            else:
+                # Webhook was deleted; recreate it on the next flush
+                _webhooks.pop(channel.id, None)
+        except (discord.HTTPException, aiohttp.ClientError, asyncio.TimeoutError) as e:
+            _webhookRetryAt[channel.id] = time.monotonic() + WEBHOOK_RETRY_COOLDOWN
+            print(f"Webhook delivery to channel {channel.id} failed ({e}), logging as the bot for {WEBHOOK_RETRY_COOLDOWN:.0f}s.")
+    await channel.send(embeds=embeds)
+    metrics.incr("modlog_sends_total", transport="bot")
+
+async def closeTransport():
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+# ─────────────────────────────────────────────
+# Per-channel delivery queue
+# ─────────────────────────────────────────────
+
+_queues = {}
+
+class ModLogQueue:
+    """Coalesces log embeds for one channel into batched sends.
+
+    A single flusher task per channel means at most one request is in flight to it,
+    so a raid waits on Discord's per-channel rate limit once per batch rather than per entry.
+    """
+
+    def __init__(self, bot, channelId):
+        self.bot = bot
+        self.channelId = channelId
+        self.entries = deque()
+        self.dropped = 0
+        # Consecutive failed sends of the batch at the front of the queue
+        self.failures = 0
+        self.wakeup = asyncio.Event()
+        self.task = None
+
+    def put(self, embed):
+        if len(self.entries) >= MODLOG_QUEUE_LIMIT:
+            self.entries.popleft()
+            self.dropped += 1
+            metrics.incr("modlog_dropped_total")
+        self.entries.append((time.monotonic(), embed))
+
+        if len(self.entries) >= MODLOG_BATCH_SIZE:
+            self.wakeup.set()
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        try:
+            while self.entries or self.dropped:
+                if len(self.entries) < MODLOG_BATCH_SIZE:
+                    try:
+                        await asyncio.wait_for(self.wakeup.wait(), MODLOG_FLUSH_INTERVAL)
+                    except asyncio.TimeoutError:
+                        pass
+                self.wakeup.clear()
+                await self.flush()
+                if self.failures:
+                    await asyncio.sleep(MODLOG_FLUSH_INTERVAL * self.failures)
+        finally:
+            if not self.entries and _queues.get(self.channelId) is self:
+                del _queues[self.channelId]
+
+    def _takeBatch(self):
+        """Return (batch, overflow): up to one message of entries, led by a summary of `overflow` dropped ones."""
+        batch = []
+        overflow = self.dropped
+        if self.dropped:
+            summary = discord.Embed(
+                title="Mod Log Overflow",
+                description=f"{self.dropped} log entries were dropped because this channel's log queue was full.",
+                color=0xFFAA00
+            )
+            summary.timestamp = discord.utils.utcnow()
+            batch.append((time.monotonic(), summary))
+            self.dropped = 0
+        size = sum(len(embed) for _, embed in batch)
+        while self.entries and len(batch) < MODLOG_BATCH_SIZE:
+            entrySize = len(self.entries[0][1])
+            if batch and size + entrySize > MODLOG_BATCH_CHARS:
+                break
+            batch.append(self.entries.popleft())
+            size += entrySize
+        return batch, overflow
+
+    def _requeue(self, batch, overflow):
+        """Put a batch that failed to send back at the front, still within MODLOG_QUEUE_LIMIT."""
+        entries = batch[1:] if overflow else batch
+        room = max(MODLOG_QUEUE_LIMIT - len(self.entries), 0)
+        keep = entries[max(len(entries) - room, 0):]
+        lost = len(entries) - len(keep)
+        if lost:
+            metrics.incr("modlog_dropped_total", lost)
+        # Re-summarized on the next attempt rather than sent as a stale overflow embed
+        self.dropped += overflow + lost
+        self.entries.extendleft(reversed(keep))
+
+    async def flush(self):
+        batch, overflow = self._takeBatch()
+        if not batch:
+            return
+
+        channel = self.bot.get_channel(self.channelId)
+        if not channel:
+            metrics.incr("modlog_dropped_total", len(batch) - (1 if overflow else 0))
+            return
+
+        start = time.monotonic()
+        try:
+            await deliver(self.bot, channel, [embed for _, embed in batch])
+        except Exception as e:
+            metrics.incr("modlog_send_failures_total")
+            self.failures += 1
+            if self.failures < MODLOG_MAX_ATTEMPTS:
+                print(f"Failed to send mod log, will retry: {e}")
+                self._requeue(batch, overflow)
+            else:
+                print(f"Failed to send mod log {self.failures} times, dropping {len(batch)} entries: {e}")
+                metrics.incr("modlog_dropped_total", len(batch) - (1 if overflow else 0))
+                self.failures = 0
+            return
+        self.failures = 0
+        end = time.monotonic()
+        metrics.observe("modlog_flush_seconds", end - start)
+        metrics.incr("modlog_entries_sent_total", len(batch))
+        for queuedAt, _ in batch:
+            metrics.observe("modlog_delivery_seconds", end - queuedAt)
+
+def enqueueLog(bot, channelId, embed):
+    """Queue an embed for batched delivery to a log channel."""
+    queue = _queues.get(channelId)
+    if queue is None:
+        queue = _queues[channelId] = ModLogQueue(bot, channelId)
+    queue.put(embed)
+
+async def flushAll():
+    """Send everything still queued, e.g. before shutdown."""
+    for queue in list(_queues.values()):
+        while queue.entries or queue.dropped:
+            await queue.flush()
+
+def getModLogStats():
+    return {
+        'channels': len(_queues),
+        'queued': sum(len(q.entries) for q in _queues.values()),
+        'pendingDrops': sum(q.dropped for q in _queues.values()),
+    }
+
+# ─────────────────────────────────────────────
+# Automod / moderation log entries
+# ─────────────────────────────────────────────
+
+async def _automodLogChannel(guildId):
+    # Check for a dedicated automod log channel first, then fall back to the general mod log
+    return await getConfig(guildId, "automodLogChannel") or await getConfig(guildId, "modLogChannel")
 
 async def sendModLog(bot, guildId, user, channel, rule, messageContent=None, attachment=None, **kwargs):
     """Send to the automod log channel if set, otherwise fall back to the mod log channel."""
-    # Check for a dedicated automod log channel first
-    logChannelId = await getConfig(guildId, "automodLogChannel")
-    
-    # Fall back to general mod log if no automod channel
-    if not logChannelId:
-        logChannelId = await getConfig(guildId, "modLogChannel")
-    
+    logChannelId = await _automodLogChannel(guildId)
     if not logChannelId:
         return
 
     try:
-        logChannel = bot.get_channel(int(logChannelId))
-        if not logChannel:
-            return
-            
         embed = discord.Embed(title=f"Auto-Mod Action: {rule}", color=0xFF0000)
         embed.add_field(name="User", value=f"{user} (`{user.id}`)", inline=True)
         embed.add_field(name="Channel", value=f"{channel.mention} (`{channel.id}`)", inline=True)
@@ -35,8 +255,16 @@ async def sendModLog(bot, guildId, user, channel, rule, messageContent=None, att
         embed.set_footer(text=f"User ID: {user.id}")
         embed.timestamp = discord.utils.utcnow()
         
-        await logChannel.send(embed=embed)
+        enqueueLog(bot, int(logChannelId), embed)
         
     except Exception as e:
         print(f"Failed to send mod log: {e}")
 
+async def sendAutomodNotice(bot, guildId, title, description):
+    """Tell the guild's automod log about a problem with its own configuration."""
+    logChannelId = await _automodLogChannel(guildId)
+    if not logChannelId:
+        return
+    embed = discord.Embed(title=title, description=description, color=0xFFA500)
+    embed.timestamp = discord.utils.utcnow()
+    enqueueLog(bot, int(logChannelId), embed)
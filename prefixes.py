@@ -0,0 +1,31 @@
+from config import defaultPrefix
+from database import getConfig
+
+# guild_id -> prefix; read on every message, so lookups must never await
+_prefixes = {}
+
+def resolvePrefix(guildId):
+    if guildId is None:
+        return defaultPrefix
+    return _prefixes.get(str(guildId)) or defaultPrefix
+
+def setPrefix(guildId, prefix):
+    """Call after persisting a new prefix so the next message sees it."""
+    _prefixes[str(guildId)] = prefix or defaultPrefix
+
+def primePrefixes(configs):
+    """Fill the map from already-loaded {guild_id: config} dicts, e.g. from bootstrapGuilds."""
+    for guildId, config in configs.items():
+        setPrefix(guildId, config.get("prefix"))
+
+async def refreshPrefix(guildId):
+    """Reload a single guild, e.g. after it was just created by initDefaults."""
+    setPrefix(guildId, await getConfig(guildId, "prefix"))
+
+def isCommandCandidate(message):
+    """Cheap first-character reject: most chat can't start with the guild's prefix."""
+    content = message.content
+    if not content:
+        return False
+    prefix = resolvePrefix(message.guild.id if message.guild else None)
+    return content[0] == prefix[0] and content.startswith(prefix)
@@ -0,0 +1,365 @@
+import os
+import re
+import signal
+import asyncio
+import multiprocessing
+import metrics
+
+try:
+    import re._parser as sre_parse
+    import re._constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
+
+REGEX_MAX_LENGTH = int(os.getenv("REGEX_MAX_LENGTH", "200"))
+# Seconds a single message may spend in a guild's patterns before it is abandoned
+REGEX_TIME_BUDGET = float(os.getenv("REGEX_TIME_BUDGET", "0.05"))
+# Worker processes for pattern evaluation; 0 evaluates inline on the event loop
+REGEX_WORKERS = int(os.getenv("REGEX_WORKERS", "2"))
+# Timeouts after which a pattern set is disabled until its patterns change
+REGEX_MAX_TIMEOUTS = 3
+# Seconds a message may wait for a free worker before it is let through unfiltered
+REGEX_QUEUE_TIMEOUT = float(os.getenv("REGEX_QUEUE_TIMEOUT", str(REGEX_TIME_BUDGET)))
+# Seconds a freshly started worker gets to report in
+WORKER_START_TIMEOUT = 30
+
+_REPEATS = (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT)
+_UNCOMBINABLE = (sre_constants.GROUPREF, sre_constants.GROUPREF_EXISTS)
+
+# ─────────────────────────────────────────────
+# Validation
+# ─────────────────────────────────────────────
+
+def _walk(parsed):
+    """Yield every (op, av) node of a parsed pattern, depth first."""
+    for op, av in parsed:
+        yield op, av
+        if op in _REPEATS:
+            yield from _walk(av[2])
+        elif op == sre_constants.SUBPATTERN:
+            yield from _walk(av[-1])
+        elif op == sre_constants.BRANCH:
+            for branch in av[1]:
+                yield from _walk(branch)
+        elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            yield from _walk(av[1])
+        elif op == sre_constants.GROUPREF_EXISTS:
+            yield from _walk(av[1])
+            if av[2]:
+                yield from _walk(av[2])
+
+def _isUnbounded(av):
+    return av[1] == sre_constants.MAXREPEAT or av[1] > 1
+
+# Characters first-sets are measured over, plus every literal in the pattern being checked
+_ALPHABET = tuple(chr(c) for c in range(0x250)) + tuple("\u0660\u2003\u2028\u3000\u4e2d\uff41")
+_ZERO_WIDTH = (sre_constants.AT, sre_constants.ASSERT, sre_constants.ASSERT_NOT)
+# Python 3.11+ atomic groups and possessive repeats never backtrack into themselves
+_NO_BACKTRACK = tuple(op for op in (getattr(sre_constants, "ATOMIC_GROUP", None),
+                                    getattr(sre_constants, "POSSESSIVE_REPEAT", None)) if op is not None)
+_CATEGORIES = {
+    sre_constants.CATEGORY_DIGIT: r"\d", sre_constants.CATEGORY_NOT_DIGIT: r"\D",
+    sre_constants.CATEGORY_SPACE: r"\s", sre_constants.CATEGORY_NOT_SPACE: r"\S",
+    sre_constants.CATEGORY_WORD: r"\w", sre_constants.CATEGORY_NOT_WORD: r"\W",
+}
+
+def _alphabet(parsed):
+    extra = []
+    for op, av in _walk(parsed):
+        if op in (sre_constants.LITERAL, sre_constants.NOT_LITERAL):
+            extra.append(chr(av))
+        elif op == sre_constants.IN:
+            extra.extend(chr(itemAv) for itemOp, itemAv in av if itemOp == sre_constants.LITERAL)
+    return tuple(dict.fromkeys(_ALPHABET + tuple(extra)))
+
+def _classSource(op, av):
+    if op == sre_constants.LITERAL:
+        return re.escape(chr(av))
+    if op == sre_constants.NOT_LITERAL:
+        return f"[^{re.escape(chr(av))}]"
+    if op == sre_constants.CATEGORY:
+        return _CATEGORIES[av]
+    if op == sre_constants.IN:
+        items = []
+        for itemOp, itemAv in av:
+            if itemOp == sre_constants.NEGATE:
+                items.append("^")
+            elif itemOp == sre_constants.RANGE:
+                items.append(f"{re.escape(chr(itemAv[0]))}-{re.escape(chr(itemAv[1]))}")
+            else:
+                items.append(_classSource(itemOp, itemAv))
+        return f"[{''.join(items)}]"
+    raise KeyError(op)
+
+def _chars(op, av, alphabet):
+    """The characters a single-character node can match, out of `alphabet`."""
+    try:
+        compiled = re.compile(_classSource(op, av), re.IGNORECASE)
+    except (KeyError, re.error):
+        # ANY, or something we can't rebuild: assume it matches everything
+        return frozenset(alphabet)
+    return frozenset(c for c in alphabet if compiled.fullmatch(c))
+
+def _first(seq, alphabet):
+    """(characters seq can start with, whether seq can match the empty string)"""
+    chars = frozenset()
+    for op, av in seq:
+        if op in _REPEATS or op == getattr(sre_constants, "POSSESSIVE_REPEAT", None):
+            nodeChars, nullable = _first(av[2], alphabet)
+            nullable = nullable or av[0] == 0
+        elif op == sre_constants.SUBPATTERN:
+            nodeChars, nullable = _first(av[-1], alphabet)
+        elif op == getattr(sre_constants, "ATOMIC_GROUP", None):
+            nodeChars, nullable = _first(av, alphabet)
+        elif op == sre_constants.BRANCH:
+            branches = [_first(branch, alphabet) for branch in av[1]]
+            nodeChars = frozenset().union(*(c for c, _ in branches))
+            nullable = any(n for _, n in branches)
+        elif op in _ZERO_WIDTH:
+            nodeChars, nullable = frozenset(), True
+        elif op in (sre_constants.GROUPREF, sre_constants.GROUPREF_EXISTS):
+            nodeChars, nullable = frozenset(alphabet), True
+        else:
+            nodeChars, nullable = _chars(op, av, alphabet), False
+        chars |= nodeChars
+        if not nullable:
+            return chars, False
+    return chars, True
+
+def _isAmbiguous(seq, follow, alphabet, looping):
+    """Whether, inside a repeat, some choice point has two ways forward that start with the same character.
+
+    `follow` is what can come right after seq. That overlap is what lets `(a+)+` or `(a|aa)*` try
+    exponentially many splits of the same text, while `(\\w+\\.)+com` only ever has one.
+    """
+    for i, (op, av) in enumerate(seq):
+        rest, restNullable = _first(seq[i + 1:], alphabet)
+        after = rest | follow if restNullable else rest
+        if op in _REPEATS:
+            body = av[2]
+            bodyChars, bodyNullable = _first(body, alphabet)
+            repeats = _isUnbounded(av)
+            if repeats and bodyNullable:
+                return True
+            if looping and av[0] != av[1] and bodyChars & after:
+                return True
+            if _isAmbiguous(body, after | bodyChars if repeats else after, alphabet, looping or repeats):
+                return True
+        elif op == sre_constants.SUBPATTERN:
+            if _isAmbiguous(av[-1], after, alphabet, looping):
+                return True
+        elif op == sre_constants.BRANCH:
+            if looping:
+                starts = []
+                for branch in av[1]:
+                    chars, nullable = _first(branch, alphabet)
+                    starts.append(chars | after if nullable else chars)
+                if any(a & b for j, a in enumerate(starts) for b in starts[j + 1:]):
+                    return True
+            if any(_isAmbiguous(branch, after, alphabet, looping) for branch in av[1]):
+                return True
+        elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            if _isAmbiguous(av[1], frozenset(), alphabet, looping):
+                return True
+        elif op == sre_constants.GROUPREF_EXISTS:
+            if any(_isAmbiguous(branch, after, alphabet, looping) for branch in av[1:] if branch):
+                return True
+    return False
+
+def validatePattern(pattern):
+    """Return a human-readable reason the pattern is unsafe, or None if it is acceptable."""
+    if len(pattern) > REGEX_MAX_LENGTH:
+        return f"Pattern is longer than {REGEX_MAX_LENGTH} characters."
+    try:
+        parsed = sre_parse.parse(pattern, re.IGNORECASE)
+    except re.error as e:
+        return f"Invalid regex: {e}"
+    if _isAmbiguous(parsed, frozenset(), _alphabet(parsed), False):
+        return "Repetition that can match the same text more than one way (e.g. `(a+)+` or `(a|aa)*`) can hang the filter."
+    return None
+
+def findUnsafePattern(patterns):
+    """Return (pattern, reason) for the first pattern validatePattern rejects, or None."""
+    for pattern in patterns:
+        error = validatePattern(pattern)
+        if error:
+            return pattern, error
+    return None
+
+# ─────────────────────────────────────────────
+# Worker Pool
+# ─────────────────────────────────────────────
+
+def _workerMain(conn):
+    # Ctrl+C is the parent's to handle; a worker only ever exits by EOF or being killed
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    conn.send(True)
+    while True:
+        try:
+            sources, flags, content = conn.recv()
+        except EOFError:
+            return
+        # re's own cache keeps these compiled inside each worker between messages
+        conn.send(any(re.search(source, content, flags) for source in sources))
+
+class _Worker:
+    """One evaluation process and the parent's end of its pipe."""
+
+    def __init__(self):
+        self.conn, childConn = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_workerMain, args=(childConn,), daemon=True)
+        self.process.start()
+        childConn.close()
+
+    def kill(self):
+        # A runaway match never returns on its own
+        self.process.kill()
+        self.conn.close()
+
+_idle = None
+_workers = set()
+_starting = set()
+
+async def _startWorker(idle):
+    if idle is not _idle:
+        return  # the pool was shut down before this replacement got going
+    worker = _Worker()
+    _workers.add(worker)
+    try:
+        # Process start-up (a fresh import under spawn) must never count against a message's budget
+        ready = await asyncio.to_thread(worker.conn.poll, WORKER_START_TIMEOUT) and worker.conn.recv()
+    except (OSError, EOFError):
+        ready = False
+    if ready and worker in _workers and idle is _idle:
+        idle.put_nowait(worker)
+        return
+    if worker in _workers:
+        print("Regex worker failed to start.")
+    _workers.discard(worker)
+    worker.kill()
+
+def _replaceWorker(worker):
+    if worker not in _workers:
+        return  # the pool was shut down under us
+    _workers.discard(worker)
+    worker.kill()
+    task = asyncio.create_task(_startWorker(_idle))
+    _starting.add(task)
+    task.add_done_callback(_starting.discard)
+
+async def warmPool():
+    """Start the workers ahead of time so process start-up never counts against the budget."""
+    global _idle
+    if REGEX_WORKERS <= 0 or _idle is not None:
+        return
+    _idle = asyncio.Queue()
+    await asyncio.gather(*(_startWorker(_idle) for _ in range(REGEX_WORKERS)))
+
+def shutdownPool():
+    global _idle
+    for worker in list(_workers):
+        worker.kill()
+    _workers.clear()
+    _idle = None
+
+# ─────────────────────────────────────────────
+# Pattern Sets
+# ─────────────────────────────────────────────
+
+def _combinable(pattern):
+    try:
+        parsed = sre_parse.parse(pattern)
+    except re.error:
+        return False
+    state = getattr(parsed, "state", None) or parsed.pattern
+    if state.groupdict:
+        return False
+    return not any(op in _UNCOMBINABLE for op, _ in _walk(parsed))
+
+class PatternSet:
+    """A guild's regexes compiled once and merged into as few alternations as possible."""
+
+    def __init__(self, patterns, flags=re.IGNORECASE, label=""):
+        self.flags = flags
+        # Which filter these belong to, for metrics and log lines
+        self.label = label
+        self.timeouts = 0
+        self.quarantineReported = False
+        valid = []
+        for pattern in dict.fromkeys(patterns):
+            try:
+                re.compile(pattern, flags)
+            except re.error:
+                continue
+            valid.append(pattern)
+        self.patterns = tuple(valid)
+
+        combined = [p for p in valid if _combinable(p)]
+        separate = [p for p in valid if p not in combined]
+        sources = []
+        if combined:
+            merged = "|".join(f"(?:{p})" for p in combined)
+            try:
+                re.compile(merged, flags)
+                sources.append(merged)
+            except re.error:
+                # e.g. inline global flags, which are only legal at the very start
+                separate = valid
+        self.sources = tuple(sources + separate)
+        self.compiled = tuple(re.compile(source, flags) for source in self.sources)
+
+    def __bool__(self):
+        return bool(self.sources)
+
+    def __len__(self):
+        return len(self.patterns)
+
+    @property
+    def quarantined(self):
+        return self.timeouts >= REGEX_MAX_TIMEOUTS
+
+    def searchInline(self, content):
+        return any(pattern.search(content) for pattern in self.compiled)
+
+    async def search(self, content):
+        """Whether any pattern matches, evaluated off the event loop within REGEX_TIME_BUDGET."""
+        if not self.sources or self.quarantined:
+            return False
+        if REGEX_WORKERS <= 0:
+            return self.searchInline(content)
+
+        await warmPool()
+        idle = _idle
+        if idle is None or not _workers:
+            return False
+        try:
+            worker = await asyncio.wait_for(idle.get(), REGEX_QUEUE_TIMEOUT)
+        except asyncio.TimeoutError:
+            # Every worker busy or being replaced, or the pool shut down under us: fail open
+            metrics.incr("regex_queue_timeouts_total", filter=self.label)
+            return False
+        if worker not in _workers:
+            return False
+        try:
+            worker.conn.send((self.sources, self.flags, content))
+            # The budget starts once a worker has the message, not while it waited for one
+            if await asyncio.to_thread(worker.conn.poll, REGEX_TIME_BUDGET):
+                matched = worker.conn.recv()
+                if worker in _workers:
+                    idle.put_nowait(worker)
+                return matched
+        except (OSError, EOFError):
+            if worker in _workers:
+                print("Regex worker died; replacing it.")
+                _replaceWorker(worker)
+            return False
+
+        self.timeouts += 1
+        metrics.incr("regex_timeouts_total", filter=self.label)
+        print(f"Regex evaluation exceeded {REGEX_TIME_BUDGET}s ({self.timeouts}/{REGEX_MAX_TIMEOUTS}): {self.patterns}")
+        if self.timeouts == REGEX_MAX_TIMEOUTS:
+            metrics.incr("regex_quarantined_total", filter=self.label)
+            print("Regex pattern set disabled until its patterns change.")
+        _replaceWorker(worker)
+        return False
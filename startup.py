@@ -0,0 +1,99 @@
+import time
+import asyncio
+from contextlib import asynccontextmanager
+import metrics
+
+# ─────────────────────────────────────────────
+# Readiness State
+# ─────────────────────────────────────────────
+
+STARTING = "starting"
+DATABASE_READY = "database_ready"
+AUTOMOD_READY = "automod_ready"
+READY = "ready"
+# Started, but some non-critical extension failed to load
+DEGRADED = "degraded"
+# The database or guild bootstrap failed; nothing guild-specific can run
+FAILED = "failed"
+STATES = (STARTING, DATABASE_READY, AUTOMOD_READY, READY, DEGRADED, FAILED)
+
+processStart = time.monotonic()
+state = STARTING
+# phase name -> seconds, in the order the phases finished
+phaseTimings = {}
+failedExtensions = {}
+firstFilteredAt = None
+
+def setState(newState):
+    global state
+    state = newState
+    print(f"[Startup] {newState} after {time.monotonic() - processStart:.2f}s")
+
+def isReady():
+    return state == READY
+
+def isStarted():
+    """Startup finished and prefixes are primed, even if an optional extension failed."""
+    return state in (READY, DEGRADED)
+
+def markFirstFiltered():
+    """Record the first message automod evaluated; cheap enough to call on every message."""
+    global firstFilteredAt
+    if firstFilteredAt is None:
+        firstFilteredAt = time.monotonic() - processStart
+        metrics.setGauge("startup_first_filtered_seconds", firstFilteredAt)
+
+def readiness():
+    return {
+        'state': state,
+        'uptime': time.monotonic() - processStart,
+        'phases': dict(phaseTimings),
+        'failedExtensions': dict(failedExtensions),
+        'firstFilteredMessage': firstFilteredAt,
+    }
+
+@asynccontextmanager
+async def phase(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        phaseTimings[name] = elapsed
+        metrics.observe("startup_phase_seconds", elapsed, phase=name)
+        print(f"[Startup] {name}: {elapsed:.2f}s")
+
+# ─────────────────────────────────────────────
+# Extension Loading
+# ─────────────────────────────────────────────
+
+async def loadExtensions(bot, extensions, dependencies=None):
+    """Load extensions concurrently, each one only after the extensions it depends on.
+
+    `dependencies` maps an extension to the extensions its setup() needs loaded first.
+    An extension whose dependency failed is skipped. Returns the names that loaded.
+    """
+    dependencies = dependencies or {}
+    tasks = {}
+
+    async def load(ext):
+        for dep in dependencies.get(ext, ()):
+            if dep in tasks and not await tasks[dep]:
+                failedExtensions[ext] = f"dependency {dep} failed"
+                print(f"SKIPPED extension {ext}: dependency {dep} failed to load")
+                return False
+        start = time.perf_counter()
+        try:
+            await bot.load_extension(ext)
+        except Exception as e:
+            failedExtensions[ext] = str(e)
+            print(f"FAILED to load extension {ext}: {e}")
+            return False
+        metrics.observe("startup_extension_seconds", time.perf_counter() - start, extension=ext)
+        print(f"Loaded extension: {ext}")
+        return True
+
+    for ext in extensions:
+        tasks[ext] = asyncio.create_task(load(ext))
+    results = await asyncio.gather(*tasks.values())
+    return [ext for ext, ok in zip(tasks, results) if ok]
@@ -0,0 +1,23 @@
+import os
+
+BACKENDS = ("postgres", "sqlite", "memory")
+
+def createStorage(backend=None):
+    """Build (but don't connect) a backend; drivers are only imported when chosen.
+
+    Defaults to STORAGE_BACKEND, read at call time so a .env loaded after import still counts:
+        postgres  asyncpg pool on DATABASE_URL (default)
+        sqlite    local file at SQLITE_PATH, for single-node deployments
+        memory    process-local tables, for tests, replays and benchmarks; nothing is persisted
+    """
+    backend = (backend or os.getenv("STORAGE_BACKEND", "postgres")).lower()
+    if backend == "postgres":
+        from storage.postgres import PostgresStorage
+        return PostgresStorage()
+    if backend == "sqlite":
+        from storage.sqlite import SqliteStorage
+        return SqliteStorage()
+    if backend == "memory":
+        from storage.memory import MemoryStorage
+        return MemoryStorage()
+    raise ValueError(f"Unknown STORAGE_BACKEND: {backend}. Must be one of: {', '.join(BACKENDS)}")
@@ -0,0 +1,639 @@
+import json
+import time
+import heapq
+
+class UniqueViolationError(Exception):
+    pass
+
+class ForeignKeyViolationError(Exception):
+    pass
+
+# ─────────────────────────────────────────────
+# Tables
+# ─────────────────────────────────────────────
+
+class Table:
+    """Rows keyed by primary key, with hash indexes, unique constraints and foreign keys.
+
+    Just enough of a table for the queries PostgresStorage runs: equality lookups pick the
+    widest index whose columns are all constrained, anything else is filtered in Python.
+    """
+
+    def __init__(self, name, columns, primaryKey=("id",), unique=(), indexes=()):
+        self.name = name
+        self.columns = columns  # {column: default}, in schema order
+        self.primaryKey = primaryKey
+        self.serial = primaryKey == ("id",)
+        self.nextId = 1
+        self.rows = {}
+        self.unique = {cols: {} for cols in unique}
+        self.indexes = {cols: {} for cols in indexes}
+        self.references = []  # (column, parent table)
+        self.children = []  # (child table, column, "cascade" | "set null")
+
+    def reference(self, column, parent, onDelete="cascade"):
+        self.references.append((column, parent))
+        parent.children.append((self, column, onDelete))
+
+    def _pk(self, row):
+        return row['id'] if self.serial else tuple(row[c] for c in self.primaryKey)
+
+    def _index(self, row):
+        pk = self._pk(row)
+        for cols, entries in self.unique.items():
+            entries[tuple(row[c] for c in cols)] = row
+        for cols, entries in self.indexes.items():
+            entries.setdefault(tuple(row[c] for c in cols), {})[pk] = row
+
+    def _unindex(self, row):
+        pk = self._pk(row)
+        for cols, entries in self.unique.items():
+            entries.pop(tuple(row[c] for c in cols), None)
+        for cols, entries in self.indexes.items():
+            key = tuple(row[c] for c in cols)
+            bucket = entries.get(key)
+            if bucket is not None:
+                bucket.pop(pk, None)
+                if not bucket:
+                    del entries[key]
+
+    def _checkUnique(self, row, pk):
+        if pk in self.rows and self.rows[pk] is not row:
+            raise UniqueViolationError(f'duplicate key value violates unique constraint "{self.name}_pkey"')
+        for cols, entries in self.unique.items():
+            existing = entries.get(tuple(row[c] for c in cols))
+            if existing is not None and existing is not row:
+                raise UniqueViolationError(f'duplicate key value violates unique constraint on {self.name} ({", ".join(cols)})')
+
+    def conflict(self, values):
+        """The existing row a new row with `values` would collide with, if any."""
+        if not self.serial:
+            existing = self.rows.get(tuple(values[c] for c in self.primaryKey))
+            if existing is not None:
+                return existing
+        for cols, entries in self.unique.items():
+            existing = entries.get(tuple(values.get(c, self.columns.get(c)) for c in cols))
+            if existing is not None:
+                return existing
+        return None
+
+    def insert(self, values):
+        row = dict(self.columns)
+        if self.serial:
+            # Like a SERIAL column, the id is used up even if the insert then fails
+            row['id'] = self.nextId
+            self.nextId += 1
+        row.update(values)
+        for column, parent in self.references:
+            if row[column] is not None and row[column] not in parent.rows:
+                raise ForeignKeyViolationError(f'insert or update on table "{self.name}" violates foreign key on {column}')
+        pk = self._pk(row)
+        self._checkUnique(row, pk)
+        self.rows[pk] = row
+        self._index(row)
+        return row
+
+    def insertOrIgnore(self, values):
+        """INSERT ... ON CONFLICT DO NOTHING; the new row, or None if it already existed."""
+        if self.conflict(values) is not None:
+            return None
+        return self.insert(values)
+
+    def update(self, row, **changes):
+        self._unindex(row)
+        previous = {column: row[column] for column in changes}
+        row.update(changes)
+        try:
+            self._checkUnique(row, self._pk(row))
+        except UniqueViolationError:
+            row.update(previous)
+            self._index(row)
+            raise
+        self._index(row)
+        return row
+
+    def delete(self, row):
+        for child, column, onDelete in self.children:
+            for dependent in child.find(**{column: row['id']}):
+                if onDelete == "cascade":
+                    child.delete(dependent)
+                else:
+                    child.update(dependent, **{column: None})
+        self._unindex(row)
+        del self.rows[self._pk(row)]
+
+    def get(self, **where):
+        rows = self.find(**where)
+        return rows[0] if rows else None
+
+    def find(self, **where):
+        """Rows equal to every value in `where`, in insertion order."""
+        if self.serial and 'id' in where:
+            row = self.rows.get(where['id'])
+            candidates = [row] if row is not None else []
+        elif not self.serial and all(c in where for c in self.primaryKey):
+            row = self.rows.get(tuple(where[c] for c in self.primaryKey))
+            candidates = [row] if row is not None else []
+        else:
+            candidates = self._candidates(where)
+        return [row for row in candidates if all(row.get(c) == v for c, v in where.items())]
+
+    def _candidates(self, where):
+        best = None
+        for cols in list(self.unique) + list(self.indexes):
+            if all(c in where for c in cols) and (best is None or len(cols) > len(best)):
+                best = cols
+        if best is None:
+            return list(self.rows.values())
+        key = tuple(where[c] for c in best)
+        if best in self.unique:
+            row = self.unique[best].get(key)
+            return [row] if row is not None else []
+        return list(self.indexes[best].get(key, {}).values())
+
+def _newestFirst(rows, limit=None):
+    # Both are stable, so rows with the same created_at keep insertion order
+    if limit is not None:
+        return heapq.nlargest(limit, rows, key=lambda row: row['created_at'])
+    return sorted(rows, key=lambda row: row['created_at'], reverse=True)
+
+def _copies(rows):
+    return [dict(row) for row in rows]
+
+# ─────────────────────────────────────────────
+# Storage
+# ─────────────────────────────────────────────
+
+class MemoryStorage:
+    """Everything in process memory; for tests, replays and benchmarks. Nothing is persisted.
+
+    Mirrors the schema in migrations/ and the semantics of the PostgresStorage queries,
+    including guild_counters sequencing, ON CONFLICT behaviour and ON DELETE actions.
+    """
+
+    name = "memory"
+
+    def __init__(self):
+        self.pool = None
+        self.config = Table("config", {'guild_id': None, 'key': None, 'value': None},
+                            primaryKey=("guild_id", "key"), indexes=[("guild_id",), ("key",)])
+        self.warnings = Table("warnings", {'id': None, 'guild_id': None, 'user_id': None, 'moderator_id': None, 'reason': None, 'timestamp': None},
+                              indexes=[("guild_id", "user_id")])
+        self.permissions = Table("permissions", {'guild_id': None, 'command': None, 'role_id': None},
+                                 primaryKey=("guild_id", "command", "role_id"), indexes=[("guild_id", "command")])
+        self.exemptions = Table("exemptions", {'guild_id': None, 'rule': None, 'role_id': None},
+                                primaryKey=("guild_id", "rule", "role_id"), indexes=[("guild_id",), ("guild_id", "rule")])
+        self.filters = Table("filters", {'guild_id': None, 'type': None, 'item': None},
+                             primaryKey=("guild_id", "type", "item"), indexes=[("guild_id",), ("guild_id", "type")])
+        self.exemptChannels = Table("exempt_channels", {'guild_id': None, 'rule': None, 'channel_id': None},
+                                    primaryKey=("guild_id", "rule", "channel_id"), indexes=[("guild_id",), ("guild_id", "rule")])
+        self.projects = Table("projects", {'id': None, 'guild_id': None, 'guild_seq': None, 'name': None, 'description': '', 'created_at': None},
+                              unique=[("guild_id", "name"), ("guild_id", "guild_seq")], indexes=[("guild_id",)])
+        self.sprints = Table("sprints", {'id': None, 'guild_id': None, 'project_id': None, 'name': None, 'start_date': None, 'end_date': None, 'status': 'planning', 'created_at': None},
+                             indexes=[("project_id",), ("guild_id", "project_id")])
+        self.tasks = Table("tasks", {'id': None, 'guild_id': None, 'guild_seq': None, 'project_id': None, 'title': None, 'description': '',
+                                     'status': 'backlog', 'priority': 'medium', 'assignee_id': None, 'creator_id': None, 'created_at': None, 'updated_at': None},
+                           unique=[("guild_id", "guild_seq")], indexes=[("project_id",), ("guild_id", "project_id"), ("guild_id", "assignee_id")])
+        self.bugs = Table("bugs", {'id': None, 'guild_id': None, 'guild_seq': None, 'project_id': None, 'title': None, 'description': '',
+                                   'severity': 'medium', 'status': 'new', 'assignee_id': None, 'reporter_id': None, 'tags': '[]', 'created_at': None, 'updated_at': None},
+                          unique=[("guild_id", "guild_seq")], indexes=[("project_id",), ("guild_id", "project_id"), ("guild_id", "assignee_id")])
+        self.teamRoles = Table("team_roles", {'guild_id': None, 'user_id': None, 'role': 'viewer'},
+                               primaryKey=("guild_id", "user_id"), indexes=[("guild_id",)])
+        self.checklists = Table("checklists", {'id': None, 'guild_id': None, 'guild_seq': None, 'task_id': None, 'name': None, 'created_by': None, 'archived': False, 'created_at': None},
+                                unique=[("guild_id", "guild_seq")], indexes=[("guild_id",), ("task_id",)])
+        self.checklistItems = Table("checklist_items", {'id': None, 'checklist_id': None, 'item_seq': 0, 'text': None, 'completed': False, 'toggled_by': None, 'toggled_at': None},
+                                    indexes=[("checklist_id",), ("checklist_id", "item_seq")])
+        self.taskComments = Table("task_comments", {'id': None, 'task_id': None, 'user_id': None, 'content': None, 'created_at': None},
+                                  indexes=[("task_id",)])
+        self.taskBugLinks = Table("task_bug_links", {'task_id': None, 'bug_id': None},
+                                  primaryKey=("task_id", "bug_id"), indexes=[("task_id",), ("bug_id",)])
+        self.auditLog = Table("audit_log", {'id': None, 'guild_id': None, 'action': None, 'entity_type': None, 'entity_id': None, 'user_id': None, 'details': '', 'created_at': None},
+                              indexes=[("guild_id",), ("guild_id", "entity_type", "entity_id")])
+        self.guildCounters = Table("guild_counters", {'guild_id': None, 'entity_type': None, 'next_seq': 1},
+                                   primaryKey=("guild_id", "entity_type"))
+        self.botMeta = Table("bot_meta", {'key': None, 'value': None, 'updated_at': None}, primaryKey=("key",))
+
+        self.sprints.reference('project_id', self.projects)
+        self.tasks.reference('project_id', self.projects)
+        self.bugs.reference('project_id', self.projects)
+        self.checklists.reference('task_id', self.tasks, onDelete="set null")
+        self.checklistItems.reference('checklist_id', self.checklists)
+        self.taskComments.reference('task_id', self.tasks)
+        self.taskBugLinks.reference('task_id', self.tasks)
+        self.taskBugLinks.reference('bug_id', self.bugs)
+
+    async def connect(self):
+        print("Using in-memory storage; nothing will be persisted.")
+        return True
+
+    async def close(self):
+        pass
+
+    async def ping(self, timeout=2.0):
+        return True
+
+    def poolStats(self):
+        return {'size': 0, 'idle': 0, 'max': 0}
+
+    # ─────────────────────────────────────────────
+    # Config
+    # ─────────────────────────────────────────────
+
+    async def getGuildConfig(self, guildId):
+        return {row['key']: row['value'] for row in self.config.find(guild_id=str(guildId))}
+
+    async def setConfig(self, guildId, key, value):
+        row = self.config.get(guild_id=str(guildId), key=key)
+        if row:
+            self.config.update(row, value=str(value))
+        else:
+            self.config.insert({'guild_id': str(guildId), 'key': key, 'value': str(value)})
+
+    async def insertConfigDefaults(self, guildId, values):
+        for key, val in values.items():
+            self.config.insertOrIgnore({'guild_id': str(guildId), 'key': key, 'value': val})
+
+    async def bootstrapConfig(self, guildIds, defaults):
+        configs = {}
+        created = set()
+        for guildId in guildIds:
+            for key, val in defaults.items():
+                if self.config.insertOrIgnore({'guild_id': guildId, 'key': key, 'value': val}):
+                    created.add(guildId)
+            configs[guildId] = await self.getGuildConfig(guildId)
+        return configs, created
+
+    # ─────────────────────────────────────────────
+    # Automod Lists
+    # ─────────────────────────────────────────────
+
+    async def addExemptRole(self, guildId, ruleType, roleId):
+        self.exemptions.insertOrIgnore({'guild_id': str(guildId), 'rule': ruleType, 'role_id': str(roleId)})
+
+    async def removeExemptRole(self, guildId, ruleType, roleId):
+        for row in self.exemptions.find(guild_id=str(guildId), rule=ruleType, role_id=str(roleId)):
+            self.exemptions.delete(row)
+
+    async def getExemptRoles(self, guildId, ruleType):
+        return [row['role_id'] for row in self.exemptions.find(guild_id=str(guildId), rule=ruleType)]
+
+    async def addExemptChannel(self, guildId, ruleType, channelId):
+        self.exemptChannels.insertOrIgnore({'guild_id': str(guildId), 'rule': ruleType, 'channel_id': str(channelId)})
+
+    async def removeExemptChannel(self, guildId, ruleType, channelId):
+        for row in self.exemptChannels.find(guild_id=str(guildId), rule=ruleType, channel_id=str(channelId)):
+            self.exemptChannels.delete(row)
+
+    async def getExemptChannels(self, guildId, ruleType):
+        return [row['channel_id'] for row in self.exemptChannels.find(guild_id=str(guildId), rule=ruleType)]
+
+    async def addFilterItem(self, guildId, filterType, item):
+        self.filters.insertOrIgnore({'guild_id': str(guildId), 'type': filterType, 'item': item})
+
+    async def removeFilterItem(self, guildId, filterType, item):
+        for row in self.filters.find(guild_id=str(guildId), type=filterType, item=item):
+            self.filters.delete(row)
+
+    async def getFilterItemsOfType(self, guildId, filterType):
+        return [row['item'] for row in self.filters.find(guild_id=str(guildId), type=filterType)]
+
+    async def getAllExemptRoles(self, guildId):
+        result = {}
+        for row in self.exemptions.find(guild_id=str(guildId)):
+            result.setdefault(row['rule'], []).append(row['role_id'])
+        return result
+
+    async def getAllExemptChannels(self, guildId):
+        result = {}
+        for row in self.exemptChannels.find(guild_id=str(guildId)):
+            result.setdefault(row['rule'], []).append(row['channel_id'])
+        return result
+
+    async def getFilterItems(self, guildId):
+        result = {}
+        for row in self.filters.find(guild_id=str(guildId)):
+            result.setdefault(row['type'], []).append(row['item'])
+        return result
+
+    # ─────────────────────────────────────────────
+    # Moderation
+    # ─────────────────────────────────────────────
+
+    async def addWarning(self, guildId, userId, moderatorId, reason, timestamp):
+        self.warnings.insert({'guild_id': str(guildId), 'user_id': str(userId), 'moderator_id': str(moderatorId),
+                              'reason': reason, 'timestamp': int(timestamp)})
+
+    async def getWarnings(self, guildId, userId):
+        rows = sorted(self.warnings.find(guild_id=str(guildId), user_id=str(userId)), key=lambda row: row['timestamp'], reverse=True)
+        return [(row['moderator_id'], row['reason'], row['timestamp']) for row in rows]
+
+    async def clearWarnings(self, guildId, userId):
+        for row in self.warnings.find(guild_id=str(guildId), user_id=str(userId)):
+            self.warnings.delete(row)
+
+    async def addCommandPerm(self, guildId, command, roleId):
+        self.permissions.insertOrIgnore({'guild_id': str(guildId), 'command': command, 'role_id': str(roleId)})
+
+    async def removeCommandPerm(self, guildId, command, roleId):
+        for row in self.permissions.find(guild_id=str(guildId), command=command, role_id=str(roleId)):
+            self.permissions.delete(row)
+
+    async def getCommandPerms(self, guildId, command):
+        return [row['role_id'] for row in self.permissions.find(guild_id=str(guildId), command=command)]
+
+    # ─────────────────────────────────────────────
+    # Project CRUD
+    # ─────────────────────────────────────────────
+
+    def nextGuildSeq(self, guildId, entityType):
+        """Get and increment the next per-guild sequence number for an entity type."""
+        row = self.guildCounters.get(guild_id=str(guildId), entity_type=entityType)
+        if row is None:
+            row = self.guildCounters.insert({'guild_id': str(guildId), 'entity_type': entityType, 'next_seq': 1})
+        else:
+            self.guildCounters.update(row, next_seq=row['next_seq'] + 1)
+        return row['next_seq']
+
+    async def createProject(self, guildId, name, description, createdAt):
+        seq = self.nextGuildSeq(guildId, 'project')
+        self.projects.insert({'guild_id': str(guildId), 'guild_seq': seq, 'name': name, 'description': description, 'created_at': int(createdAt)})
+        return seq
+
+    async def getProject(self, guildId, guildSeq):
+        row = self.projects.get(guild_id=str(guildId), guild_seq=int(guildSeq))
+        return dict(row) if row else None
+
+    async def getProjectById(self, projectId):
+        row = self.projects.get(id=int(projectId))
+        return dict(row) if row else None
+
+    async def getProjects(self, guildId):
+        return _copies(_newestFirst(self.projects.find(guild_id=str(guildId))))
+
+    async def deleteProject(self, guildId, guildSeq):
+        for row in self.projects.find(guild_id=str(guildId), guild_seq=int(guildSeq)):
+            self.projects.delete(row)
+
+    # ─────────────────────────────────────────────
+    # Sprint CRUD
+    # ─────────────────────────────────────────────
+
+    async def createSprint(self, guildId, projectId, name, startDate, endDate, createdAt):
+        row = self.sprints.insert({'guild_id': str(guildId), 'project_id': int(projectId), 'name': name,
+                                   'start_date': int(startDate) if startDate else None, 'end_date': int(endDate) if endDate else None,
+                                   'created_at': int(createdAt)})
+        return row['id']
+
+    async def getSprints(self, guildId, projectId):
+        return _copies(_newestFirst(self.sprints.find(guild_id=str(guildId), project_id=int(projectId))))
+
+    async def updateSprintStatus(self, sprintId, status):
+        for row in self.sprints.find(id=int(sprintId)):
+            self.sprints.update(row, status=status)
+
+    async def getActiveSprint(self, guildId, projectId):
+        row = self.sprints.get(guild_id=str(guildId), project_id=int(projectId), status='active')
+        return dict(row) if row else None
+
+    # ─────────────────────────────────────────────
+    # Task CRUD
+    # ─────────────────────────────────────────────
+
+    async def createTask(self, guildId, projectId, title, description, priority, assigneeId, creatorId, createdAt):
+        seq = self.nextGuildSeq(guildId, 'task')
+        self.tasks.insert({'guild_id': str(guildId), 'guild_seq': seq, 'project_id': int(projectId), 'title': title,
+                           'description': description, 'priority': priority, 'assignee_id': str(assigneeId) if assigneeId else None,
+                           'creator_id': str(creatorId), 'created_at': int(createdAt), 'updated_at': int(createdAt)})
+        return seq
+
+    async def getTask(self, guildId, guildSeq):
+        row = self.tasks.get(guild_id=str(guildId), guild_seq=int(guildSeq))
+        return dict(row) if row else None
+
+    async def updateTaskStatus(self, guildId, guildSeq, status, updatedAt):
+        for row in self.tasks.find(guild_id=str(guildId), guild_seq=int(guildSeq)):
+            self.tasks.update(row, status=status, updated_at=int(updatedAt))
+
+    async def assignTask(self, guildId, guildSeq, assigneeId, updatedAt):
+        for row in self.tasks.find(guild_id=str(guildId), guild_seq=int(guildSeq)):
+            self.tasks.update(row, assignee_id=str(assigneeId), updated_at=int(updatedAt))
+
+    async def getTasks(self, guildId, projectId, filters=None):
+        where = {'guild_id': str(guildId), 'project_id': int(projectId)}
+        if filters:
+            if 'status' in filters:
+                where['status'] = filters['status']
+            if 'priority' in filters:
+                where['priority'] = filters['priority']
+            if 'assignee_id' in filters:
+                where['assignee_id'] = str(filters['assignee_id'])
+        return _copies(_newestFirst(self.tasks.find(**where)))
+
+    async def deleteTask(self, guildId, guildSeq):
+        for row in self.tasks.find(guild_id=str(guildId), guild_seq=int(guildSeq)):
+            self.tasks.delete(row)
+
+    # ─────────────────────────────────────────────
+    # Bug CRUD
+    # ─────────────────────────────────────────────
+
+    async def createBug(self, guildId, projectId, title, description, severity, reporterId, tags, createdAt):
+        seq = self.nextGuildSeq(guildId, 'bug')
+        self.bugs.insert({'guild_id': str(guildId), 'guild_seq': seq, 'project_id': int(projectId), 'title': title,
+                          'description': description, 'severity': severity, 'reporter_id': str(reporterId),
+                          'tags': json.dumps(tags) if isinstance(tags, list) else tags,
+                          'created_at': int(createdAt), 'updated_at': int(createdAt)})
+        return seq
+
+    async def getBug(self, guildId, guildSeq):
+        row = self.bugs.get(guild_id=str(guildId), guild_seq=int(guildSeq))
+        return dict(row) if row else None
+
+    async def updateBugStatus(self, guildId, guildSeq, status, updatedAt):
+        for row in self.bugs.find(guild_id=str(guildId), guild_seq=int(guildSeq)):
+            self.bugs.update(row, status=status, updated_at=int(updatedAt))
+
+    async def assignBug(self, guildId, guildSeq, assigneeId, updatedAt):
+        for row in self.bugs.find(guild_id=str(guildId), guild_seq=int(guildSeq)):
+            self.bugs.update(row, assignee_id=str(assigneeId), updated_at=int(updatedAt))
+
+    async def getBugs(self, guildId, projectId, filters=None):
+        where = {'guild_id': str(guildId), 'project_id': int(projectId)}
+        if filters:
+            if 'status' in filters:
+                where['status'] = filters['status']
+            if 'severity' in filters:
+                where['severity'] = filters['severity']
+            if 'assignee_id' in filters:
+                where['assignee_id'] = str(filters['assignee_id'])
+        return _copies(_newestFirst(self.bugs.find(**where)))
+
+    async def closeBug(self, guildId, guildSeq, updatedAt):
+        for row in self.bugs.find(guild_id=str(guildId), guild_seq=int(guildSeq)):
+            self.bugs.update(row, status='closed', updated_at=int(updatedAt))
+
+    # ─────────────────────────────────────────────
+    # Team Role CRUD
+    # ─────────────────────────────────────────────
+
+    async def setTeamRole(self, guildId, userId, role):
+        row = self.teamRoles.get(guild_id=str(guildId), user_id=str(userId))
+        if row:
+            self.teamRoles.update(row, role=role)
+        else:
+            self.teamRoles.insert({'guild_id': str(guildId), 'user_id': str(userId), 'role': role})
+
+    async def removeTeamRole(self, guildId, userId):
+        for row in self.teamRoles.find(guild_id=str(guildId), user_id=str(userId)):
+            self.teamRoles.delete(row)
+
+    async def getTeamRole(self, guildId, userId):
+        row = self.teamRoles.get(guild_id=str(guildId), user_id=str(userId))
+        return row['role'] if row else None
+
+    async def getTeamMembers(self, guildId, role=None):
+        where = {'guild_id': str(guildId)}
+        if role:
+            where['role'] = role
+        return [{'user_id': row['user_id'], 'role': row['role']} for row in self.teamRoles.find(**where)]
+
+    # ─────────────────────────────────────────────
+    # Checklist CRUD
+    # ─────────────────────────────────────────────
+
+    async def createChecklist(self, guildId, name, createdBy, taskId, createdAt):
+        seq = self.nextGuildSeq(guildId, 'checklist')
+        row = self.checklists.insert({'guild_id': str(guildId), 'guild_seq': seq, 'name': name, 'created_by': str(createdBy),
+                                      'task_id': int(taskId) if taskId else None, 'created_at': int(createdAt)})
+        return seq, row['id']
+
+    async def getChecklist(self, guildId, guildSeq):
+        row = self.checklists.get(guild_id=str(guildId), guild_seq=int(guildSeq))
+        return dict(row) if row else None
+
+    async def getChecklists(self, guildId, archived=False):
+        return _copies(_newestFirst(self.checklists.find(guild_id=str(guildId), archived=archived)))
+
+    async def archiveChecklist(self, guildId, guildSeq):
+        for row in self.checklists.find(guild_id=str(guildId), guild_seq=int(guildSeq)):
+            self.checklists.update(row, archived=True)
+
+    async def deleteChecklist(self, guildId, guildSeq):
+        for row in self.checklists.find(guild_id=str(guildId), guild_seq=int(guildSeq)):
+            self.checklists.delete(row)
+        # Reset counter to max remaining guild_seq so IDs don't keep climbing
+        maxSeq = max((row['guild_seq'] for row in self.checklists.find(guild_id=str(guildId))), default=0)
+        for row in self.guildCounters.find(guild_id=str(guildId), entity_type='checklist'):
+            self.guildCounters.update(row, next_seq=maxSeq)
+
+    async def addChecklistItem(self, checklistId, text):
+        # Per-checklist sequential numbering
+        maxSeq = max((row['item_seq'] for row in self.checklistItems.find(checklist_id=int(checklistId))), default=0)
+        newSeq = maxSeq + 1
+        self.checklistItems.insert({'checklist_id': int(checklistId), 'item_seq': newSeq, 'text': text})
+        return newSeq
+
+    async def toggleChecklistItem(self, checklistId, itemSeq, userId, toggledAt):
+        rows = self.checklistItems.find(checklist_id=int(checklistId), item_seq=int(itemSeq))
+        for row in rows:
+            self.checklistItems.update(row, completed=not row['completed'], toggled_by=str(userId), toggled_at=int(toggledAt))
+        return rows[0]['completed'] if rows else None
+
+    async def removeChecklistItem(self, checklistId, itemSeq):
+        for row in self.checklistItems.find(checklist_id=int(checklistId), item_seq=int(itemSeq)):
+            self.checklistItems.delete(row)
+
+    async def getChecklistItems(self, checklistId):
+        return _copies(sorted(self.checklistItems.find(checklist_id=int(checklistId)), key=lambda row: row['item_seq']))
+
+    # ─────────────────────────────────────────────
+    # Task Comment CRUD
+    # ─────────────────────────────────────────────
+
+    async def addTaskComment(self, guildId, taskGuildSeq, userId, content, createdAt):
+        task = self.tasks.get(guild_id=str(guildId), guild_seq=int(taskGuildSeq))
+        if not task:
+            return None
+        row = self.taskComments.insert({'task_id': task['id'], 'user_id': str(userId), 'content': content, 'created_at': int(createdAt)})
+        return row['id']
+
+    async def getTaskComments(self, guildId, taskGuildSeq):
+        task = self.tasks.get(guild_id=str(guildId), guild_seq=int(taskGuildSeq))
+        if not task:
+            return []
+        return _copies(sorted(self.taskComments.find(task_id=task['id']), key=lambda row: row['created_at']))
+
+    # ─────────────────────────────────────────────
+    # Task-Bug Link CRUD
+    # ─────────────────────────────────────────────
+
+    async def linkTaskBug(self, taskId, bugId):
+        self.taskBugLinks.insertOrIgnore({'task_id': int(taskId), 'bug_id': int(bugId)})
+
+    async def unlinkTaskBug(self, taskId, bugId):
+        for row in self.taskBugLinks.find(task_id=int(taskId), bug_id=int(bugId)):
+            self.taskBugLinks.delete(row)
+
+    async def getLinkedBugs(self, taskId):
+        return [row['bug_id'] for row in self.taskBugLinks.find(task_id=int(taskId))]
+
+    async def getLinkedTasks(self, bugId):
+        return [row['task_id'] for row in self.taskBugLinks.find(bug_id=int(bugId))]
+
+    # ─────────────────────────────────────────────
+    # Audit Log CRUD
+    # ─────────────────────────────────────────────
+
+    async def logAudit(self, guildId, action, entityType, entityId, userId, details, createdAt):
+        self.auditLog.insert({'guild_id': str(guildId), 'action': action, 'entity_type': entityType,
+                              'entity_id': int(entityId) if entityId else None, 'user_id': str(userId),
+                              'details': details, 'created_at': int(createdAt)})
+
+    async def getAuditLog(self, guildId, entityType=None, entityId=None, limit=50):
+        where = {'guild_id': str(guildId)}
+        if entityType:
+            where['entity_type'] = entityType
+        if entityId:
+            where['entity_id'] = int(entityId)
+        return _copies(_newestFirst(self.auditLog.find(**where), limit))
+
+    # ─────────────────────────────────────────────
+    # Reporting
+    # ─────────────────────────────────────────────
+
+    async def getTaskCounts(self, guildId, projectId):
+        counts = {}
+        for row in self.tasks.find(guild_id=str(guildId), project_id=int(projectId)):
+            counts[row['status']] = counts.get(row['status'], 0) + 1
+        return counts
+
+    async def getBugCounts(self, guildId, projectId):
+        counts = {}
+        for row in self.bugs.find(guild_id=str(guildId), project_id=int(projectId)):
+            # status != 'closed' is never true for NULL in SQL
+            if row['status'] is not None and row['status'] != 'closed':
+                counts[row['severity']] = counts.get(row['severity'], 0) + 1
+        return counts
+
+    async def getUserWorkload(self, guildId, userId):
+        tasks = self.tasks.find(guild_id=str(guildId), assignee_id=str(userId))
+        bugs = self.bugs.find(guild_id=str(guildId), assignee_id=str(userId))
+        return {
+            'tasks': sum(1 for row in tasks if row['status'] is not None and row['status'] not in ('done', 'backlog')),
+            'bugs': sum(1 for row in bugs if row['status'] is not None and row['status'] != 'closed'),
+        }
+
+    # ─────────────────────────────────────────────
+    # Bot Metadata
+    # ─────────────────────────────────────────────
+
+    async def getMeta(self, key):
+        row = self.botMeta.get(key=key)
+        return row['value'] if row else None
+
+    async def setMeta(self, key, value):
+        row = self.botMeta.get(key=key)
+        if row:
+            self.botMeta.update(row, value=str(value), updated_at=int(time.time()))
+        else:
+            self.botMeta.insert({'key': key, 'value': str(value), 'updated_at': int(time.time())})
@@ -0,0 +1,748 @@
+import os
+import ssl
+import json
+import asyncio
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+import metrics
+import instrumentation
+
+# Managed Postgres (Supabase) needs TLS; set to 0 for a plain local server, e.g. for benchmarks
+DATABASE_SSL = os.getenv("DATABASE_SSL", "1") == "1"
+
+# Schema to put on the search_path instead of public, e.g. a throwaway schema for benchmarks
+DATABASE_SCHEMA = os.getenv("DATABASE_SCHEMA", "")
+
+# Apply pending migrations during connect; set to 0 when deploys run `python migrate.py up` instead
+MIGRATE_ON_STARTUP = os.getenv("MIGRATE_ON_STARTUP", "1") == "1"
+
+# Prepared statements kept per connection outside transaction mode; comfortably above the hundred or so
+# distinct queries the bot sends, so nothing hot is ever evicted
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "256"))
+
+def createSslContext():
+    if not DATABASE_SSL:
+        return None
+    ssl_ctx = ssl.create_default_context()
+    ssl_ctx.check_hostname = False
+    ssl_ctx.verify_mode = ssl.CERT_NONE
+    return ssl_ctx
+
+# Hosts that are always a direct Postgres connection, never a pooler
+DIRECT_HOSTS = ("localhost", "127.0.0.1", "::1")
+
+def _isDirectConnection(parts):
+    try:
+        port = parts.port
+    except ValueError:  # multi-host DSN
+        return False
+    host = (parts.hostname or "").lower()
+    if not host or host.startswith("/") or host in DIRECT_HOSTS:
+        # No host, or a unix socket directory, means the local server
+        return port in (None, 5432)
+    # Supabase's direct connection, as opposed to its pooler.supabase.com hosts
+    return host.startswith("db.") and host.endswith(".supabase.co") and port in (None, 5432)
+
+def detectPoolMode(db_url, overrideVar="DB_POOL_MODE"):
+    """'session' only when the DSN is known to allow prepared statements, otherwise 'transaction'.
+
+    Transaction-mode poolers (PgBouncer, often on 6432; Supabase on 6543) hand each statement to
+    whichever server connection is free, so named prepared statements break there. A pooler can sit
+    on any host and port, so the statement cache is only turned on for DB_POOL_MODE=session or a
+    connection that is recognisably direct: localhost on 5432 or Supabase's db.<ref>.supabase.co.
+    """
+    mode = os.getenv(overrideVar, "auto").lower()
+    if mode in ("transaction", "session"):
+        return mode
+    parts = urlsplit(db_url)
+    if dict(parse_qsl(parts.query)).get("pgbouncer", "").lower() in ("1", "true"):
+        return "transaction"
+    return "session" if _isDirectConnection(parts) else "transaction"
+
+async def connectForMigrations():
+    """A dedicated connection for migrations, and whether it keeps one server session.
+
+    Uses MIGRATION_DATABASE_URL (judged by MIGRATION_POOL_MODE) when set, so a deployment whose
+    DATABASE_URL is a transaction pooler can still point migrations at a direct or session URL.
+    """
+    import asyncpg
+    migrationUrl = os.getenv("MIGRATION_DATABASE_URL")
+    if migrationUrl:
+        sessionSafe = detectPoolMode(migrationUrl, "MIGRATION_POOL_MODE") == "session"
+    else:
+        migrationUrl = os.getenv("DATABASE_URL")
+        sessionSafe = detectPoolMode(migrationUrl) == "session"
+    conn = await asyncpg.connect(
+        stripPoolerParams(migrationUrl), ssl=createSslContext(), statement_cache_size=0,
+        server_settings={'search_path': DATABASE_SCHEMA} if DATABASE_SCHEMA else None
+    )
+    return conn, sessionSafe
+
+def stripPoolerParams(db_url):
+    """Drop the pgbouncer=true hint; asyncpg would send it to the server as a setting."""
+    parts = urlsplit(db_url)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k != "pgbouncer"]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+def _andEquals(query, params, column, value):
+    """Append `AND column = $n` for the next placeholder; a given set of filters always yields the same text."""
+    params.append(value)
+    return query + f" AND {column} = ${len(params)}"
+
+class PostgresStorage:
+    """asyncpg pool against Supabase/PostgreSQL; every query in the bot is written for this one."""
+
+    name = "postgres"
+
+    def __init__(self):
+        self.pool = None
+        self.poolMode = None
+
+    async def connect(self):
+        # Imported here so storage.sqlite can reuse this class's queries without asyncpg installed
+        import asyncpg
+        from migrations import migrate, pendingMigrations
+
+        db_url = os.getenv("DATABASE_URL")
+        if not db_url:
+            print("WARNING: DATABASE_URL is not set! Database functions will fail.")
+            return False
+
+        self.poolMode = detectPoolMode(db_url)
+        if self.poolMode == "transaction":
+            statementCache = {'statement_cache_size': 0}
+        else:
+            # Schema changes only come from migrations, and asyncpg re-prepares on the rare invalidation
+            statementCache = {'statement_cache_size': DB_STATEMENT_CACHE_SIZE, 'max_cached_statement_lifetime': 0}
+        print(f"Database pool mode: {self.poolMode} (prepared statements {'off' if self.poolMode == 'transaction' else 'on'})")
+
+        try:
+            for attempt in range(5):
+                try:
+                    print(f"Connecting to Database (Attempt {attempt+1}/5)...")
+                    self.pool = await asyncpg.create_pool(
+                        stripPoolerParams(db_url), ssl=createSslContext(), command_timeout=30, **statementCache,
+                        server_settings={'search_path': DATABASE_SCHEMA} if DATABASE_SCHEMA else None
+                    )
+                    if metrics.METRICS_ENABLED:
+                        self.pool = instrumentation.InstrumentedPool(self.pool)
+                    print("Connected to Supabase/PostgreSQL!")
+                    break # Success
+                except OSError as e:
+                    print(f"Network Error (Attempt {attempt+1}): {e}")
+                    if "Network is unreachable" in str(e) or (hasattr(e, 'errno') and e.errno == 101):
+                        print("CRITICAL: Network execution failed. If using Supabase, you MUST use the Connection Pooler (Session Mode, port 5432) or Transaction Mode (port 6543) URL.")
+                        print("Direct connection (db.project.supabase.co) does not support IPv4 on free tier.")
+                    if attempt == 4: raise e
+                    wait = 5 * (attempt + 1)
+                    print(f"Retrying in {wait}s...")
+                    await asyncio.sleep(wait)
+                except Exception as e:
+                    print(f"Connection attempt {attempt+1} failed: {e}")
+                    print(f"Exception type: {type(e).__name__}")
+                    if attempt == 4: raise e
+                    wait = 5 * (attempt + 1)  # 5s, 10s, 15s, 20s backoff
+                    print(f"Retrying in {wait}s...")
+                    await asyncio.sleep(wait)
+
+            async with self.pool.acquire() as conn:
+                pending = await pendingMigrations(conn)
+            if pending and MIGRATE_ON_STARTUP:
+                # Its own connection: closing it also releases any session lock a failed migration held
+                conn, sessionSafe = await connectForMigrations()
+                try:
+                    applied = await migrate(conn, sessionSafe=sessionSafe)
+                finally:
+                    await conn.close()
+                if applied:
+                    print(f"Applied schema migrations: {applied}")
+            elif pending:
+                print(f"WARNING: {len(pending)} schema migration(s) pending. Run `python migrate.py up`.")
+
+            return True
+
+        except Exception as e:
+            print(f"Failed to connect to Database: {e}")
+            return False
+
+    async def close(self):
+        if self.pool is not None:
+            await self.pool.close()
+
+    async def ping(self, timeout=2.0):
+        if self.pool is None:
+            return False
+        try:
+            async with self.pool.acquire(timeout=timeout) as conn:
+                await conn.fetchval("SELECT 1", timeout=timeout)
+            return True
+        except Exception:
+            return False
+
+    def poolStats(self):
+        if self.pool is None:
+            return {'size': 0, 'idle': 0, 'max': 0}
+        return {'size': self.pool.get_size(), 'idle': self.pool.get_idle_size(), 'max': self.pool.get_max_size()}
+
+    # ─────────────────────────────────────────────
+    # Config
+    # ─────────────────────────────────────────────
+
+    async def getGuildConfig(self, guildId):
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch("SELECT key, value FROM config WHERE guild_id = $1", str(guildId))
+        return {row['key']: row['value'] for row in rows}
+
+    async def setConfig(self, guildId, key, value):
+        async with self.pool.acquire() as conn:
+            await conn.execute("""
+                INSERT INTO config (guild_id, key, value)
+                VALUES ($1, $2, $3)
+                ON CONFLICT (guild_id, key)
+                DO UPDATE SET value = $3
+            """, str(guildId), key, str(value))
+
+    async def insertConfigDefaults(self, guildId, values):
+        """Insert each {key: value} the guild doesn't have yet; existing keys are left alone."""
+        async with self.pool.acquire() as conn:
+            await conn.executemany("""
+                INSERT INTO config (guild_id, key, value) VALUES ($1, $2, $3) ON CONFLICT DO NOTHING
+            """, [(str(guildId), key, val) for key, val in values.items()])
+
+    async def bootstrapConfig(self, guildIds, defaults):
+        """Insert missing defaults for every guild and read back all of their config in one round trip.
+
+        Returns ({guild_id: {key: value}}, {guild_ids that got new rows}).
+        """
+        async with self.pool.acquire() as conn:
+            # The outer SELECT can't see rows inserted by its own CTE, so add them back from RETURNING
+            rows = await conn.fetch("""
+                WITH inserted AS (
+                    INSERT INTO config (guild_id, key, value)
+                    SELECT g.guild_id, d.key, d.value
+                    FROM unnest($1::text[]) AS g(guild_id)
+                    CROSS JOIN unnest($2::text[], $3::text[]) AS d(key, value)
+                    ON CONFLICT (guild_id, key) DO NOTHING
+                    RETURNING guild_id, key, value
+                )
+                SELECT guild_id, key, value, FALSE AS created FROM config WHERE guild_id = ANY($1::text[])
+                UNION ALL
+                SELECT guild_id, key, value, TRUE AS created FROM inserted
+            """, guildIds, list(defaults.keys()), list(defaults.values()))
+
+        configs = {guildId: {} for guildId in guildIds}
+        created = set()
+        for row in rows:
+            configs[row['guild_id']][row['key']] = row['value']
+            if row['created']:
+                created.add(row['guild_id'])
+        return configs, created
+
+    # ─────────────────────────────────────────────
+    # Automod Lists
+    # ─────────────────────────────────────────────
+
+    async def addExemptRole(self, guildId, ruleType, roleId):
+        async with self.pool.acquire() as conn:
+            await conn.execute("""
+                INSERT INTO exemptions (guild_id, rule, role_id) VALUES ($1, $2, $3) ON CONFLICT DO NOTHING
+            """, str(guildId), ruleType, str(roleId))
+
+    async def removeExemptRole(self, guildId, ruleType, roleId):
+        async with self.pool.acquire() as conn:
+            await conn.execute("""
+                DELETE FROM exemptions WHERE guild_id = $1 AND rule = $2 AND role_id = $3
+            """, str(guildId), ruleType, str(roleId))
+
+    async def getExemptRoles(self, guildId, ruleType):
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch("SELECT role_id FROM exemptions WHERE guild_id = $1 AND rule = $2", str(guildId), ruleType)
+            return [row['role_id'] for row in rows]
+
+    async def addExemptChannel(self, guildId, ruleType, channelId):
+        async with self.pool.acquire() as conn:
+            await conn.execute("""
+                INSERT INTO exempt_channels (guild_id, rule, channel_id)
+                VALUES ($1, $2, $3)
+                ON CONFLICT DO NOTHING
+            """, str(guildId), ruleType, str(channelId))
+
+    async def removeExemptChannel(self, guildId, ruleType, channelId):
+        async with self.pool.acquire() as conn:
+            await conn.execute("""
+                DELETE FROM exempt_channels
+                WHERE guild_id = $1 AND rule = $2 AND channel_id = $3
+            """, str(guildId), ruleType, str(channelId))
+
+    async def getExemptChannels(self, guildId, ruleType):
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch("""
+                SELECT channel_id FROM exempt_channels
+                WHERE guild_id = $1 AND rule = $2
+            """, str(guildId), ruleType)
+            return [row['channel_id'] for row in rows]
+
+    async def addFilterItem(self, guildId, filterType, item):
+        async with self.pool.acquire() as conn:
+            await conn.execute("INSERT INTO filters (guild_id, type, item) VALUES ($1, $2, $3) ON CONFLICT DO NOTHING", str(guildId), filterType, item)
+
+    async def removeFilterItem(self, guildId, filterType, item):
+        async with self.pool.acquire() as conn:
+            await conn.execute("DELETE FROM filters WHERE guild_id = $1 AND type = $2 AND item = $3", str(guildId), filterType, item)
+
+    async def getFilterItemsOfType(self, guildId, filterType):
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch("SELECT item FROM filters WHERE guild_id = $1 AND type = $2", str(guildId), filterType)
+            return [row['item'] for row in rows]
+
+    async def getAllExemptRoles(self, guildId):
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch("SELECT rule, role_id FROM exemptions WHERE guild_id = $1", str(guildId))
+        result = {}
+        for row in rows:
+            result.setdefault(row['rule'], []).append(row['role_id'])
+        return result
+
+    async def getAllExemptChannels(self, guildId):
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch("SELECT rule, channel_id FROM exempt_channels WHERE guild_id = $1", str(guildId))
+        result = {}
+        for row in rows:
+            result.setdefault(row['rule'], []).append(row['channel_id'])
+        return result
+
+    async def getFilterItems(self, guildId):
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch("SELECT type, item FROM filters WHERE guild_id = $1", str(guildId))
+        result = {}
+        for row in rows:
+            result.setdefault(row['type'], []).append(row['item'])
+        return result
+
+    # ─────────────────────────────────────────────
+    # Moderation
+    # ─────────────────────────────────────────────
+
+    async def addWarning(self, guildId, userId, moderatorId, reason, timestamp):
+        async with self.pool.acquire() as conn:
+            await conn.execute("""
+                INSERT INTO warnings (guild_id, user_id, moderator_id, reason, timestamp)
+                VALUES ($1, $2, $3, $4, $5)
+            """, str(guildId), str(userId), str(moderatorId), reason, int(timestamp))
+
+    async def getWarnings(self, guildId, userId):
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch("""
+                SELECT moderator_id, reason, timestamp FROM warnings
+                WHERE guild_id = $1 AND user_id = $2
+                ORDER BY timestamp DESC
+            """, str(guildId), str(userId))
+            return [(row['moderator_id'], row['reason'], row['timestamp']) for row in rows]
+
+    async def clearWarnings(self, guildId, userId):
+        async with self.pool.acquire() as conn:
+            await conn.execute("DELETE FROM warnings WHERE guild_id = $1 AND user_id = $2", str(guildId), str(userId))
+
+    async def addCommandPerm(self, guildId, command, roleId):
+        async with self.pool.acquire() as conn:
+            await conn.execute("INSERT INTO permissions (guild_id, command, role_id) VALUES ($1, $2, $3) ON CONFLICT DO NOTHING", str(guildId), command, str(roleId))
+
+    async def removeCommandPerm(self, guildId, command, roleId):
+        async with self.pool.acquire() as conn:
+            await conn.execute("DELETE FROM permissions WHERE guild_id = $1 AND command = $2 AND role_id = $3", str(guildId), command, str(roleId))
+
+    async def getCommandPerms(self, guildId, command):
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch("SELECT role_id FROM permissions WHERE guild_id = $1 AND command = $2", str(guildId), command)
+            return [row['role_id'] for row in rows]
+
+    # ─────────────────────────────────────────────
+    # Project CRUD
+    # ─────────────────────────────────────────────
+
+    async def nextGuildSeq(self, conn, guildId, entityType):
+        """Atomically get and increment the next per-guild sequence number for an entity type."""
+        row = await conn.fetchval("""
+            INSERT INTO guild_counters (guild_id, entity_type, next_seq)
+            VALUES ($1, $2, 1)
+            ON CONFLICT (guild_id, entity_type)
+            DO UPDATE SET next_seq = guild_counters.next_seq + 1
+            RETURNING next_seq
+        """, str(guildId), entityType)
+        return row
+
+    async def createProject(self, guildId, name, description, createdAt):
+        async with self.pool.acquire() as conn:
+            seq = await self.nextGuildSeq(conn, guildId, 'project')
+            await conn.execute("""
+                INSERT INTO projects (guild_id, guild_seq, name, description, created_at)
+                VALUES ($1, $2, $3, $4, $5)
+            """, str(guildId), seq, name, description, int(createdAt))
+            return seq
+
+    async def getProject(self, guildId, guildSeq):
+        async with self.pool.acquire() as conn:
+            row = await conn.fetchrow("SELECT * FROM projects WHERE guild_id = $1 AND guild_seq = $2", str(guildId), int(guildSeq))
+            return dict(row) if row else None
+
+    async def getProjectById(self, projectId):
+        async with self.pool.acquire() as conn:
+            row = await conn.fetchrow("SELECT * FROM projects WHERE id = $1", int(projectId))
+            return dict(row) if row else None
+
+    async def getProjects(self, guildId):
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch("SELECT * FROM projects WHERE guild_id = $1 ORDER BY created_at DESC", str(guildId))
+            return [dict(row) for row in rows]
+
+    async def deleteProject(self, guildId, guildSeq):
+        async with self.pool.acquire() as conn:
+            await conn.execute("DELETE FROM projects WHERE guild_id = $1 AND guild_seq = $2", str(guildId), int(guildSeq))
+
+    # ─────────────────────────────────────────────
+    # Sprint CRUD
+    # ─────────────────────────────────────────────
+
+    async def createSprint(self, guildId, projectId, name, startDate, endDate, createdAt):
+        async with self.pool.acquire() as conn:
+            row = await conn.fetchval("""
+                INSERT INTO sprints (guild_id, project_id, name, start_date, end_date, created_at)
+                VALUES ($1, $2, $3, $4, $5, $6) RETURNING id
+            """, str(guildId), int(projectId), name, int(startDate) if startDate else None, int(endDate) if endDate else None, int(createdAt))
+            return row
+
+    async def getSprints(self, guildId, projectId):
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch("""
+                SELECT * FROM sprints WHERE guild_id = $1 AND project_id = $2 ORDER BY created_at DESC
+            """, str(guildId), int(projectId))
+            return [dict(row) for row in rows]
+
+    async def updateSprintStatus(self, sprintId, status):
+        async with self.pool.acquire() as conn:
+            await conn.execute("UPDATE sprints SET status = $2 WHERE id = $1", int(sprintId), status)
+
+    async def getActiveSprint(self, guildId, projectId):
+        async with self.pool.acquire() as conn:
+            row = await conn.fetchrow("""
+                SELECT * FROM sprints WHERE guild_id = $1 AND project_id = $2 AND status = 'active' LIMIT 1
+            """, str(guildId), int(projectId))
+            return dict(row) if row else None
+
+    # ─────────────────────────────────────────────
+    # Task CRUD
+    # ─────────────────────────────────────────────
+
+    async def createTask(self, guildId, projectId, title, description, priority, assigneeId, creatorId, createdAt):
+        async with self.pool.acquire() as conn:
+            seq = await self.nextGuildSeq(conn, guildId, 'task')
+            await conn.execute("""
+                INSERT INTO tasks (guild_id, guild_seq, project_id, title, description, priority, assignee_id, creator_id, created_at, updated_at)
+                VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $9)
+            """, str(guildId), seq, int(projectId), title, description, priority, str(assigneeId) if assigneeId else None, str(creatorId), int(createdAt))
+            return seq
+
+    async def getTask(self, guildId, guildSeq):
+        async with self.pool.acquire() as conn:
+            row = await conn.fetchrow("SELECT * FROM tasks WHERE guild_id = $1 AND guild_seq = $2", str(guildId), int(guildSeq))
+            return dict(row) if row else None
+
+    async def updateTaskStatus(self, guildId, guildSeq, status, updatedAt):
+        async with self.pool.acquire() as conn:
+            await conn.execute("UPDATE tasks SET status = $3, updated_at = $4 WHERE guild_id = $1 AND guild_seq = $2", str(guildId), int(guildSeq), status, int(updatedAt))
+
+    async def assignTask(self, guildId, guildSeq, assigneeId, updatedAt):
+        async with self.pool.acquire() as conn:
+            await conn.execute("UPDATE tasks SET assignee_id = $3, updated_at = $4 WHERE guild_id = $1 AND guild_seq = $2", str(guildId), int(guildSeq), str(assigneeId), int(updatedAt))
+
+    async def getTasks(self, guildId, projectId, filters=None):
+        query = "SELECT * FROM tasks WHERE guild_id = $1 AND project_id = $2"
+        params = [str(guildId), int(projectId)]
+        filters = filters or {}
+        if 'status' in filters:
+            query = _andEquals(query, params, 'status', filters['status'])
+        if 'priority' in filters:
+            query = _andEquals(query, params, 'priority', filters['priority'])
+        if 'assignee_id' in filters:
+            query = _andEquals(query, params, 'assignee_id', str(filters['assignee_id']))
+        query += " ORDER BY created_at DESC"
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(query, *params)
+            return [dict(row) for row in rows]
+
+    async def deleteTask(self, guildId, guildSeq):
+        async with self.pool.acquire() as conn:
+            await conn.execute("DELETE FROM tasks WHERE guild_id = $1 AND guild_seq = $2", str(guildId), int(guildSeq))
+
+    # ─────────────────────────────────────────────
+    # Bug CRUD
+    # ─────────────────────────────────────────────
+
+    async def createBug(self, guildId, projectId, title, description, severity, reporterId, tags, createdAt):
+        async with self.pool.acquire() as conn:
+            seq = await self.nextGuildSeq(conn, guildId, 'bug')
+            await conn.execute("""
+                INSERT INTO bugs (guild_id, guild_seq, project_id, title, description, severity, reporter_id, tags, created_at, updated_at)
+                VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $9)
+            """, str(guildId), seq, int(projectId), title, description, severity, str(reporterId), json.dumps(tags) if isinstance(tags, list) else tags, int(createdAt))
+            return seq
+
+    async def getBug(self, guildId, guildSeq):
+        async with self.pool.acquire() as conn:
+            row = await conn.fetchrow("SELECT * FROM bugs WHERE guild_id = $1 AND guild_seq = $2", str(guildId), int(guildSeq))
+            return dict(row) if row else None
+
+    async def updateBugStatus(self, guildId, guildSeq, status, updatedAt):
+        async with self.pool.acquire() as conn:
+            await conn.execute("UPDATE bugs SET status = $3, updated_at = $4 WHERE guild_id = $1 AND guild_seq = $2", str(guildId), int(guildSeq), status, int(updatedAt))
+
+    async def assignBug(self, guildId, guildSeq, assigneeId, updatedAt):
+        async with self.pool.acquire() as conn:
+            await conn.execute("UPDATE bugs SET assignee_id = $3, updated_at = $4 WHERE guild_id = $1 AND guild_seq = $2", str(guildId), int(guildSeq), str(assigneeId), int(updatedAt))
+
+    async def getBugs(self, guildId, projectId, filters=None):
+        query = "SELECT * FROM bugs WHERE guild_id = $1 AND project_id = $2"
+        params = [str(guildId), int(projectId)]
+        filters = filters or {}
+        if 'status' in filters:
+            query = _andEquals(query, params, 'status', filters['status'])
+        if 'severity' in filters:
+            query = _andEquals(query, params, 'severity', filters['severity'])
+        if 'assignee_id' in filters:
+            query = _andEquals(query, params, 'assignee_id', str(filters['assignee_id']))
+        query += " ORDER BY created_at DESC"
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(query, *params)
+            return [dict(row) for row in rows]
+
+    async def closeBug(self, guildId, guildSeq, updatedAt):
+        async with self.pool.acquire() as conn:
+            await conn.execute("UPDATE bugs SET status = 'closed', updated_at = $3 WHERE guild_id = $1 AND guild_seq = $2", str(guildId), int(guildSeq), int(updatedAt))
+
+    # ─────────────────────────────────────────────
+    # Team Role CRUD
+    # ─────────────────────────────────────────────
+
+    async def setTeamRole(self, guildId, userId, role):
+        async with self.pool.acquire() as conn:
+            await conn.execute("""
+                INSERT INTO team_roles (guild_id, user_id, role)
+                VALUES ($1, $2, $3)
+                ON CONFLICT (guild_id, user_id)
+                DO UPDATE SET role = $3
+            """, str(guildId), str(userId), role)
+
+    async def removeTeamRole(self, guildId, userId):
+        async with self.pool.acquire() as conn:
+            await conn.execute("DELETE FROM team_roles WHERE guild_id = $1 AND user_id = $2", str(guildId), str(userId))
+
+    async def getTeamRole(self, guildId, userId):
+        async with self.pool.acquire() as conn:
+            val = await conn.fetchval("SELECT role FROM team_roles WHERE guild_id = $1 AND user_id = $2", str(guildId), str(userId))
+            return val
+
+    async def getTeamMembers(self, guildId, role=None):
+        async with self.pool.acquire() as conn:
+            if role:
+                rows = await conn.fetch("SELECT user_id, role FROM team_roles WHERE guild_id = $1 AND role = $2", str(guildId), role)
+            else:
+                rows = await conn.fetch("SELECT user_id, role FROM team_roles WHERE guild_id = $1", str(guildId))
+            return [dict(row) for row in rows]
+
+    # ─────────────────────────────────────────────
+    # Checklist CRUD
+    # ─────────────────────────────────────────────
+
+    async def createChecklist(self, guildId, name, createdBy, taskId, createdAt):
+        async with self.pool.acquire() as conn:
+            seq = await self.nextGuildSeq(conn, guildId, 'checklist')
+            internalId = await conn.fetchval("""
+                INSERT INTO checklists (guild_id, guild_seq, name, created_by, task_id, created_at)
+                VALUES ($1, $2, $3, $4, $5, $6) RETURNING id
+            """, str(guildId), seq, name, str(createdBy), int(taskId) if taskId else None, int(createdAt))
+            return seq, internalId
+
+    async def getChecklist(self, guildId, guildSeq):
+        async with self.pool.acquire() as conn:
+            row = await conn.fetchrow("SELECT * FROM checklists WHERE guild_id = $1 AND guild_seq = $2", str(guildId), int(guildSeq))
+            return dict(row) if row else None
+
+    async def getChecklists(self, guildId, archived=False):
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch("""
+                SELECT * FROM checklists WHERE guild_id = $1 AND archived = $2 ORDER BY created_at DESC
+            """, str(guildId), archived)
+            return [dict(row) for row in rows]
+
+    async def archiveChecklist(self, guildId, guildSeq):
+        async with self.pool.acquire() as conn:
+            await conn.execute("UPDATE checklists SET archived = TRUE WHERE guild_id = $1 AND guild_seq = $2", str(guildId), int(guildSeq))
+
+    async def deleteChecklist(self, guildId, guildSeq):
+        async with self.pool.acquire() as conn:
+            await conn.execute("DELETE FROM checklists WHERE guild_id = $1 AND guild_seq = $2", str(guildId), int(guildSeq))
+            # Reset counter to max remaining guild_seq so IDs don't keep climbing
+            maxSeq = await conn.fetchval(
+                "SELECT COALESCE(MAX(guild_seq), 0) FROM checklists WHERE guild_id = $1",
+                str(guildId)
+            )
+            await conn.execute(
+                "UPDATE guild_counters SET next_seq = $1 WHERE guild_id = $2 AND entity_type = 'checklist'",
+                maxSeq, str(guildId)
+            )
+
+    async def addChecklistItem(self, checklistId, text):
+        async with self.pool.acquire() as conn:
+            # Per-checklist sequential numbering
+            maxSeq = await conn.fetchval(
+                "SELECT COALESCE(MAX(item_seq), 0) FROM checklist_items WHERE checklist_id = $1",
+                int(checklistId)
+            )
+            newSeq = maxSeq + 1
+            await conn.execute("""
+                INSERT INTO checklist_items (checklist_id, item_seq, text) VALUES ($1, $2, $3)
+            """, int(checklistId), newSeq, text)
+            return newSeq
+
+    async def toggleChecklistItem(self, checklistId, itemSeq, userId, toggledAt):
+        async with self.pool.acquire() as conn:
+            row = await conn.fetchrow("""
+                UPDATE checklist_items SET completed = NOT completed, toggled_by = $3, toggled_at = $4
+                WHERE checklist_id = $1 AND item_seq = $2 RETURNING completed
+            """, int(checklistId), int(itemSeq), str(userId), int(toggledAt))
+            return row['completed'] if row else None
+
+    async def removeChecklistItem(self, checklistId, itemSeq):
+        async with self.pool.acquire() as conn:
+            await conn.execute("DELETE FROM checklist_items WHERE checklist_id = $1 AND item_seq = $2", int(checklistId), int(itemSeq))
+
+    async def getChecklistItems(self, checklistId):
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch("""
+                SELECT * FROM checklist_items WHERE checklist_id = $1 ORDER BY item_seq ASC
+            """, int(checklistId))
+            return [dict(row) for row in rows]
+
+    # ─────────────────────────────────────────────
+    # Task Comment CRUD
+    # ─────────────────────────────────────────────
+
+    async def addTaskComment(self, guildId, taskGuildSeq, userId, content, createdAt):
+        async with self.pool.acquire() as conn:
+            # Get internal task ID from guild_seq
+            taskId = await conn.fetchval("SELECT id FROM tasks WHERE guild_id = $1 AND guild_seq = $2", str(guildId), int(taskGuildSeq))
+            if not taskId:
+                return None
+            row = await conn.fetchval("""
+                INSERT INTO task_comments (task_id, user_id, content, created_at)
+                VALUES ($1, $2, $3, $4) RETURNING id
+            """, taskId, str(userId), content, int(createdAt))
+            return row
+
+    async def getTaskComments(self, guildId, taskGuildSeq):
+        async with self.pool.acquire() as conn:
+            taskId = await conn.fetchval("SELECT id FROM tasks WHERE guild_id = $1 AND guild_seq = $2", str(guildId), int(taskGuildSeq))
+            if not taskId:
+                return []
+            rows = await conn.fetch("""
+                SELECT * FROM task_comments WHERE task_id = $1 ORDER BY created_at ASC
+            """, taskId)
+            return [dict(row) for row in rows]
+
+    # ─────────────────────────────────────────────
+    # Task-Bug Link CRUD
+    # ─────────────────────────────────────────────
+
+    async def linkTaskBug(self, taskId, bugId):
+        async with self.pool.acquire() as conn:
+            await conn.execute("""
+                INSERT INTO task_bug_links (task_id, bug_id) VALUES ($1, $2) ON CONFLICT DO NOTHING
+            """, int(taskId), int(bugId))
+
+    async def unlinkTaskBug(self, taskId, bugId):
+        async with self.pool.acquire() as conn:
+            await conn.execute("DELETE FROM task_bug_links WHERE task_id = $1 AND bug_id = $2", int(taskId), int(bugId))
+
+    async def getLinkedBugs(self, taskId):
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch("SELECT bug_id FROM task_bug_links WHERE task_id = $1", int(taskId))
+            return [row['bug_id'] for row in rows]
+
+    async def getLinkedTasks(self, bugId):
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch("SELECT task_id FROM task_bug_links WHERE bug_id = $1", int(bugId))
+            return [row['task_id'] for row in rows]
+
+    # ─────────────────────────────────────────────
+    # Audit Log CRUD
+    # ─────────────────────────────────────────────
+
+    async def logAudit(self, guildId, action, entityType, entityId, userId, details, createdAt):
+        async with self.pool.acquire() as conn:
+            await conn.execute("""
+                INSERT INTO audit_log (guild_id, action, entity_type, entity_id, user_id, details, created_at)
+                VALUES ($1, $2, $3, $4, $5, $6, $7)
+            """, str(guildId), action, entityType, int(entityId) if entityId else None, str(userId), details, int(createdAt))
+
+    async def getAuditLog(self, guildId, entityType=None, entityId=None, limit=50):
+        query = "SELECT * FROM audit_log WHERE guild_id = $1"
+        params = [str(guildId)]
+        if entityType:
+            query = _andEquals(query, params, 'entity_type', entityType)
+        if entityId:
+            query = _andEquals(query, params, 'entity_id', int(entityId))
+        params.append(limit)
+        query += f" ORDER BY created_at DESC LIMIT ${len(params)}"
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(query, *params)
+            return [dict(row) for row in rows]
+
+    # ─────────────────────────────────────────────
+    # Reporting
+    # ─────────────────────────────────────────────
+
+    async def getTaskCounts(self, guildId, projectId):
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch("""
+                SELECT status, COUNT(*) as count FROM tasks
+                WHERE guild_id = $1 AND project_id = $2
+                GROUP BY status
+            """, str(guildId), int(projectId))
+            return {row['status']: row['count'] for row in rows}
+
+    async def getBugCounts(self, guildId, projectId):
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch("""
+                SELECT severity, COUNT(*) as count FROM bugs
+                WHERE guild_id = $1 AND project_id = $2 AND status != 'closed'
+                GROUP BY severity
+            """, str(guildId), int(projectId))
+            return {row['severity']: row['count'] for row in rows}
+
+    async def getUserWorkload(self, guildId, userId):
+        async with self.pool.acquire() as conn:
+            taskCount = await conn.fetchval("""
+                SELECT COUNT(*) FROM tasks
+                WHERE guild_id = $1 AND assignee_id = $2 AND status NOT IN ('done', 'backlog')
+            """, str(guildId), str(userId))
+            bugCount = await conn.fetchval("""
+                SELECT COUNT(*) FROM bugs
+                WHERE guild_id = $1 AND assignee_id = $2 AND status != 'closed'
+            """, str(guildId), str(userId))
+            return {'tasks': taskCount or 0, 'bugs': bugCount or 0}
+
+    # ─────────────────────────────────────────────
+    # Bot Metadata
+    # ─────────────────────────────────────────────
+
+    async def getMeta(self, key):
+        async with self.pool.acquire() as conn:
+            return await conn.fetchval("SELECT value FROM bot_meta WHERE key = $1", key)
+
+    async def setMeta(self, key, value):
+        async with self.pool.acquire() as conn:
+            await conn.execute("""
+                INSERT INTO bot_meta (key, value, updated_at)
+                VALUES ($1, $2, EXTRACT(EPOCH FROM now())::BIGINT)
+                ON CONFLICT (key)
+                DO UPDATE SET value = $2, updated_at = EXCLUDED.updated_at
+            """, key, str(value))
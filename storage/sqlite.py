@@ -0,0 +1,402 @@
+import os
+import json
+import time
+import asyncio
+import sqlite3
+import aiosqlite
+from storage.postgres import PostgresStorage
+import metrics
+import instrumentation
+
+# Database file for STORAGE_BACKEND=sqlite
+SQLITE_PATH = os.getenv("SQLITE_PATH", "abyssbot.db")
+
+# Prepared statements kept per connection; the bot issues well under this many distinct queries
+SQLITE_STATEMENT_CACHE = int(os.getenv("SQLITE_STATEMENT_CACHE", "512"))
+
+# Read-only connections serving SELECTs next to the single writer
+SQLITE_READERS = int(os.getenv("SQLITE_READERS", "4"))
+
+# BOOLEAN columns come back as bool like they do from asyncpg, not as 0/1
+sqlite3.register_converter("BOOLEAN", lambda value: value not in (b"0", b""))
+
+# Same tables as migrations/ (folded up to the latest Postgres version), in SQLite types.
+# Each entry moves PRAGMA user_version up by one; only ever append.
+SCHEMA = [
+    """
+    CREATE TABLE config (
+        guild_id TEXT,
+        key TEXT,
+        value TEXT,
+        PRIMARY KEY (guild_id, key)
+    );
+    CREATE TABLE warnings (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        guild_id TEXT,
+        user_id TEXT,
+        moderator_id TEXT,
+        reason TEXT,
+        timestamp INTEGER
+    );
+    CREATE TABLE permissions (
+        guild_id TEXT,
+        command TEXT,
+        role_id TEXT,
+        PRIMARY KEY (guild_id, command, role_id)
+    );
+    CREATE TABLE exemptions (
+        guild_id TEXT,
+        rule TEXT,
+        role_id TEXT,
+        PRIMARY KEY (guild_id, rule, role_id)
+    );
+    CREATE TABLE filters (
+        guild_id TEXT,
+        type TEXT,
+        item TEXT,
+        PRIMARY KEY (guild_id, type, item)
+    );
+    CREATE TABLE exempt_channels (
+        guild_id TEXT,
+        rule TEXT,
+        channel_id TEXT,
+        PRIMARY KEY (guild_id, rule, channel_id)
+    );
+    CREATE TABLE projects (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        guild_id TEXT NOT NULL,
+        guild_seq INTEGER NOT NULL,
+        name TEXT NOT NULL,
+        description TEXT DEFAULT '',
+        created_at INTEGER NOT NULL,
+        UNIQUE(guild_id, name),
+        UNIQUE(guild_id, guild_seq)
+    );
+    CREATE TABLE sprints (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        guild_id TEXT NOT NULL,
+        project_id INTEGER REFERENCES projects(id) ON DELETE CASCADE,
+        name TEXT NOT NULL,
+        start_date INTEGER,
+        end_date INTEGER,
+        status TEXT DEFAULT 'planning',
+        created_at INTEGER NOT NULL
+    );
+    CREATE TABLE tasks (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        guild_id TEXT NOT NULL,
+        guild_seq INTEGER NOT NULL,
+        project_id INTEGER REFERENCES projects(id) ON DELETE CASCADE,
+        title TEXT NOT NULL,
+        description TEXT DEFAULT '',
+        status TEXT DEFAULT 'backlog',
+        priority TEXT DEFAULT 'medium',
+        assignee_id TEXT,
+        creator_id TEXT NOT NULL,
+        created_at INTEGER NOT NULL,
+        updated_at INTEGER NOT NULL,
+        UNIQUE(guild_id, guild_seq)
+    );
+    CREATE TABLE bugs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        guild_id TEXT NOT NULL,
+        guild_seq INTEGER NOT NULL,
+        project_id INTEGER REFERENCES projects(id) ON DELETE CASCADE,
+        title TEXT NOT NULL,
+        description TEXT DEFAULT '',
+        severity TEXT DEFAULT 'medium',
+        status TEXT DEFAULT 'new',
+        assignee_id TEXT,
+        reporter_id TEXT NOT NULL,
+        tags TEXT DEFAULT '[]',
+        created_at INTEGER NOT NULL,
+        updated_at INTEGER NOT NULL,
+        UNIQUE(guild_id, guild_seq)
+    );
+    CREATE TABLE team_roles (
+        guild_id TEXT NOT NULL,
+        user_id TEXT NOT NULL,
+        role TEXT NOT NULL DEFAULT 'viewer',
+        PRIMARY KEY (guild_id, user_id)
+    );
+    CREATE TABLE checklists (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        guild_id TEXT NOT NULL,
+        guild_seq INTEGER NOT NULL,
+        task_id INTEGER REFERENCES tasks(id) ON DELETE SET NULL,
+        name TEXT NOT NULL,
+        created_by TEXT NOT NULL,
+        archived BOOLEAN DEFAULT FALSE,
+        created_at INTEGER NOT NULL,
+        UNIQUE(guild_id, guild_seq)
+    );
+    CREATE TABLE checklist_items (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        checklist_id INTEGER REFERENCES checklists(id) ON DELETE CASCADE,
+        item_seq INTEGER NOT NULL DEFAULT 0,
+        text TEXT NOT NULL,
+        completed BOOLEAN DEFAULT FALSE,
+        toggled_by TEXT,
+        toggled_at INTEGER
+    );
+    CREATE TABLE task_comments (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        task_id INTEGER REFERENCES tasks(id) ON DELETE CASCADE,
+        user_id TEXT NOT NULL,
+        content TEXT NOT NULL,
+        created_at INTEGER NOT NULL
+    );
+    CREATE TABLE task_bug_links (
+        task_id INTEGER REFERENCES tasks(id) ON DELETE CASCADE,
+        bug_id INTEGER REFERENCES bugs(id) ON DELETE CASCADE,
+        PRIMARY KEY (task_id, bug_id)
+    );
+    CREATE TABLE audit_log (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        guild_id TEXT NOT NULL,
+        action TEXT NOT NULL,
+        entity_type TEXT NOT NULL,
+        entity_id INTEGER,
+        user_id TEXT NOT NULL,
+        details TEXT DEFAULT '',
+        created_at INTEGER NOT NULL
+    );
+    CREATE TABLE guild_counters (
+        guild_id TEXT NOT NULL,
+        entity_type TEXT NOT NULL,
+        next_seq INTEGER NOT NULL DEFAULT 1,
+        PRIMARY KEY (guild_id, entity_type)
+    );
+    CREATE TABLE bot_meta (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL,
+        updated_at INTEGER NOT NULL
+    );
+    CREATE INDEX idx_tasks_project_status_created ON tasks (guild_id, project_id, status, created_at DESC);
+    CREATE INDEX idx_tasks_project_created ON tasks (guild_id, project_id, created_at DESC);
+    CREATE INDEX idx_bugs_project_status_created ON bugs (guild_id, project_id, status, created_at DESC);
+    CREATE INDEX idx_bugs_project_created ON bugs (guild_id, project_id, created_at DESC);
+    CREATE INDEX idx_tasks_open_assignee ON tasks (guild_id, assignee_id) WHERE status NOT IN ('done', 'backlog');
+    CREATE INDEX idx_bugs_open_assignee ON bugs (guild_id, assignee_id) WHERE status <> 'closed';
+    CREATE INDEX idx_bugs_open_project_severity ON bugs (guild_id, project_id, severity) WHERE status <> 'closed';
+    CREATE INDEX idx_warnings_guild_user ON warnings (guild_id, user_id, timestamp DESC);
+    CREATE INDEX idx_audit_log_guild_created ON audit_log (guild_id, created_at DESC);
+    CREATE INDEX idx_audit_log_entity_created ON audit_log (guild_id, entity_type, entity_id, created_at DESC);
+    CREATE INDEX idx_task_bug_links_bug ON task_bug_links (bug_id);
+    CREATE INDEX idx_checklist_items_checklist ON checklist_items (checklist_id, item_seq);
+    CREATE INDEX idx_task_comments_task ON task_comments (task_id, created_at);
+    """,
+]
+
+def _params(args):
+    # Queries keep asyncpg's $1..$n placeholders; sqlite3 binds those as named parameters "1".."n"
+    return {str(i): value for i, value in enumerate(args, 1)}
+
+def _isRead(query):
+    # Plain SELECTs can run on a reader; anything else (INSERT ... RETURNING, WITH ..., PRAGMA) takes the writer
+    return query.lstrip()[:6].upper() == "SELECT"
+
+class SqliteConnection:
+    """The slice of asyncpg's Connection API that PostgresStorage uses, over the pool's connections.
+
+    Outside a transaction each statement is routed on its own: SELECTs to an idle reader,
+    everything else to the writer under the pool's write lock. Inside transaction() every
+    statement stays on the writer, which the transaction holds until it ends.
+    """
+
+    def __init__(self, pool, timeout=None):
+        self._pool = pool
+        self._timeout = timeout
+        self._inTransaction = False
+
+    async def _run(self, query, run):
+        pool = self._pool
+        if self._inTransaction:
+            return await run(pool.writer)
+        if pool.readers is not None and _isRead(query):
+            reader = await asyncio.wait_for(pool.readers.get(), self._timeout)
+            try:
+                return await run(reader)
+            finally:
+                pool.readers.put_nowait(reader)
+        await asyncio.wait_for(pool.writeLock.acquire(), self._timeout)
+        try:
+            return await run(pool.writer)
+        finally:
+            pool.writeLock.release()
+
+    async def fetch(self, query, *args, timeout=None):
+        return await self._run(query, lambda db: db.execute_fetchall(query, _params(args)))
+
+    async def fetchrow(self, query, *args, timeout=None):
+        rows = await self.fetch(query, *args)
+        return rows[0] if rows else None
+
+    async def fetchval(self, query, *args, timeout=None):
+        row = await self.fetchrow(query, *args)
+        return row[0] if row else None
+
+    async def execute(self, query, *args, timeout=None):
+        await self._run(query, lambda db: db.execute(query, _params(args)))
+
+    async def executemany(self, query, args, timeout=None):
+        await self._run(query, lambda db: db.executemany(query, [_params(a) for a in args]))
+
+    def transaction(self):
+        return _Transaction(self)
+
+class _Transaction:
+    def __init__(self, connection):
+        self._connection = connection
+
+    async def __aenter__(self):
+        connection = self._connection
+        pool = connection._pool
+        await asyncio.wait_for(pool.writeLock.acquire(), connection._timeout)
+        try:
+            # IMMEDIATE takes the write lock up front so a later write can't fail with SQLITE_BUSY
+            await pool.writer.execute("BEGIN IMMEDIATE")
+        except BaseException:
+            pool.writeLock.release()
+            raise
+        connection._inTransaction = True
+
+    async def __aexit__(self, excType, exc, tb):
+        connection = self._connection
+        connection._inTransaction = False
+        try:
+            await connection._pool.writer.execute("ROLLBACK" if excType else "COMMIT")
+        finally:
+            connection._pool.writeLock.release()
+
+class _Acquire:
+    def __init__(self, pool, timeout):
+        self.pool = pool
+        self.timeout = timeout
+
+    async def __aenter__(self):
+        # Nothing is held yet: each statement waits for its own reader or for the write lock
+        return SqliteConnection(self.pool, self.timeout)
+
+    async def __aexit__(self, *exc):
+        pass
+
+class SqlitePool:
+    """One writer plus a few read-only connections, shaped like an asyncpg pool.
+
+    aiosqlite runs each connection on its own thread. Writes queue on the lock for the single
+    writer instead of contending for SQLite's file lock; with WAL, SELECTs run on the readers
+    alongside them and alongside each other. readers is None when there are none (":memory:"
+    databases can't be shared between connections), and reads then go through the writer too.
+    """
+
+    def __init__(self, writer, readers=()):
+        self.writer = writer
+        self.writeLock = asyncio.Lock()
+        self._readers = list(readers)
+        self.readers = None
+        if self._readers:
+            self.readers = asyncio.Queue()
+            for reader in self._readers:
+                self.readers.put_nowait(reader)
+
+    def acquire(self, *, timeout=None):
+        return _Acquire(self, timeout)
+
+    async def close(self):
+        for db in self._readers + [self.writer]:
+            await db.close()
+
+    def get_size(self):
+        return 1 + len(self._readers)
+
+    def get_idle_size(self):
+        idleReaders = self.readers.qsize() if self.readers is not None else 0
+        return idleReaders + (0 if self.writeLock.locked() else 1)
+
+    def get_max_size(self):
+        return self.get_size()
+
+class SqliteStorage(PostgresStorage):
+    """Local SQLite file for single-node deployments.
+
+    Reuses every PostgresStorage query through SqliteConnection; only the statements that
+    rely on Postgres-only syntax are overridden below.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path=None):
+        super().__init__()
+        self.path = path or SQLITE_PATH
+
+    async def _open(self):
+        db = await aiosqlite.connect(
+            self.path, isolation_level=None, cached_statements=SQLITE_STATEMENT_CACHE,
+            detect_types=sqlite3.PARSE_DECLTYPES
+        )
+        db.row_factory = sqlite3.Row
+        await db.execute("PRAGMA busy_timeout = 5000")
+        return db
+
+    async def connect(self):
+        try:
+            db = await self._open()
+            # WAL lets the readers below (and backups, the sqlite3 shell) work alongside the writer;
+            # NORMAL only fsyncs at checkpoints, which WAL keeps crash-safe
+            await db.execute("PRAGMA journal_mode = WAL")
+            await db.execute("PRAGMA synchronous = NORMAL")
+            await db.execute("PRAGMA foreign_keys = ON")
+            await self._migrate(db)
+
+            readers = []
+            if self.path != ":memory:":
+                for _ in range(SQLITE_READERS):
+                    reader = await self._open()
+                    # A write routed here by mistake fails loudly instead of bypassing the write lock
+                    await reader.execute("PRAGMA query_only = ON")
+                    readers.append(reader)
+        except Exception as e:
+            print(f"Failed to open SQLite database {self.path}: {e}")
+            return False
+
+        self.pool = SqlitePool(db, readers)
+        if metrics.METRICS_ENABLED:
+            self.pool = instrumentation.InstrumentedPool(self.pool)
+        print(f"Connected to SQLite database {self.path} ({len(readers)} readers)")
+        return True
+
+    async def _migrate(self, db):
+        version = (await db.execute_fetchall("PRAGMA user_version"))[0][0]
+        for index, script in enumerate(SCHEMA[version:], version + 1):
+            # executescript commits first, so the version bump goes in the same script
+            await db.executescript(f"BEGIN; {script}; PRAGMA user_version = {index}; COMMIT;")
+            print(f"Applied SQLite schema version {index}")
+
+    async def bootstrapConfig(self, guildIds, defaults):
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                # SQLite has no unnest or data-modifying CTEs: insert from json_each, then read back
+                inserted = await conn.fetch("""
+                    INSERT INTO config (guild_id, key, value)
+                    SELECT g.value, d.key, d.value FROM json_each($1) AS g, json_each($2) AS d WHERE true
+                    ON CONFLICT (guild_id, key) DO NOTHING
+                    RETURNING guild_id
+                """, json.dumps(guildIds), json.dumps(defaults))
+                rows = await conn.fetch("""
+                    SELECT guild_id, key, value FROM config WHERE guild_id IN (SELECT value FROM json_each($1))
+                """, json.dumps(guildIds))
+
+        configs = {guildId: {} for guildId in guildIds}
+        for row in rows:
+            configs[row['guild_id']][row['key']] = row['value']
+        return configs, {row['guild_id'] for row in inserted}
+
+    async def setMeta(self, key, value):
+        async with self.pool.acquire() as conn:
+            await conn.execute("""
+                INSERT INTO bot_meta (key, value, updated_at)
+                VALUES ($1, $2, $3)
+                ON CONFLICT (key)
+                DO UPDATE SET value = $2, updated_at = EXCLUDED.updated_at
+            """, key, str(value), int(time.time()))
@@ -0,0 +1,76 @@
+from collections import deque
+
+class WordMatcher:
+    """Aho-Corasick automaton over a guild's banned words.
+
+    Scans a message in one pass regardless of how many words are banned. In exact
+    mode a hit only counts when it spans a whole whitespace-separated token, which
+    matches the old `word in content.split()` behaviour; partial mode accepts any substring.
+    """
+
+    def __init__(self, words, partial=False):
+        self.partial = partial
+        # Node 0 is the root. Each node: outgoing edges, failure link, words ending here.
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+        self.size = 0
+
+        for word in set(words):
+            if not word or (not partial and any(ch.isspace() for ch in word)):
+                continue
+            self._insert(word)
+            self.size += 1
+        self._link()
+
+    def __len__(self):
+        return self.size
+
+    def _insert(self, word):
+        node = 0
+        for ch in word:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            node = nxt
+        self._out[node] = self._out[node] + (word,)
+
+    def _link(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                # Fold the failure chain's matches in so search never walks it for output
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def search(self, text):
+        """Return the first banned word found in `text` (already lowercased), or None."""
+        goto, fail, out = self._goto, self._fail, self._out
+        partial = self.partial
+        last = len(text) - 1
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if not out[node]:
+                continue
+            if partial:
+                return out[node][0]
+            if i != last and not text[i + 1].isspace():
+                continue
+            for word in out[node]:
+                start = i - len(word) + 1
+                if start == 0 or text[start - 1].isspace():
+                    return word
+        return None